@@ -0,0 +1,49 @@
+"""products_source_hash
+
+Revision ID: a2c6e8f1b437
+Revises: f3b7d1e9a526
+Create Date: 2026-10-18 18:47:32.160283
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a2c6e8f1b437'
+down_revision: Union[str, None] = 'f3b7d1e9a526'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    op.add_column('products', sa.Column('source_hash', sa.Text(), nullable=True))
+
+
+def downgrade_dropship() -> None:
+    op.drop_column('products', 'source_hash')
+
+
+def upgrade_market() -> None:
+    pass
+
+
+def downgrade_market() -> None:
+    pass
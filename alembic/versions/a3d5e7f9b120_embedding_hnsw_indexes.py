@@ -0,0 +1,49 @@
+"""embedding_hnsw_indexes
+
+Revision ID: a3d5e7f9b120
+Revises: f2a8c3d6e915
+Create Date: 2026-10-18 13:41:17.502936
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a3d5e7f9b120'
+down_revision: Union[str, None] = 'f2a8c3d6e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    op.create_index('ix_sourcing_candidates_embedding_hnsw', 'sourcing_candidates', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def downgrade_dropship() -> None:
+    op.drop_index('ix_sourcing_candidates_embedding_hnsw', table_name='sourcing_candidates', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def upgrade_market() -> None:
+    op.create_index('ix_benchmark_products_embedding_hnsw', 'benchmark_products', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def downgrade_market() -> None:
+    op.drop_index('ix_benchmark_products_embedding_hnsw', table_name='benchmark_products', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
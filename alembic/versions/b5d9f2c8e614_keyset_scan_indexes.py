@@ -0,0 +1,49 @@
+"""keyset_scan_indexes
+
+Revision ID: b5d9f2c8e614
+Revises: a2c6e8f1b437
+Create Date: 2026-10-18 19:26:51.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b5d9f2c8e614'
+down_revision: Union[str, None] = 'a2c6e8f1b437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    op.create_index('ix_supplier_item_raw_supplier_fetched_id', 'supplier_item_raw', ['supplier_code', 'fetched_at', 'id'], unique=False)
+
+
+def downgrade_source() -> None:
+    op.drop_index('ix_supplier_item_raw_supplier_fetched_id', table_name='supplier_item_raw')
+
+
+def upgrade_dropship() -> None:
+    pass
+
+
+def downgrade_dropship() -> None:
+    pass
+
+
+def upgrade_market() -> None:
+    op.create_index('ix_market_order_raw_account_fetched_id', 'market_order_raw', ['account_id', 'fetched_at', 'id'], unique=False)
+
+
+def downgrade_market() -> None:
+    op.drop_index('ix_market_order_raw_account_fetched_id', table_name='market_order_raw')
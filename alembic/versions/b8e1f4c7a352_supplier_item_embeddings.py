@@ -0,0 +1,63 @@
+"""supplier_item_embeddings
+
+Revision ID: b8e1f4c7a352
+Revises: a3d5e7f9b120
+Create Date: 2026-10-18 14:20:05.774310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector
+
+
+revision: str = 'b8e1f4c7a352'
+down_revision: Union[str, None] = 'a3d5e7f9b120'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table('supplier_item_embeddings',
+    sa.Column('supplier_item_id', sa.UUID(), nullable=False),
+    sa.Column('supplier_code', sa.Text(), nullable=False),
+    sa.Column('item_code', sa.Text(), nullable=True),
+    sa.Column('model', sa.Text(), nullable=False),
+    sa.Column('content_hash', sa.Text(), nullable=False),
+    sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['supplier_item_id'], ['supplier_item_raw.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('supplier_item_id')
+    )
+    op.create_index('ix_supplier_item_embeddings_embedding_hnsw', 'supplier_item_embeddings', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def downgrade_source() -> None:
+    op.drop_index('ix_supplier_item_embeddings_embedding_hnsw', table_name='supplier_item_embeddings', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+    op.drop_table('supplier_item_embeddings')
+
+
+def upgrade_dropship() -> None:
+    pass
+
+
+def downgrade_dropship() -> None:
+    pass
+
+
+def upgrade_market() -> None:
+    pass
+
+
+def downgrade_market() -> None:
+    pass
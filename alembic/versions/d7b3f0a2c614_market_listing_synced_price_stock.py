@@ -0,0 +1,53 @@
+"""market_listing_synced_price_stock
+
+Revision ID: d7b3f0a2c614
+Revises: c1a4e2f7d901
+Create Date: 2026-10-18 11:03:52.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd7b3f0a2c614'
+down_revision: Union[str, None] = 'c1a4e2f7d901'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    pass
+
+
+def downgrade_dropship() -> None:
+    pass
+
+
+def upgrade_market() -> None:
+    op.add_column('market_listings', sa.Column('synced_price', sa.Integer(), nullable=True))
+    op.add_column('market_listings', sa.Column('synced_stock', sa.Integer(), nullable=True))
+    op.add_column('market_listings', sa.Column('synced_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade_market() -> None:
+    op.drop_column('market_listings', 'synced_at')
+    op.drop_column('market_listings', 'synced_stock')
+    op.drop_column('market_listings', 'synced_price')
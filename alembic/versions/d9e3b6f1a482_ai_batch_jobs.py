@@ -0,0 +1,83 @@
+"""ai_batch_jobs
+
+Revision ID: d9e3b6f1a482
+Revises: c5f2a9d4e871
+Create Date: 2026-10-18 16:21:07.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd9e3b6f1a482'
+down_revision: Union[str, None] = 'c5f2a9d4e871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    op.create_table('ai_batch_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('provider', sa.Text(), nullable=False),
+    sa.Column('task', sa.Text(), nullable=False),
+    sa.Column('target', sa.Text(), nullable=False),
+    sa.Column('model', sa.Text(), nullable=False),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('remote_batch_id', sa.Text(), nullable=True),
+    sa.Column('input_file_id', sa.Text(), nullable=True),
+    sa.Column('output_file_id', sa.Text(), nullable=True),
+    sa.Column('error_file_id', sa.Text(), nullable=True),
+    sa.Column('key_fingerprint', sa.Text(), nullable=True),
+    sa.Column('input_path', sa.Text(), nullable=True),
+    sa.Column('request_count', sa.Integer(), nullable=False),
+    sa.Column('succeeded_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_batch_jobs_status'), 'ai_batch_jobs', ['status'], unique=False)
+    op.create_table('ai_batch_job_items',
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('target_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['ai_batch_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'target_id')
+    )
+    op.create_index(op.f('ix_ai_batch_job_items_target_id'), 'ai_batch_job_items', ['target_id'], unique=False)
+
+
+def downgrade_dropship() -> None:
+    op.drop_index(op.f('ix_ai_batch_job_items_target_id'), table_name='ai_batch_job_items')
+    op.drop_table('ai_batch_job_items')
+    op.drop_index(op.f('ix_ai_batch_jobs_status'), table_name='ai_batch_jobs')
+    op.drop_table('ai_batch_jobs')
+
+
+def upgrade_market() -> None:
+    pass
+
+
+def downgrade_market() -> None:
+    pass
@@ -0,0 +1,67 @@
+"""market_listing_routes
+
+Revision ID: e4c9a1b5d237
+Revises: d7b3f0a2c614
+Create Date: 2026-10-18 11:48:09.530961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e4c9a1b5d237'
+down_revision: Union[str, None] = 'd7b3f0a2c614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    pass
+
+
+def downgrade_dropship() -> None:
+    pass
+
+
+def upgrade_market() -> None:
+    op.create_table('market_listing_routes',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('market_account_id', sa.UUID(), nullable=False),
+    sa.Column('market_item_id', sa.Text(), nullable=False),
+    sa.Column('vendor_item_id', sa.Text(), nullable=False),
+    sa.Column('listing_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('supplier_code', sa.Text(), nullable=False),
+    sa.Column('supplier_item_id', sa.UUID(), nullable=False),
+    sa.Column('item_code', sa.Text(), nullable=False),
+    sa.Column('option_key', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['market_account_id'], ['market_accounts.id'], ),
+    sa.ForeignKeyConstraint(['listing_id'], ['market_listings.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('market_account_id', 'market_item_id', 'vendor_item_id', name='uq_market_listing_routes_account_item_vendor')
+    )
+    op.create_index('ix_market_listing_routes_account_vendor_item', 'market_listing_routes', ['market_account_id', 'vendor_item_id'], unique=False)
+
+
+def downgrade_market() -> None:
+    op.drop_index('ix_market_listing_routes_account_vendor_item', table_name='market_listing_routes')
+    op.drop_table('market_listing_routes')
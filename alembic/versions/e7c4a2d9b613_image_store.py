@@ -0,0 +1,68 @@
+"""image_store
+
+Revision ID: e7c4a2d9b613
+Revises: d9e3b6f1a482
+Create Date: 2026-10-18 17:02:44.380215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e7c4a2d9b613'
+down_revision: Union[str, None] = 'd9e3b6f1a482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    op.create_table('image_sources',
+    sa.Column('url_hash', sa.Text(), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('content_sha256', sa.Text(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('url_hash')
+    )
+    op.create_index(op.f('ix_image_sources_content_sha256'), 'image_sources', ['content_sha256'], unique=False)
+    op.create_table('image_variants',
+    sa.Column('content_sha256', sa.Text(), nullable=False),
+    sa.Column('variant', sa.Text(), nullable=False),
+    sa.Column('scope_key', sa.Text(), nullable=False),
+    sa.Column('public_url', sa.Text(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('content_sha256', 'variant', 'scope_key')
+    )
+
+
+def downgrade_dropship() -> None:
+    op.drop_table('image_variants')
+    op.drop_index(op.f('ix_image_sources_content_sha256'), table_name='image_sources')
+    op.drop_table('image_sources')
+
+
+def upgrade_market() -> None:
+    pass
+
+
+def downgrade_market() -> None:
+    pass
@@ -0,0 +1,58 @@
+"""embedding_cache
+
+Revision ID: f2a8c3d6e915
+Revises: e4c9a1b5d237
+Create Date: 2026-10-18 13:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'f2a8c3d6e915'
+down_revision: Union[str, None] = 'e4c9a1b5d237'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    op.create_table('embedding_cache',
+    sa.Column('model', sa.Text(), nullable=False),
+    sa.Column('text_hash', sa.Text(), nullable=False),
+    sa.Column('embedding', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('dimensions', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('model', 'text_hash')
+    )
+
+
+def downgrade_dropship() -> None:
+    op.drop_table('embedding_cache')
+
+
+def upgrade_market() -> None:
+    pass
+
+
+def downgrade_market() -> None:
+    pass
@@ -0,0 +1,69 @@
+"""products_supplier_item_unique
+
+Revision ID: f3b7d1e9a526
+Revises: e7c4a2d9b613
+Create Date: 2026-10-18 18:21:09.514732
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f3b7d1e9a526'
+down_revision: Union[str, None] = 'e7c4a2d9b613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str = "") -> None:
+    globals()[f"upgrade_{engine_name}"]()
+
+
+def downgrade(engine_name: str = "") -> None:
+    globals()[f"downgrade_{engine_name}"]()
+
+
+def upgrade_source() -> None:
+    pass
+
+
+def downgrade_source() -> None:
+    pass
+
+
+def upgrade_dropship() -> None:
+    # 같은 공급사 상품에 연결된 중복 상품은 하나만 남기고 연결을 끊습니다(삭제하지 않음).
+    # 남기는 기준: 판매 중(DRAFT 아님) > 가공 완료 > 먼저 만들어진 상품
+    op.execute(
+        sa.text(
+            """
+            UPDATE products SET supplier_item_id = NULL
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY supplier_item_id
+                        ORDER BY (status <> 'DRAFT') DESC, (processing_status = 'COMPLETED') DESC, created_at, id
+                    ) AS rn
+                    FROM products
+                    WHERE supplier_item_id IS NOT NULL
+                ) ranked
+                WHERE ranked.rn > 1
+            )
+            """
+        )
+    )
+    op.create_index('uq_products_supplier_item_id', 'products', ['supplier_item_id'], unique=True)
+
+
+def downgrade_dropship() -> None:
+    op.drop_index('uq_products_supplier_item_id', table_name='products')
+
+
+def upgrade_market() -> None:
+    pass
+
+
+def downgrade_market() -> None:
+    pass
@@ -9,7 +9,10 @@ from datetime import datetime, timezone
 
 from app.db import get_session
 from app.models import BenchmarkCollectJob, BenchmarkProduct
-from app.benchmark.collector_factory import get_benchmark_collector, get_supported_market_codes
+from app.embedding_cache import embedding_cache
+from app.services.vector_search_service import VectorSearchService
+from app.benchmark.collector_factory import get_benchmark_collector, get_market_domain, get_supported_market_codes
+from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -128,6 +131,11 @@ def list_benchmark_collect_jobs(
     ]
 
 
+@router.get("/embedding-cache/stats")
+def get_embedding_cache_stats() -> dict:
+    return embedding_cache.stats()
+
+
 @router.get("/{benchmark_id}")
 def get_benchmark(benchmark_id: uuid.UUID, session: Session = Depends(get_session)) -> dict:
     row = session.get(BenchmarkProduct, benchmark_id)
@@ -173,6 +181,40 @@ def get_benchmark(benchmark_id: uuid.UUID, session: Session = Depends(get_sessio
     }
 
 
+@router.get("/{benchmark_id}/similar-candidates")
+def get_similar_candidates(
+    benchmark_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    k: int = Query(default=10, ge=1, le=100),
+    status: str | None = Query(default=None),
+    ef_search: int | None = Query(default=None, alias="efSearch", ge=1, le=1000),
+    probes: int | None = Query(default=None, ge=1, le=1000),
+    exact: bool = Query(default=False),
+) -> list[dict]:
+    rows = VectorSearchService(session).similar_candidates_for_benchmark(
+        benchmark_id, k=k, status=status, ef_search=ef_search, probes=probes, exact=exact
+    )
+    if rows is None:
+        raise HTTPException(status_code=404, detail="벤치마크 상품을 찾을 수 없습니다")
+    return rows
+
+
+@router.get("/{benchmark_id}/similar-supplier-items")
+def get_similar_supplier_items(
+    benchmark_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    k: int = Query(default=10, ge=1, le=100),
+    supplier_code: str | None = Query(default=None, alias="supplierCode"),
+    ef_search: int | None = Query(default=None, alias="efSearch", ge=1, le=1000),
+) -> list[dict]:
+    rows = VectorSearchService(session).similar_supplier_items_for_benchmark(
+        benchmark_id, k=k, supplier_code=supplier_code, ef_search=ef_search
+    )
+    if rows is None:
+        raise HTTPException(status_code=404, detail="벤치마크 상품을 찾을 수 없습니다")
+    return rows
+
+
 @router.post("/collect/ranking", status_code=202)
 async def collect_benchmark_ranking(
     payload: BenchmarkRankingCollectIn,
@@ -254,6 +296,18 @@ def _execute_benchmark_ranking_collection(job_id: uuid.UUID, market_code: str, c
         job_session.commit()
 
 
+def _update_all_job_progress(job_id: uuid.UUID, progress: int, failed_markets: list[str], last_error: str | None) -> None:
+    from app.session_factory import session_factory
+
+    with session_factory() as inner_session:
+        job = inner_session.get(BenchmarkCollectJob, job_id)
+        if job:
+            job.progress = progress
+            job.failed_markets = failed_markets
+            job.last_error = last_error
+            inner_session.commit()
+
+
 def _execute_benchmark_all_ranking_collection(job_id: uuid.UUID, market_codes: list[str], limit: int) -> None:
     from app.session_factory import session_factory
 
@@ -271,27 +325,37 @@ def _execute_benchmark_all_ranking_collection(job_id: uuid.UUID, market_codes: l
     async def _run_all() -> tuple[list[str], str | None]:
         failed_markets: list[str] = []
         last_error: str | None = None
+        done = 0
 
         total = max(len(market_codes), 1)
-        for idx, code in enumerate(market_codes):
-            try:
-                collector = get_benchmark_collector(code)
-                await collector.run_ranking_collection(limit=limit, category_url=None)
-            except Exception as e:
-                logger.exception(f"벤치마크 ALL 수집 실패: marketCode={code}: {e}")
+        global_sem = asyncio.Semaphore(max(1, int(settings.benchmark_market_concurrency)))
+        domain_sems: dict[str, asyncio.Semaphore] = {}
+        for code in market_codes:
+            domain = get_market_domain(code)
+            if domain not in domain_sems:
+                domain_sems[domain] = asyncio.Semaphore(max(1, int(settings.benchmark_domain_concurrency)))
+
+        async def _run_market(code: str) -> tuple[str, str | None]:
+            async with global_sem, domain_sems[get_market_domain(code)]:
+                try:
+                    collector = get_benchmark_collector(code)
+                    await collector.run_ranking_collection(limit=limit, category_url=None)
+                    return code, None
+                except Exception as e:
+                    logger.exception(f"벤치마크 ALL 수집 실패: marketCode={code}: {e}")
+                    return code, str(e)
+
+        # 마켓별 수집은 서로 독립적이므로 동시에 실행하고, 끝나는 순서대로 진행률을 갱신합니다.
+        tasks = [asyncio.create_task(_run_market(code)) for code in market_codes]
+        for finished in asyncio.as_completed(tasks):
+            code, error = await finished
+            done += 1
+            if error is not None:
                 failed_markets.append(code)
-                last_error = str(e)
-
-            progress = int(((idx + 1) / total) * 100)
-            with session_factory() as inner_session:
-                job = inner_session.get(BenchmarkCollectJob, job_id)
-                if job:
-                    job.progress = progress
-                    job.failed_markets = failed_markets
-                    job.last_error = last_error
-                    inner_session.commit()
-
-            await asyncio.sleep(1)
+                last_error = error
+
+            progress = int((done / total) * 100)
+            await asyncio.to_thread(_update_all_job_progress, job_id, progress, list(failed_markets), last_error)
 
         return failed_markets, last_error
 
@@ -2,16 +2,195 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 import uuid
+from datetime import datetime
 from pydantic import BaseModel, Field
 
 from app.db import get_session
-from app.models import Product, MarketAccount, MarketOrderRaw, MarketListing, MarketProductRaw
-from app.coupang_sync import register_product, sync_coupang_orders_raw, fulfill_coupang_orders_via_ownerclan
+from app.models import (
+    Product,
+    MarketAccount,
+    MarketOrderRaw,
+    MarketListing,
+    MarketProductRaw,
+    MarketRegistrationJob,
+    MarketRegistrationJobItem,
+)
+from app.coupang_sync import (
+    register_product,
+    run_coupang_bulk_registration_job,
+    sync_coupang_orders_raw,
+    fulfill_coupang_orders_via_ownerclan,
+)
 from app.coupang_client import CoupangClient
+from app.coupang_price_sync import sync_coupang_prices_and_stock
+from app.market_routing import refresh_listing_routes
+from app.normalization import items_sync_running
 from sqlalchemy.dialects.postgresql import insert
 
 router = APIRouter()
 
+
+class CoupangBulkRegisterIn(BaseModel):
+    productIds: list[uuid.UUID] | None = None
+    processingStatus: str | None = "COMPLETED"
+    limit: int = Field(default=100, ge=1, le=5000)
+    excludeListed: bool = True
+    concurrency: int | None = Field(default=None, ge=1, le=32)
+
+
+def _to_iso(dt: datetime | None) -> str | None:
+    if not dt:
+        return None
+    return dt.isoformat()
+
+
+def _registration_job_to_dict(job: MarketRegistrationJob) -> dict:
+    return {
+        "id": str(job.id),
+        "status": job.status,
+        "marketCode": job.market_code,
+        "accountId": str(job.account_id),
+        "total": job.total,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "progress": job.progress,
+        "lastError": job.last_error,
+        "params": job.params,
+        "startedAt": _to_iso(job.started_at),
+        "finishedAt": _to_iso(job.finished_at),
+        "createdAt": _to_iso(job.created_at),
+        "updatedAt": _to_iso(job.updated_at),
+    }
+
+
+@router.post("/register/bulk", status_code=202)
+async def register_products_bulk_endpoint(
+    payload: CoupangBulkRegisterIn,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+):
+    """
+    여러 상품을 한 번에 쿠팡에 등록하는 대량 등록 job을 생성합니다.
+    productIds 가 없으면 processingStatus 기준으로 대상 상품을 선택합니다.
+    """
+    stmt = select(MarketAccount).where(MarketAccount.market_code == "COUPANG", MarketAccount.is_active == True)
+    account = session.scalars(stmt).first()
+    if not account:
+        raise HTTPException(status_code=400, detail="활성 상태의 쿠팡 계정을 찾을 수 없습니다.")
+
+    listed_ids: set[uuid.UUID] = set()
+    if payload.excludeListed:
+        # market/dropship DB가 분리되어 있으므로 조인 대신 ID 집합으로 제외합니다.
+        listed_ids = set(
+            session.scalars(
+                select(MarketListing.product_id).where(MarketListing.market_account_id == account.id)
+            ).all()
+        )
+
+    if payload.productIds:
+        product_ids = list(dict.fromkeys(payload.productIds))
+    else:
+        stmt_products = select(Product.id).order_by(Product.created_at.asc())
+        if payload.processingStatus:
+            stmt_products = stmt_products.where(Product.processing_status == payload.processingStatus)
+        stmt_products = stmt_products.limit(payload.limit + len(listed_ids))
+        product_ids = list(session.scalars(stmt_products).all())
+
+    product_ids = [pid for pid in product_ids if pid not in listed_ids][: payload.limit]
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="등록할 대상 상품이 없습니다.")
+
+    job = MarketRegistrationJob(
+        market_code="COUPANG",
+        account_id=account.id,
+        status="queued",
+        total=len(product_ids),
+        succeeded=0,
+        failed=0,
+        progress=0,
+        params={
+            "processingStatus": payload.processingStatus,
+            "excludeListed": payload.excludeListed,
+            "concurrency": payload.concurrency,
+        },
+    )
+    session.add(job)
+    session.flush()
+
+    session.add_all(
+        [MarketRegistrationJobItem(job_id=job.id, product_id=pid, status="queued", attempts=0) for pid in product_ids]
+    )
+    session.flush()
+
+    background_tasks.add_task(run_coupang_bulk_registration_job, job.id)
+    return {"status": "accepted", "jobId": str(job.id), "total": len(product_ids)}
+
+
+@router.get("/register/jobs/{job_id}")
+def get_registration_job(
+    job_id: uuid.UUID,
+    includeItems: bool = False,
+    session: Session = Depends(get_session),
+) -> dict:
+    job = session.get(MarketRegistrationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="대량 등록 job을 찾을 수 없습니다")
+
+    result = _registration_job_to_dict(job)
+    if includeItems:
+        items = session.scalars(
+            select(MarketRegistrationJobItem)
+            .where(MarketRegistrationJobItem.job_id == job_id)
+            .order_by(MarketRegistrationJobItem.created_at.asc())
+        ).all()
+        result["items"] = [
+            {
+                "productId": str(item.product_id),
+                "status": item.status,
+                "attempts": item.attempts,
+                "marketItemId": item.market_item_id,
+                "httpStatus": item.http_status,
+                "lastError": item.last_error,
+                "updatedAt": _to_iso(item.updated_at),
+            }
+            for item in items
+        ]
+    return result
+
+
+@router.post("/register/jobs/{job_id}/retry", status_code=202)
+async def retry_registration_job(
+    job_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+):
+    """
+    대량 등록 job 중 실패한 상품만 다시 등록합니다.
+    """
+    job = session.get(MarketRegistrationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="대량 등록 job을 찾을 수 없습니다")
+    if job.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="이미 진행 중인 job입니다")
+
+    failed_items = session.scalars(
+        select(MarketRegistrationJobItem)
+        .where(MarketRegistrationJobItem.job_id == job_id)
+        .where(MarketRegistrationJobItem.status == "failed")
+    ).all()
+    if not failed_items:
+        return {"status": "noop", "jobId": str(job.id), "retry": 0}
+
+    for item in failed_items:
+        item.status = "queued"
+        item.attempts = 0
+    job.status = "queued"
+    session.flush()
+
+    background_tasks.add_task(run_coupang_bulk_registration_job, job.id)
+    return {"status": "accepted", "jobId": str(job.id), "retry": len(failed_items)}
+
+
 @router.post("/register/{product_id}", status_code=202)
 async def register_product_endpoint(
     product_id: uuid.UUID,
@@ -122,6 +301,8 @@ async def get_coupang_product_detail(
         set_={"raw": stmt.excluded.raw, "fetched_at": stmt.excluded.fetched_at},
     )
     session.execute(stmt)
+    # vendorItemId 가 확인되었으므로 주문 라우팅 테이블도 함께 갱신
+    refresh_listing_routes(session, account.id, market_item_ids=[str(seller_product_id).strip()])
 
     seller_product_name = data_obj.get("sellerProductName") or data_obj.get("seller_product_name")
     items = data_obj.get("items") if isinstance(data_obj.get("items"), list) else []
@@ -292,6 +473,60 @@ def execute_coupang_ownerclan_fulfill(
         )
 
 
+class CoupangPriceStockSyncIn(BaseModel):
+    full: bool = Field(default=False, description="true 면 watermark 를 무시하고 전체 재계산")
+    forcePrice: bool = Field(default=False)
+    concurrency: int | None = Field(default=None, ge=1, le=32)
+
+
+@router.post("/sync/price-stock", status_code=202)
+async def sync_price_stock_endpoint(
+    payload: CoupangPriceStockSyncIn,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+):
+    """
+    오너클랜 가격/재고 변경분을 쿠팡 리스팅에 반영하는 작업을 트리거합니다.
+    오너클랜 상품 수집이 진행 중이면 409 를 반환합니다(수집이 끝나면 자동으로 반영됨).
+    """
+    if items_sync_running(session, "ownerclan"):
+        raise HTTPException(status_code=409, detail="오너클랜 상품 수집이 진행 중입니다. 수집이 끝나면 자동으로 반영됩니다.")
+
+    stmt = select(MarketAccount).where(MarketAccount.market_code == "COUPANG", MarketAccount.is_active == True)
+    account = session.scalars(stmt).first()
+
+    if not account:
+        raise HTTPException(status_code=400, detail="활성 상태의 쿠팡 계정을 찾을 수 없습니다.")
+
+    background_tasks.add_task(
+        execute_coupang_price_stock_sync,
+        account.id,
+        payload.full,
+        payload.forcePrice,
+        payload.concurrency,
+    )
+
+    return {"status": "accepted", "message": "쿠팡 가격/재고 동기화 작업이 시작되었습니다."}
+
+
+def execute_coupang_price_stock_sync(
+    account_id: uuid.UUID,
+    full: bool,
+    force_price: bool,
+    concurrency: int | None,
+):
+    from app.session_factory import session_factory
+
+    with session_factory() as session:
+        sync_coupang_prices_and_stock(
+            session,
+            account_id,
+            full=full,
+            force_price=force_price,
+            concurrency=concurrency,
+        )
+
+
 class CoupangListingLinkIn(BaseModel):
     sellerProductId: str
     productId: uuid.UUID
@@ -331,6 +566,7 @@ async def link_coupang_listing(
         set_={"product_id": product.id, "status": str(payload.status or "ACTIVE")},
     )
     session.execute(stmt)
+    routes = refresh_listing_routes(session, account.id, market_item_ids=[seller_product_id])
 
     row = session.execute(
         select(MarketListing).where(MarketListing.market_account_id == account.id).where(MarketListing.market_item_id == seller_product_id)
@@ -345,4 +581,22 @@ async def link_coupang_listing(
             "sellerProductId": seller_product_id,
             "status": str(payload.status or "ACTIVE"),
         },
+        "routes": routes,
     }
+
+
+@router.post("/listings/routes/refresh", status_code=200)
+async def refresh_coupang_listing_routes(
+    session: Session = Depends(get_session),
+):
+    """
+    활성 쿠팡 계정의 모든 리스팅에 대해 주문 라우팅 테이블(market_listing_routes)을 재생성합니다.
+    (기존 리스팅 백필 / 점검용)
+    """
+    stmt_acct = select(MarketAccount).where(MarketAccount.market_code == "COUPANG", MarketAccount.is_active == True)
+    account = session.scalars(stmt_acct).first()
+    if not account:
+        raise HTTPException(status_code=400, detail="활성 상태의 쿠팡 계정을 찾을 수 없습니다.")
+
+    routes = refresh_listing_routes(session, account.id)
+    return {"refreshed": routes}
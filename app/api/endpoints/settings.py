@@ -2,15 +2,19 @@ import uuid
 from datetime import datetime
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.db import get_session
-from app.models import APIKey, MarketAccount, SupplierAccount
+from app.models import AIBatchJob, APIKey, MarketAccount, SupplierAccount
 from app.ownerclan_client import OwnerClanClient
+from app.services.ai.batch import AIBatchService, run_ai_batch_submit
+from app.services.ai.cache import llm_cache
+from app.services.ai.registry import provider_registry
+from app.session_factory import session_factory
 from app.settings import settings
 
 router = APIRouter()
@@ -439,6 +443,7 @@ def create_ai_key(payload: AIKeyIn, session: Session = Depends(get_session)) ->
     row = APIKey(provider=str(payload.provider).lower(), key=payload.key, is_active=bool(payload.is_active))
     session.add(row)
     session.flush()
+    provider_registry.invalidate_on_commit(session, row.provider)
 
     return {
         "id": str(row.id),
@@ -461,6 +466,7 @@ def update_ai_key(key_id: uuid.UUID, payload: AIKeyUpdateIn, session: Session =
 
     row.is_active = bool(payload.is_active)
     session.flush()
+    provider_registry.invalidate_on_commit(session, row.provider)
 
     return {
         "id": str(row.id),
@@ -479,5 +485,72 @@ def delete_ai_key(key_id: uuid.UUID, session: Session = Depends(get_session)) ->
 
     session.delete(row)
     session.flush()
+    provider_registry.invalidate_on_commit(session, row.provider)
 
     return {"deleted": True, "id": str(key_id)}
+
+
+@router.get("/ai/cache/stats")
+def get_llm_cache_stats() -> dict:
+    return llm_cache.stats()
+
+
+@router.post("/ai/cache/purge-expired")
+def purge_llm_cache() -> dict:
+    return {"deleted": llm_cache.purge_expired()}
+
+
+class AIBatchSubmitIn(BaseModel):
+    task: Literal["seo", "specs"]
+    limit: int | None = None
+    provider: Literal["openai", "local"] | None = None
+
+
+def _ai_batch_job_to_dict(job: AIBatchJob) -> dict:
+    return {
+        "id": str(job.id),
+        "provider": job.provider,
+        "task": job.task,
+        "target": job.target,
+        "model": job.model,
+        "status": job.status,
+        "remoteBatchId": job.remote_batch_id,
+        "requestCount": int(job.request_count or 0),
+        "succeededCount": int(job.succeeded_count or 0),
+        "failedCount": int(job.failed_count or 0),
+        "error": job.error,
+        "createdAt": _to_iso(job.created_at),
+        "completedAt": _to_iso(job.completed_at),
+    }
+
+
+@router.get("/ai/batches")
+def list_ai_batches(limit: int = 50, session: Session = Depends(get_session)) -> list[dict]:
+    jobs = session.scalars(select(AIBatchJob).order_by(AIBatchJob.created_at.desc()).limit(max(1, min(limit, 200)))).all()
+    return [_ai_batch_job_to_dict(job) for job in jobs]
+
+
+@router.post("/ai/batches")
+def submit_ai_batch(payload: AIBatchSubmitIn, background_tasks: BackgroundTasks) -> dict:
+    # get_session()은 session.begin() 트랜잭션 컨텍스트 안에서 yield 하므로
+    # 내부에서 commit()을 호출하는 AIBatchService 와 충돌합니다. 별도 세션으로 실행합니다.
+    provider = payload.provider or settings.ai_batch_provider
+    if provider == "local":
+        # local 은 제출 시 모든 요청을 LLM 으로 바로 처리하므로 백그라운드에서 실행합니다.
+        background_tasks.add_task(run_ai_batch_submit, session_factory, payload.task, payload.limit, provider)
+        return {"submitted": True, "job": None, "message": "로컬 AI 배치 작업이 백그라운드에서 시작되었습니다."}
+
+    with session_factory() as db:
+        try:
+            job = AIBatchService(db).submit(payload.task, limit=payload.limit, provider=provider)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if job is None:
+            return {"submitted": False, "job": None}
+        return {"submitted": True, "job": _ai_batch_job_to_dict(job)}
+
+
+@router.post("/ai/batches/poll")
+def poll_ai_batches() -> list[dict]:
+    with session_factory() as db:
+        return [_ai_batch_job_to_dict(job) for job in AIBatchService(db).poll_active()]
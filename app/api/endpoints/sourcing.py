@@ -7,6 +7,7 @@ from sqlalchemy import select
 
 from app.db import get_session
 from app.services.sourcing_service import SourcingService
+from app.services.vector_search_service import VectorSearchService
 from app.models import SourcingCandidate
 
 router = APIRouter()
@@ -86,6 +87,23 @@ def get_sourcing_candidate(candidate_id: uuid.UUID, session: Session = Depends(g
         "createdAt": row.created_at.isoformat() if row.created_at else None,
     }
 
+@router.get("/candidates/{candidate_id}/similar-benchmarks")
+def get_similar_benchmarks(
+    candidate_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    k: int = Query(default=10, ge=1, le=100),
+    market_code: str | None = Query(default=None, alias="marketCode"),
+    ef_search: int | None = Query(default=None, alias="efSearch", ge=1, le=1000),
+    probes: int | None = Query(default=None, ge=1, le=1000),
+    exact: bool = Query(default=False),
+) -> list[dict]:
+    rows = VectorSearchService(session).similar_benchmarks_for_candidate(
+        candidate_id, k=k, market_code=market_code, ef_search=ef_search, probes=probes, exact=exact
+    )
+    if rows is None:
+        raise HTTPException(status_code=404, detail="소싱 후보를 찾을 수 없습니다")
+    return rows
+
 @router.post("/keyword")
 async def trigger_keyword_sourcing(
     payload: KeywordSourceIn,
@@ -12,7 +12,9 @@ from app.models import SupplierAccount, SupplierCategoryRaw, SupplierItemRaw, Su
 from app.ownerclan_client import OwnerClanClient
 from app.settings import settings
 from app.ownerclan_sync import start_background_ownerclan_job
+from app.normalization import run_normalization_sync
 from app.session_factory import session_factory
+from app.supplier_embedding import run_supplier_embedding_sync
 
 router = APIRouter()
 
@@ -38,6 +40,16 @@ class OwnerClanItemImportIn(BaseModel):
     itemCode: str
 
 
+class SupplierEmbeddingSyncIn(BaseModel):
+    full: bool = False
+    limit: int | None = None
+
+
+class SupplierNormalizationSyncIn(BaseModel):
+    full: bool = False
+    limit: int | None = None
+
+
 def _enqueue_job(session: Session, supplier_code: str, job_type: str, params: dict) -> SupplierSyncJob:
     job = SupplierSyncJob(supplier_code=supplier_code, job_type=job_type, status="queued", params=params or {})
     session.add(job)
@@ -127,6 +139,34 @@ def trigger_ownerclan_qna(
     return {"jobId": str(job.id)}
 
 
+@router.post("/ownerclan/embeddings/sync", status_code=202)
+def trigger_ownerclan_item_embeddings(
+    payload: SupplierEmbeddingSyncIn,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """
+    변경된 오너클랜 상품만 임베딩(supplier_item_embeddings)을 갱신합니다. full=true 면 전체 카탈로그를 확인합니다.
+    """
+    background_tasks.add_task(run_supplier_embedding_sync, session_factory, "ownerclan", payload.full, payload.limit)
+    return {"status": "accepted", "message": "공급사 상품 임베딩 동기화 작업이 시작되었습니다."}
+
+
+@router.post("/ownerclan/normalize", status_code=202)
+def trigger_ownerclan_normalization(
+    payload: SupplierNormalizationSyncIn,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+) -> dict:
+    """
+    마지막 정규화 이후 수집/변경된 오너클랜 상품만 products 로 정규화합니다. full=true 면 전체 카탈로그를 확인합니다.
+    상품 수집이 진행 중이면 409 를 반환합니다(수집이 끝나면 자동으로 정규화됨).
+    """
+    _cleanup_stale_jobs(session, supplier_code="ownerclan")
+    _ensure_no_running_job(session, supplier_code="ownerclan", job_type="ownerclan_items_raw")
+    background_tasks.add_task(run_normalization_sync, session_factory, "ownerclan", payload.full, payload.limit)
+    return {"status": "accepted", "message": "공급사 상품 정규화 작업이 시작되었습니다."}
+
+
 @router.post("/ownerclan/sync/categories")
 def trigger_ownerclan_categories(
     payload: OwnerClanSyncRequestIn,
@@ -12,6 +12,23 @@ def get_supported_market_codes() -> list[str]:
     return ["COUPANG", "ELEVENST", "GMARKET", "AUCTION", "NAVER_SHOPPING"]
 
 
+def get_market_domain(market_code: str) -> str:
+    """
+    마켓 코드 → 수집 대상 도메인.
+    같은 도메인을 쓰는 수집기끼리는 동시 실행 수를 함께 제한하기 위해 사용합니다.
+    """
+    code = str(market_code or "").strip().upper()
+    if code in ("ELEVENST", "11ST", "11STREET"):
+        return "11st.co.kr"
+    if code in ("NAVER_SHOPPING", "NAVER", "NAVERSHOPPING"):
+        return "naver.com"
+    if code in ("AUCTION",):
+        return "auction.co.kr"
+    if code in ("GMARKET",):
+        return "gmarket.co.kr"
+    return "coupang.com"
+
+
 def get_benchmark_collector(market_code: str) -> BenchmarkCollector:
     code = str(market_code or "").strip().upper()
     if code in ("ELEVENST", "11ST", "11STREET"):
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import urlparse
+
+from curl_cffi.requests import AsyncSession
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HostThrottle:
+    """
+    호스트별 동시 요청 수와 최소 요청 간격을 제한합니다.
+    (같은 마켓 도메인에 과도한 요청을 보내 차단되지 않도록 하기 위함)
+    """
+
+    def __init__(self, concurrency: int | None = None, min_interval_sec: float | None = None) -> None:
+        self._concurrency = max(1, int(concurrency or settings.benchmark_host_concurrency))
+        self._min_interval = max(0.0, float(settings.benchmark_host_min_interval_sec if min_interval_sec is None else min_interval_sec))
+        self._sems: dict[str, asyncio.Semaphore] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last_started: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = urlparse(url).netloc.lower()
+        sem = self._sems.setdefault(host, asyncio.Semaphore(self._concurrency))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+
+        async with sem:
+            if self._min_interval > 0:
+                # 요청 시작 시각을 호스트별로 최소 간격만큼 벌립니다.
+                async with lock:
+                    wait = self._last_started.get(host, 0.0) + self._min_interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self._last_started[host] = time.monotonic()
+            yield
+
+
+@asynccontextmanager
+async def use_session(client: AsyncSession | None, headers: dict[str, str]) -> AsyncIterator[AsyncSession]:
+    """
+    공유 세션이 주어지면 그대로 사용하고, 없으면 호출 단위 세션을 새로 엽니다.
+    """
+    if client is not None:
+        yield client
+        return
+    async with AsyncSession(impersonate="chrome", headers=headers) as own_client:
+        yield own_client
+
+
+async def fetch(client: AsyncSession, url: str, throttle: HostThrottle | None = None) -> Any:
+    if throttle is None:
+        return await client.get(url, allow_redirects=True)
+    async with throttle.slot(url):
+        return await client.get(url, allow_redirects=True)
+
+
+async def run_detail_pipeline(
+    items: list[dict[str, Any]],
+    fetch_detail: Callable[[dict[str, Any]], Awaitable[dict[str, Any] | None]],
+    save_batch: Callable[[list[dict[str, Any]]], Awaitable[int]],
+    concurrency: int | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """
+    상세 페이지를 동시에 가져오고, 먼저 끝난 항목부터 저장 단계로 넘깁니다.
+
+    - 상세 수집은 concurrency 개까지 동시에 실행
+    - 저장은 별도 consumer 가 큐에 쌓인 항목을 batch_size 개까지 묶어 처리(임베딩 배치 요청)
+    - 상세 수집이 실패한 항목은 랭킹 정보만으로 저장
+    저장에 성공한 건수를 반환합니다.
+    """
+    if not items:
+        return 0
+
+    sem = asyncio.Semaphore(max(1, int(concurrency or settings.benchmark_detail_concurrency)))
+    max_batch = max(1, int(batch_size or settings.embedding_batch_size))
+    queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+    saved = 0
+
+    async def _produce(item: dict[str, Any]) -> None:
+        async with sem:
+            try:
+                details = await fetch_detail(item)
+                if details:
+                    item.update(details)
+            except Exception as e:
+                logger.error(f"상세 수집 실패 (url={item.get('product_url')}): {e}")
+        await queue.put(item)
+
+    async def _consume() -> None:
+        nonlocal saved
+        done = False
+        while not done:
+            item = await queue.get()
+            if item is None:
+                return
+            # 이미 큐에 도착해 있는 항목까지 한 번에 묶어서 저장합니다.
+            batch = [item]
+            while len(batch) < max_batch and not queue.empty():
+                nxt = queue.get_nowait()
+                if nxt is None:
+                    done = True
+                    break
+                batch.append(nxt)
+            try:
+                saved += int(await save_batch(batch) or 0)
+            except Exception as e:
+                ids = [b.get("product_id") for b in batch]
+                logger.error(f"벤치마크 상품 저장 실패 (productIds={ids}): {e}")
+
+    consumer = asyncio.create_task(_consume())
+    try:
+        await asyncio.gather(*[_produce(item) for item in items])
+    finally:
+        await queue.put(None)
+        await consumer
+    return saved
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_META_DESCRIPTION_SELECTOR = 'meta[property="og:description"], meta[name="description"], meta[name="og:description"]'
+_META_IMAGE_SELECTOR = (
+    'meta[property="og:image"], meta[property="og:image:secure_url"], meta[name="og:image"], '
+    'meta[property="twitter:image"], meta[name="twitter:image"], meta[itemprop="image"], link[rel="image_src"]'
+)
+
+_executor: Executor | None = None
+_executor_mode: str | None = None
+_executor_lock = threading.Lock()
+
+
+def make_soup(html: str, parser: str | None = None) -> BeautifulSoup:
+    """
+    설정된 파서(lxml 기본)로 BeautifulSoup 을 생성합니다.
+    lxml 이 설치되어 있지 않으면 html.parser 로 대체합니다.
+    """
+    name = parser or settings.benchmark_html_parser or "html.parser"
+    try:
+        return BeautifulSoup(html or "", name)
+    except FeatureNotFound:
+        return BeautifulSoup(html or "", "html.parser")
+
+
+def _get_executor() -> Executor | None:
+    global _executor, _executor_mode
+
+    mode = str(settings.benchmark_parse_executor or "process").strip().lower()
+    if mode == "inline":
+        return None
+    # 여러 스레드(백그라운드 job)가 동시에 처음 호출해도 풀은 하나만 만듭니다.
+    with _executor_lock:
+        if _executor is not None and _executor_mode == mode:
+            return _executor
+
+        if _executor is not None:
+            # 실행 방식이 바뀌면 이전 풀은 진행 중인 작업만 마치고 정리합니다.
+            _executor.shutdown(wait=False)
+        workers = max(1, int(settings.benchmark_parse_workers or (os.cpu_count() or 2)))
+        if mode == "thread":
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="benchmark-parse")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_mode = mode
+        return _executor
+
+
+async def parse_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    HTML 파싱처럼 CPU 를 오래 쓰는 작업을 이벤트 루프 밖(프로세스/스레드 풀)에서 실행합니다.
+    프로세스 풀을 쓰므로 func 는 모듈 최상위 함수여야 하고 인자/결과는 pickle 가능해야 합니다.
+    """
+    executor = _get_executor()
+    call = partial(func, *args, **kwargs)
+    if executor is None:
+        return call()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, call)
+
+
+def normalize_image_urls(urls: list[str]) -> list[str]:
+    normalized: list[str] = []
+    for u in urls:
+        if u.startswith("//"):
+            normalized.append("https:" + u)
+        else:
+            normalized.append(u)
+    return list(dict.fromkeys(normalized))
+
+
+def extract_meta_description(soup: BeautifulSoup) -> str | None:
+    for meta in soup.select(_META_DESCRIPTION_SELECTOR):
+        content = (meta.get("content") or "").strip()
+        if content:
+            return content
+    return None
+
+
+def extract_meta_images(soup: BeautifulSoup) -> list[str]:
+    image_urls: list[str] = []
+    for meta in soup.select(_META_IMAGE_SELECTOR):
+        content = (meta.get("content") or meta.get("href") or "").strip()
+        if content:
+            image_urls.append(content)
+    return image_urls
+
+
+def extract_json_ld(soup: BeautifulSoup) -> tuple[str | None, list[str]]:
+    """
+    ld+json 스크립트에서 (첫 description, image 목록)을 추출합니다.
+    """
+    json_ld_description: str | None = None
+    json_ld_images: list[str] = []
+    for script in soup.select('script[type="application/ld+json"]'):
+        raw = (script.string or script.get_text() or "").strip()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except Exception:
+            continue
+
+        candidates = data if isinstance(data, list) else [data]
+        for obj in candidates:
+            if not isinstance(obj, dict):
+                continue
+            if json_ld_description is None and isinstance(obj.get("description"), str):
+                json_ld_description = obj.get("description")
+            img = obj.get("image")
+            if isinstance(img, str):
+                json_ld_images.append(img)
+            elif isinstance(img, list):
+                for it in img:
+                    if isinstance(it, str):
+                        json_ld_images.append(it)
+    return json_ld_description, json_ld_images
+
+
+def parse_product_detail(
+    html: str,
+    detail_selectors: list[str],
+    iframe_selectors: list[str] | None = None,
+    parser: str | None = None,
+) -> dict[str, Any]:
+    """
+    상세 페이지 공통 추출(메타 설명/이미지, ld+json, 상세 영역 HTML, 상세 iframe src).
+    각 수집기는 결과를 조합해 최종 detail_html 을 결정합니다.
+    """
+    soup = make_soup(html, parser)
+
+    description = extract_meta_description(soup)
+    image_urls = extract_meta_images(soup)
+    json_ld_description, json_ld_images = extract_json_ld(soup)
+    if not image_urls and json_ld_images:
+        image_urls = json_ld_images
+    image_urls = normalize_image_urls(image_urls)
+
+    iframe_src: str | None = None
+    for selector in iframe_selectors or []:
+        node = soup.select_one(selector)
+        if node is not None:
+            iframe_src = (node.get("src") or "").strip() or None
+            break
+
+    detail_html = ""
+    for selector in detail_selectors:
+        node = soup.select_one(selector)
+        if node:
+            detail_html = str(node)
+            break
+
+    return {
+        "description": description,
+        "json_ld_description": json_ld_description,
+        "image_urls": image_urls,
+        "detail_html": detail_html,
+        "iframe_src": iframe_src,
+    }
+
+
+def parse_body_html(html: str, parser: str | None = None) -> str:
+    soup = make_soup(html, parser)
+    body = soup.body if soup.body is not None else soup
+    return str(body)
+
+
+def html_to_text(html: str, parser: str | None = None) -> str:
+    if not html:
+        return ""
+    return make_soup(html, parser).get_text(" ", strip=True)
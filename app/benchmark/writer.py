@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import case, func, literal
+from sqlalchemy.dialects.postgresql import JSONB, insert
+
+from app.models import BenchmarkProduct
+from app.session_factory import session_factory
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_benchmark_products(rows: list[dict[str, Any]]) -> int:
+    """
+    benchmark_products 를 INSERT ... ON CONFLICT (market_code, product_id) DO UPDATE 한 번으로 저장합니다.
+
+    기존 단건 저장과 같은 규칙을 유지합니다.
+    - detail_html / image_urls / embedding 은 새 값이 비어 있으면 기존 값을 유지
+    - 같은 배치에 같은 키가 여러 번 있으면 마지막 값만 사용
+    """
+    if not rows:
+        return 0
+
+    deduped: dict[tuple[str, str], dict[str, Any]] = {}
+    for row in rows:
+        deduped[(str(row["market_code"]), str(row["product_id"]))] = row
+    values = list(deduped.values())
+
+    table = BenchmarkProduct.__table__
+    stmt = insert(BenchmarkProduct).values(values)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["market_code", "product_id"],
+        set_={
+            "name": excluded.name,
+            "price": excluded.price,
+            "product_url": excluded.product_url,
+            "raw_data": excluded.raw_data,
+            "detail_html": func.coalesce(func.nullif(excluded.detail_html, ""), table.c.detail_html),
+            "image_urls": case(
+                # JSONB 컬럼은 None 이 JSON null 로 들어가므로 타입으로 판별합니다.
+                (func.coalesce(func.jsonb_typeof(excluded.image_urls), "null") != "array", table.c.image_urls),
+                (excluded.image_urls == literal([], JSONB), table.c.image_urls),
+                else_=excluded.image_urls,
+            ),
+            "embedding": func.coalesce(excluded.embedding, table.c.embedding),
+            "updated_at": func.now(),
+        },
+    )
+
+    with session_factory() as session:
+        session.execute(stmt)
+        session.commit()
+    return len(values)
+
+
+def upsert_benchmark_products_safely(rows: list[dict[str, Any]]) -> tuple[int, int]:
+    """
+    upsert_benchmark_products 를 한 번 재시도하고, 그래도 실패하면 한 건씩 저장합니다
+    (잘못된 행 하나 때문에 묶음 전체를 잃지 않도록). (저장 건수, 실패 건수) 를 반환합니다.
+    """
+    for attempt in range(2):
+        try:
+            return upsert_benchmark_products(rows), 0
+        except Exception as e:
+            logger.warning(f"벤치마크 상품 일괄 저장 실패 ({len(rows)}건, 시도 {attempt + 1}/2): {e}")
+
+    deduped: dict[tuple[str, str], dict[str, Any]] = {}
+    for row in rows:
+        deduped[(str(row["market_code"]), str(row["product_id"]))] = row
+
+    written = failed = 0
+    for key, row in deduped.items():
+        try:
+            written += upsert_benchmark_products([row])
+        except Exception as e:
+            failed += 1
+            logger.error(f"벤치마크 상품 저장 실패 (marketCode={key[0]}, productId={key[1]}): {e}")
+    return written, failed
+
+
+class BenchmarkProductWriter:
+    """
+    수집된 벤치마크 상품을 모아 두었다가 batch_size 단위로 한 번에 upsert 합니다.
+    DB 작업은 워커 스레드에서 실행해 수집(이벤트 루프)이 DB 를 기다리지 않도록 합니다.
+    """
+
+    def __init__(self, batch_size: int | None = None) -> None:
+        self._batch_size = max(1, int(batch_size or settings.benchmark_write_batch_size))
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self.written = 0
+        self.failed = 0
+
+    async def add_many(self, rows: list[dict[str, Any]]) -> int:
+        """
+        버퍼에 넣고, batch_size 에 닿아 바로 저장했다면 저장한 건수를 반환합니다(버퍼에만 넣었으면 0).
+        """
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self._batch_size:
+            return await self.flush()
+        return 0
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._buffer:
+                return 0
+            rows, self._buffer = self._buffer, []
+            written, failed = await asyncio.to_thread(upsert_benchmark_products_safely, rows)
+            self.failed += failed
+            self.written += written
+            logger.info(f"벤치마크 상품 일괄 저장: {written}건")
+            return written
@@ -1,15 +1,72 @@
 import logging
 # import httpx # Replaced by curl_cffi
 from curl_cffi.requests import AsyncSession
-from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 import asyncio
-from app.models import BenchmarkProduct
-from app.session_factory import SessionLocal
+from app.benchmark.fetcher import HostThrottle, fetch, run_detail_pipeline, use_session
+from app.benchmark.parsing import html_to_text, make_soup, parse_in_executor
+from app.benchmark.writer import BenchmarkProductWriter
 from app.embedding_service import EmbeddingService
 
 logger = logging.getLogger(__name__)
 
+
+def parse_coupang_ranking_html(html: str, limit: int, parser: str | None = None) -> List[Dict[str, Any]]:
+    soup = make_soup(html, parser)
+    product_list = soup.select("ul#productList > li")
+
+    items = []
+    for li in product_list:
+        if len(items) >= limit:
+            break
+            
+        a_tag = li.select_one("a")
+        if not a_tag:
+            continue
+            
+        product_url = "https://www.coupang.com" + a_tag["href"]
+        product_id = a_tag.get("data-item-id")
+        vendor_item_id = a_tag.get("data-vendor-item-id")
+        
+        name_tag = li.select_one("div.name")
+        name = name_tag.text.strip() if name_tag else "No Name"
+        
+        price_tag = li.select_one("strong.price-value")
+        price_str = price_tag.text.replace(",", "").strip() if price_tag else "0"
+        try:
+            price = int(price_str)
+        except ValueError:
+            price = 0
+            
+        items.append({
+            "product_id": product_id,
+            "name": name,
+            "price": price,
+            "product_url": product_url,
+            "vendor_item_id": vendor_item_id
+        })
+    return items
+
+
+def parse_coupang_detail_html(html: str, parser: str | None = None) -> Dict[str, Any]:
+    soup = make_soup(html, parser)
+    
+    # Extract Images
+    image_urls = []
+    
+    detail_div = soup.select_one("#productDetail")
+    detail_html = str(detail_div) if detail_div else ""
+    
+    if detail_div:
+         for img in detail_div.select("img"):
+             src = img.get("src") or img.get("data-src")
+             if src:
+                 if src.startswith("//"):
+                     src = "https:" + src
+                 image_urls.append(src)
+    return {"detail_html": detail_html, "image_urls": image_urls}
+
+
 class BenchmarkCollector:
     def __init__(self, market_code: str = "COUPANG"):
         self.market_code = market_code
@@ -17,9 +74,16 @@ class BenchmarkCollector:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         }
-        self.embedding_service = EmbeddingService(model="nomic-embed-text")
+        self.embedding_service = EmbeddingService()
+        self._throttle = HostThrottle()
+        self._writer = BenchmarkProductWriter()
 
-    async def collect_ranking(self, limit: int = 100, category_url: str | None = None) -> List[Dict[str, Any]]:
+    async def collect_ranking(
+        self,
+        limit: int = 100,
+        category_url: str | None = None,
+        client: AsyncSession | None = None,
+    ) -> List[Dict[str, Any]]:
         """
         Collects popular products from ranking or search page.
         """
@@ -28,9 +92,9 @@ class BenchmarkCollector:
         
         items = []
         # impersonate="chrome" does the magic
-        async with AsyncSession(impersonate="chrome", headers=self.headers) as client:
+        async with use_session(client, self.headers) as session:
             try:
-                response = await client.get(url, allow_redirects=True)
+                response = await fetch(session, url, self._throttle)
                 if response.status_code != 200:
                     logger.error(f"Failed to fetch {url}: {response.status_code}")
                     # Mock Data for testing if blocked
@@ -40,38 +104,7 @@ class BenchmarkCollector:
                         {"product_id": "67890", "name": "Mock Fridge", "price": 1200000, "product_url": "https://coupang.com/2", "vendor_item_id": "v2"},
                     ]
                 
-                soup = BeautifulSoup(response.text, "html.parser")
-                product_list = soup.select("ul#productList > li")
-                
-                for li in product_list:
-                    if len(items) >= limit:
-                        break
-                        
-                    a_tag = li.select_one("a")
-                    if not a_tag:
-                        continue
-                        
-                    product_url = "https://www.coupang.com" + a_tag["href"]
-                    product_id = a_tag.get("data-item-id")
-                    vendor_item_id = a_tag.get("data-vendor-item-id")
-                    
-                    name_tag = li.select_one("div.name")
-                    name = name_tag.text.strip() if name_tag else "No Name"
-                    
-                    price_tag = li.select_one("strong.price-value")
-                    price_str = price_tag.text.replace(",", "").strip() if price_tag else "0"
-                    try:
-                        price = int(price_str)
-                    except ValueError:
-                        price = 0
-                        
-                    items.append({
-                        "product_id": product_id,
-                        "name": name,
-                        "price": price,
-                        "product_url": product_url,
-                        "vendor_item_id": vendor_item_id
-                    })
+                items = await parse_in_executor(parse_coupang_ranking_html, response.text, limit)
                     
             except Exception as e:
                 logger.error(f"Error collecting ranking: {e}")
@@ -82,37 +115,23 @@ class BenchmarkCollector:
                 
         return items
 
-    async def collect_detail(self, product_url: str) -> Dict[str, Any]:
+    async def collect_detail(self, product_url: str, client: AsyncSession | None = None) -> Dict[str, Any]:
         """
         Fetches detail page content:
         """
-        async with AsyncSession(impersonate="chrome", headers=self.headers) as client:
+        async with use_session(client, self.headers) as session:
             try:
-                response = await client.get(product_url, allow_redirects=True)
+                response = await fetch(session, product_url, self._throttle)
                 # If mock url, response might fail or be 404.
                 if response.status_code != 200:
                     logger.error(f"Failed to fetch detail {product_url}: {response.status_code}")
                     return {"detail_html": "<div>Mock Detail</div>", "image_urls": ["http://example.com/img.jpg"]}
 
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Extract Images
-                image_urls = []
-                
-                detail_div = soup.select_one("#productDetail")
-                detail_html = str(detail_div) if detail_div else ""
-                
-                if detail_div:
-                     for img in detail_div.select("img"):
-                         src = img.get("src") or img.get("data-src")
-                         if src:
-                             if src.startswith("//"):
-                                 src = "https:" + src
-                             image_urls.append(src)
+                parsed = await parse_in_executor(parse_coupang_detail_html, response.text)
                              
                 return {
-                    "detail_html": detail_html,
-                    "image_urls": image_urls,
+                    "detail_html": parsed["detail_html"],
+                    "image_urls": parsed["image_urls"],
                     "raw_html": response.text 
                 }
 
@@ -124,6 +143,52 @@ class BenchmarkCollector:
         """
         Saves product to DB with Embedding.
         """
+        rows = await self._build_rows([product_data])
+        # 버퍼가 batch_size 에 닿으면 add_many 에서 이미 저장되므로 두 단계의 저장 건수를 합칩니다.
+        written = await self._writer.add_many(rows)
+        written += await self.flush()
+        if not written:
+            raise RuntimeError(f"벤치마크 상품 저장 실패: {product_data.get('product_id')}")
+
+    async def save_products(self, products: List[Dict[str, Any]]) -> int:
+        """
+        여러 상품의 임베딩을 배치로 생성한 뒤 저장 버퍼에 넣습니다. 넣은 건수를 반환합니다.
+        (버퍼는 benchmark_write_batch_size 마다, 그리고 flush() 호출 시 DB 에 반영됩니다)
+        """
+        rows = await self._build_rows(products)
+        # DB 저장은 writer 가 모아서 워커 스레드에서 일괄 upsert 합니다.
+        await self._writer.add_many(rows)
+        return len(rows)
+
+    async def _build_rows(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        prepared = []
+        texts = []
+        results = await asyncio.gather(*[self._prepare_product(p) for p in products])
+        for product_data, (raw_data_to_save, detail_html_to_save, text_to_embed) in zip(products, results):
+            prepared.append((product_data, raw_data_to_save, detail_html_to_save))
+            texts.append(text_to_embed)
+
+        embeddings = await self.embedding_service.generate_embeddings(texts)
+
+        return [
+            {
+                "market_code": self.market_code,
+                "product_id": str(product_data["product_id"]),
+                "name": product_data["name"],
+                "price": product_data["price"],
+                "product_url": product_data["product_url"],
+                "detail_html": detail_html_to_save,
+                "image_urls": product_data.get("image_urls") if isinstance(product_data.get("image_urls"), list) else None,
+                "raw_data": raw_data_to_save,
+                "embedding": embedding,
+            }
+            for (product_data, raw_data_to_save, detail_html_to_save), embedding in zip(prepared, embeddings)
+        ]
+
+    async def flush(self) -> int:
+        return await self._writer.flush()
+
+    async def _prepare_product(self, product_data: Dict[str, Any]) -> tuple[Dict[str, Any], str | None, str]:
         raw_data_to_save = dict(product_data)
         raw_data_to_save.pop("detail_html", None)
         raw_data_to_save.pop("image_urls", None)
@@ -140,7 +205,7 @@ class BenchmarkCollector:
         detail_text = ""
         try:
             if detail_html:
-                detail_text = BeautifulSoup(str(detail_html), "html.parser").get_text(" ", strip=True)
+                detail_text = await parse_in_executor(html_to_text, str(detail_html))
         except Exception:
             detail_text = ""
 
@@ -151,64 +216,23 @@ class BenchmarkCollector:
         raw_ranking_text = raw_ranking_text[:1000]
 
         text_to_embed = f"{product_data.get('name', '')} {detail_text[:2000]} {raw_ranking_text} {image_hint}".strip()
-        embedding = await self.embedding_service.generate_embedding(text_to_embed)
-
-        with SessionLocal() as db:
-            # Upsert
-            existing = db.query(BenchmarkProduct).filter_by(
-                market_code=self.market_code, 
-                product_id=str(product_data["product_id"])
-            ).first()
-            
-            if existing:
-                existing.name = product_data["name"]
-                existing.price = product_data["price"]
-                existing.product_url = product_data["product_url"]
-                existing.raw_data = raw_data_to_save
-                # Update details if available
-                if "detail_html" in product_data and (detail_html_to_save or ""):
-                    existing.detail_html = detail_html_to_save
-                if "image_urls" in product_data and isinstance(product_data.get("image_urls"), list) and product_data.get("image_urls"):
-                    existing.image_urls = product_data["image_urls"]
-                if embedding:
-                    existing.embedding = embedding
-            else:
-                new_item = BenchmarkProduct(
-                    market_code=self.market_code,
-                    product_id=str(product_data["product_id"]),
-                    name=product_data["name"],
-                    price=product_data["price"],
-                    product_url=product_data["product_url"],
-                    detail_html=detail_html_to_save,
-                    image_urls=product_data.get("image_urls"),
-                    raw_data=raw_data_to_save,
-                    embedding=embedding
-                )
-                db.add(new_item)
-            
-            db.commit()
-            logger.info(f"Saved benchmark product: {product_data['name']} (Embedded: {bool(embedding)})")
+        return raw_data_to_save, detail_html_to_save, text_to_embed
 
     async def run_collection_flow(self):
         """
         Main flow
         """
-        items = await self.collect_ranking(limit=5)
-        for item in items:
-            logger.info(f"Processing {item['name']}...")
-            details = await self.collect_detail(item['product_url'])
-            if details:
-                item.update(details)
-            await self.save_product(item)
-            await asyncio.sleep(1)
+        await self.run_ranking_collection(limit=5)
 
     async def run_ranking_collection(self, limit: int = 10, category_url: str | None = None):
-        items = await self.collect_ranking(limit=limit, category_url=category_url)
-        for item in items:
-            name = item.get("name") or "(no name)"
-            logger.info(f"Processing {name}...")
-            details = await self.collect_detail(str(item.get("product_url") or ""))
-            if details:
-                item.update(details)
-            await self.save_product(item)
-            await asyncio.sleep(1)
+        # job 단위로 세션 하나를 공유하고, 상세 수집은 동시 실행 + 저장은 뒤따라 파이프라인 처리
+        async with AsyncSession(impersonate="chrome", headers=self.headers) as client:
+            items = await self.collect_ranking(limit=limit, category_url=category_url, client=client)
+            try:
+                await run_detail_pipeline(
+                    items,
+                    lambda item: self.collect_detail(str(item.get("product_url") or ""), client=client),
+                    self.save_products,
+                )
+            finally:
+                await self.flush()
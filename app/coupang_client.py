@@ -9,6 +9,8 @@ from typing import Any
 
 import httpx
 
+from app.rate_limiter import RateLimiter
+
 
 class CoupangClient:
     def __init__(
@@ -17,11 +19,14 @@ class CoupangClient:
         secret_key: str,
         vendor_id: str,
         base_url: str = "https://api-gateway.coupang.com",
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
         self._access_key = access_key
         self._secret_key = secret_key
         self._vendor_id = vendor_id
         self._base_url = base_url.rstrip("/")
+        # 여러 워커가 같은 벤더 키를 공유할 때 호출 속도를 맞추기 위한 리미터
+        self._rate_limiter = rate_limiter
 
     def _build_authorization(self, method: str, path: str, query: str = "") -> str:
         """
@@ -73,6 +78,9 @@ class CoupangClient:
             "X-Requested-By": self._vendor_id,
         }
 
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
         timeout = httpx.Timeout(60.0, connect=10.0)
         with httpx.Client(timeout=timeout) as client:
             try:
@@ -86,8 +94,11 @@ class CoupangClient:
                     resp = client.delete(url, headers=headers)
                 else:
                     raise ValueError(f"Unsupported method: {method}")
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # 연결 단계 실패: 요청이 서버로 전송되지 않았으므로 재시도해도 안전합니다.
+                return 500, {"code": "CONNECT_ERROR", "message": str(e)}
             except httpx.RequestError as e:
-                # Network error, etc.
+                # Network error, etc. (요청이 이미 전송됐을 수 있음)
                 return 500, {"code": "INTERNAL_ERROR", "message": str(e)}
 
         if not resp.content:
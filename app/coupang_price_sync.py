@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.coupang_client import CoupangClient
+from app.coupang_sync import _get_client_for_account
+from app.db_iter import iter_keyset_chunks
+from app.market_routing import refresh_listing_routes
+from app.models import MarketAccount, MarketListing, MarketListingRoute, MarketProductRaw, Product, SupplierItemRaw, SupplierSyncState
+from app.normalization import calc_selling_price, calc_stock_quantity, parse_supply_price
+from app.rate_limiter import RateLimiter
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SYNC_TYPE = "coupang_price_stock"
+_CHUNK_SIZE = 1000
+_MAX_STOCK = 99999
+
+
+@dataclass
+class PriceStockSyncResult:
+    scanned: int = 0
+    listings: int = 0
+    price_updated: int = 0
+    stock_updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scanned": self.scanned,
+            "listings": self.listings,
+            "priceUpdated": self.price_updated,
+            "stockUpdated": self.stock_updated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors[:20],
+        }
+
+
+@dataclass
+class _ListingChange:
+    listing_id: uuid.UUID
+    market_item_id: str
+    vendor_item_ids: list[str]
+    price: int | None
+    stock: int | None
+    fetched_at: datetime
+
+
+def _round_price(price: int) -> int:
+    # 쿠팡 판매가는 10원 단위여야 하므로 올림 처리합니다.
+    if price <= 0:
+        return 0
+    return ((price + 9) // 10) * 10
+
+
+def _to_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _get_watermark(session: Session, account_id: uuid.UUID) -> datetime | None:
+    state = session.scalars(
+        select(SupplierSyncState)
+        .where(SupplierSyncState.supplier_code == "ownerclan")
+        .where(SupplierSyncState.sync_type == SYNC_TYPE)
+        .where(SupplierSyncState.account_id == account_id)
+    ).one_or_none()
+    if not state or state.watermark_ms is None:
+        return None
+    return datetime.fromtimestamp(state.watermark_ms / 1000, tz=timezone.utc)
+
+
+def _set_watermark(session: Session, account_id: uuid.UUID, watermark: datetime) -> None:
+    stmt = insert(SupplierSyncState).values(
+        supplier_code="ownerclan",
+        sync_type=SYNC_TYPE,
+        account_id=account_id,
+        watermark_ms=_to_ms(watermark),
+        cursor=None,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["supplier_code", "sync_type", "account_id"],
+        set_={"watermark_ms": _to_ms(watermark), "updated_at": datetime.now(timezone.utc)},
+    )
+    session.execute(stmt)
+
+
+def _extract_vendor_item_ids(raw: dict[str, Any] | None) -> list[str]:
+    items = (raw or {}).get("items")
+    if not isinstance(items, list):
+        return []
+    result: list[str] = []
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        vid = it.get("vendorItemId") or it.get("vendor_item_id")
+        if vid is not None:
+            result.append(str(vid))
+    return result
+
+
+def _load_vendor_item_ids(
+    session: Session,
+    client: CoupangClient,
+    account_id: uuid.UUID,
+    market_item_ids: list[str],
+) -> dict[str, list[str]]:
+    """
+    sellerProductId → vendorItemId 목록.
+    market_listing_routes → market_product_raw 캐시 순으로 찾고, 없을 때만 상품 조회 API를 호출해 캐시에 저장합니다.
+    """
+    result: dict[str, list[str]] = {}
+    if not market_item_ids:
+        return result
+
+    route_rows = session.execute(
+        select(MarketListingRoute.market_item_id, MarketListingRoute.vendor_item_id)
+        .where(MarketListingRoute.market_account_id == account_id)
+        .where(MarketListingRoute.market_item_id.in_(market_item_ids))
+        .where(MarketListingRoute.vendor_item_id != "")
+    ).all()
+    for market_item_id, vendor_item_id in route_rows:
+        result.setdefault(str(market_item_id), []).append(str(vendor_item_id))
+
+    rows = session.execute(
+        select(MarketProductRaw.market_item_id, MarketProductRaw.raw)
+        .where(MarketProductRaw.market_code == "COUPANG")
+        .where(MarketProductRaw.account_id == account_id)
+        .where(MarketProductRaw.market_item_id.in_(market_item_ids))
+    ).all()
+    for market_item_id, raw in rows:
+        if str(market_item_id) in result:
+            continue
+        vids = _extract_vendor_item_ids(raw)
+        if vids:
+            result[str(market_item_id)] = vids
+
+    for market_item_id in market_item_ids:
+        if market_item_id in result:
+            continue
+        code, data = client.get_product(market_item_id)
+        data_obj = data.get("data") if isinstance(data, dict) else None
+        if code != 200 or not isinstance(data_obj, dict):
+            logger.warning(f"쿠팡 상품 조회 실패 (sellerProductId={market_item_id}). HTTP: {code}, Msg: {data}")
+            continue
+
+        stmt = insert(MarketProductRaw).values(
+            market_code="COUPANG",
+            account_id=account_id,
+            market_item_id=market_item_id,
+            raw=data_obj,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["market_code", "account_id", "market_item_id"],
+            set_={"raw": stmt.excluded.raw, "fetched_at": stmt.excluded.fetched_at},
+        )
+        session.execute(stmt)
+        vids = _extract_vendor_item_ids(data_obj)
+        if vids:
+            result[market_item_id] = vids
+        refresh_listing_routes(session, account_id, market_item_ids=[market_item_id])
+
+    session.commit()
+    return result
+
+
+def _push_change(
+    client: CoupangClient,
+    change: _ListingChange,
+    force_price: bool,
+) -> tuple[bool, bool, str | None]:
+    """
+    하나의 리스팅에 속한 vendorItem 들에 가격/재고를 반영합니다.
+    (가격 반영 여부, 재고 반영 여부, 오류 메시지)를 반환합니다.
+    """
+    price_done = change.price is None
+    stock_done = change.stock is None
+
+    for vid in change.vendor_item_ids:
+        if change.stock is not None:
+            code, data = client.update_stock(vid, change.stock)
+            if code != 200 or data.get("code") not in (None, "SUCCESS", 200, "200"):
+                return False, False, f"재고 변경 실패 (vendorItemId={vid}). HTTP: {code}, Msg: {data}"
+
+        if change.price is not None and change.price > 0:
+            code, data = client.update_price(vid, change.price, force=force_price)
+            if code != 200 or data.get("code") not in (None, "SUCCESS", 200, "200"):
+                return False, change.stock is not None, f"가격 변경 실패 (vendorItemId={vid}). HTTP: {code}, Msg: {data}"
+
+    if change.stock is not None:
+        stock_done = True
+    if change.price is not None:
+        price_done = True
+    return price_done, stock_done, None
+
+
+def sync_coupang_prices_and_stock(
+    session: Session,
+    account_id: uuid.UUID,
+    full: bool = False,
+    force_price: bool = False,
+    concurrency: int | None = None,
+) -> PriceStockSyncResult:
+    """
+    오너클랜 원본(supplier_item_raw)의 가격/재고 변경분을 쿠팡 리스팅에 반영합니다.
+
+    - 마지막 실행 이후 fetched_at 이 갱신된 원본만 대상으로 합니다(full=True 면 전체).
+      동시에 진행 중인 수집이 늦게 커밋한 행을 놓치지 않도록 coupang_price_sync_overlap_min 만큼 겹쳐 읽습니다
+      (이미 반영된 리스팅은 synced_price/synced_stock 이 같아 push 하지 않음).
+    - products 의 원가/판매가를 마진 설정으로 재계산하고,
+      market_listings.synced_price/synced_stock 과 달라진 리스팅만 push 합니다.
+    - push 는 계정 단위 RateLimiter 를 공유하는 스레드 풀로 병렬 실행합니다.
+    - 실패 건이 있으면 가장 이른 실패 시점 직전까지만 watermark 를 전진시켜 다음 실행에서 재시도합니다.
+    """
+    result = PriceStockSyncResult()
+
+    account = session.get(MarketAccount, account_id)
+    if not account or account.market_code != "COUPANG":
+        raise ValueError(f"쿠팡 계정이 유효하지 않습니다: {account_id}")
+
+    workers = max(1, int(concurrency or settings.coupang_register_concurrency))
+    limiter = RateLimiter(settings.coupang_api_rate_per_sec, burst=workers)
+    client = _get_client_for_account(account, rate_limiter=limiter)
+
+    watermark = None if full else _get_watermark(session, account.id)
+
+    stmt = select(SupplierItemRaw.id, SupplierItemRaw.raw, SupplierItemRaw.fetched_at).where(
+        SupplierItemRaw.supplier_code == "ownerclan"
+    )
+    if watermark is not None:
+        overlap = timedelta(minutes=max(0, int(settings.coupang_price_sync_overlap_min)))
+        stmt = stmt.where(SupplierItemRaw.fetched_at > watermark - overlap)
+
+    max_fetched_at: datetime | None = None
+    min_failed_at: datetime | None = None
+
+    # 원본(raw JSONB)을 한꺼번에 올리지 않도록 (fetched_at, id) keyset 으로 묶음씩 읽습니다.
+    for chunk in iter_keyset_chunks(session, stmt, (SupplierItemRaw.fetched_at, SupplierItemRaw.id), chunk_size=_CHUNK_SIZE):
+        result.scanned += len(chunk)
+        max_fetched_at = chunk[-1].fetched_at
+        raw_by_id = {row.id: row for row in chunk}
+
+        # 1) products 재계산 (dropship DB)
+        products = session.scalars(select(Product).where(Product.supplier_item_id.in_(list(raw_by_id.keys())))).all()
+        if not products:
+            continue
+
+        target_by_product: dict[uuid.UUID, tuple[int, int | None, datetime]] = {}
+        for product in products:
+            row = raw_by_id.get(product.supplier_item_id)
+            if not row or not row.raw:
+                continue
+            cost = parse_supply_price(row.raw)
+            if cost <= 0:
+                continue
+            selling_price = calc_selling_price(cost)
+            if product.cost_price != cost or product.selling_price != selling_price:
+                product.cost_price = cost
+                product.selling_price = selling_price
+            target_by_product[product.id] = (_round_price(selling_price), calc_stock_quantity(row.raw), row.fetched_at)
+        session.commit()
+
+        if not target_by_product:
+            continue
+
+        # 2) 리스팅 조회 (market DB, 조인 대신 IN 조회)
+        listings = session.scalars(
+            select(MarketListing)
+            .where(MarketListing.market_account_id == account.id)
+            .where(MarketListing.product_id.in_(list(target_by_product.keys())))
+            .where(MarketListing.status == "ACTIVE")
+        ).all()
+        result.listings += len(listings)
+
+        pending: list[tuple[MarketListing, int | None, int | None, datetime]] = []
+        for listing in listings:
+            price, stock, fetched_at = target_by_product[listing.product_id]
+            if stock is not None:
+                stock = min(stock, _MAX_STOCK)
+            new_price = price if price != listing.synced_price else None
+            new_stock = stock if stock is not None and stock != listing.synced_stock else None
+            if new_price is None and new_stock is None:
+                result.skipped += 1
+                continue
+            pending.append((listing, new_price, new_stock, fetched_at))
+
+        if not pending:
+            continue
+
+        vendor_items = _load_vendor_item_ids(
+            session, client, account.id, list({listing.market_item_id for listing, _, _, _ in pending})
+        )
+
+        changes: list[_ListingChange] = []
+        for listing, new_price, new_stock, fetched_at in pending:
+            vids = vendor_items.get(listing.market_item_id) or []
+            if not vids:
+                result.failed += 1
+                result.errors.append(f"vendorItemId 를 찾을 수 없습니다 (sellerProductId={listing.market_item_id})")
+                min_failed_at = fetched_at if min_failed_at is None else min(min_failed_at, fetched_at)
+                continue
+            changes.append(
+                _ListingChange(
+                    listing_id=listing.id,
+                    market_item_id=listing.market_item_id,
+                    vendor_item_ids=vids,
+                    price=new_price,
+                    stock=new_stock,
+                    fetched_at=fetched_at,
+                )
+            )
+
+        # 3) 병렬 push
+        listing_by_id = {listing.id: listing for listing, _, _, _ in pending}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_push_change, client, change, force_price): change for change in changes}
+            for future in as_completed(futures):
+                change = futures[future]
+                try:
+                    price_done, stock_done, error = future.result()
+                except Exception as e:
+                    price_done, stock_done, error = False, False, str(e)
+
+                listing = listing_by_id[change.listing_id]
+                if stock_done and change.stock is not None:
+                    listing.synced_stock = change.stock
+                    result.stock_updated += 1
+                if price_done and change.price is not None:
+                    listing.synced_price = change.price
+                    result.price_updated += 1
+                if price_done or stock_done:
+                    listing.synced_at = datetime.now(timezone.utc)
+
+                if error:
+                    logger.error(f"쿠팡 가격/재고 반영 실패 (sellerProductId={change.market_item_id}): {error}")
+                    result.failed += 1
+                    result.errors.append(error)
+                    min_failed_at = change.fetched_at if min_failed_at is None else min(min_failed_at, change.fetched_at)
+
+        session.commit()
+
+    if max_fetched_at is None:
+        return result
+
+    if min_failed_at is not None:
+        next_watermark = datetime.fromtimestamp((_to_ms(min_failed_at) - 1) / 1000, tz=timezone.utc)
+        if watermark is None or next_watermark > watermark:
+            _set_watermark(session, account.id, next_watermark)
+    elif watermark is None or max_fetched_at > watermark:
+        _set_watermark(session, account.id, max_fetched_at)
+    session.commit()
+
+    logger.info(
+        f"쿠팡 가격/재고 동기화 완료 (scanned={result.scanned}, listings={result.listings}, "
+        f"price={result.price_updated}, stock={result.stock_updated}, failed={result.failed})"
+    )
+    return result
+
+
+def sync_active_coupang_accounts(session_factory: Any) -> None:
+    """
+    활성화된 모든 쿠팡 계정에 대해 가격/재고 변경분을 반영합니다.
+    (오너클랜 상품 수집 job 완료 후 자동 실행용)
+    """
+    with session_factory() as session:
+        account_ids = session.scalars(
+            select(MarketAccount.id).where(MarketAccount.market_code == "COUPANG", MarketAccount.is_active == True)
+        ).all()
+
+    for account_id in account_ids:
+        try:
+            with session_factory() as session:
+                sync_coupang_prices_and_stock(session, account_id)
+        except Exception as e:
+            logger.error(f"쿠팡 가격/재고 동기화 실패 (accountId={account_id}): {e}")
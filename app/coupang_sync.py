@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import logging
+import random
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 from datetime import datetime, timezone
 
+from sqlalchemy import select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
 from app.coupang_client import CoupangClient
+from app.db_iter import iter_keyset
 from app.models import (
     MarketAccount,
     MarketOrderRaw,
@@ -17,18 +23,22 @@ from app.models import (
     SupplierRawFetchLog,
     Product,
     MarketListing,
+    MarketRegistrationJob,
+    MarketRegistrationJobItem,
     SupplierAccount,
-    SupplierItemRaw,
     SupplierOrder,
     Order,
 )
+from app.market_routing import refresh_listing_routes, resolve_order_route
 from app.ownerclan_client import OwnerClanClient
+from app.rate_limiter import RateLimiter
+from app.session_factory import session_factory
 from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
-def _get_client_for_account(account: MarketAccount) -> CoupangClient:
+def _get_client_for_account(account: MarketAccount, rate_limiter: RateLimiter | None = None) -> CoupangClient:
     creds = account.credentials
     if not creds:
         raise ValueError(f"Account {account.name} has no credentials")
@@ -36,7 +46,8 @@ def _get_client_for_account(account: MarketAccount) -> CoupangClient:
     return CoupangClient(
         access_key=creds.get("access_key", ""),
         secret_key=creds.get("secret_key", ""),
-        vendor_id=creds.get("vendor_id", "")
+        vendor_id=creds.get("vendor_id", ""),
+        rate_limiter=rate_limiter,
     )
 
 
@@ -102,7 +113,8 @@ def sync_coupang_products(session: Session, account_id: uuid.UUID) -> int:
                 set_={"raw": stmt.excluded.raw, "fetched_at": stmt.excluded.fetched_at}
             )
             session.execute(stmt)
-            
+
+        _refresh_routes_safely(session, account.id, [str(p.get("sellerProductId")) for p in products])
         session.commit()
         total_processed += len(products)
         
@@ -239,7 +251,11 @@ def _log_fetch(
     pass
 
 
-def register_product(session: Session, account_id: uuid.UUID, product_id: uuid.UUID) -> bool:
+def register_product(
+    session: Session,
+    account_id: uuid.UUID,
+    product_id: uuid.UUID,
+) -> bool:
     """
     쿠팡에 상품을 등록합니다.
     성공 시 True, 실패 시 False를 반환합니다.
@@ -267,8 +283,13 @@ def register_product(session: Session, account_id: uuid.UUID, product_id: uuid.U
         logger.error("반품/출고지 센터 코드를 확인할 수 없습니다.")
         return False
 
-    # 기본 매핑
-    # 1.5 카테고리 예측
+    ok, _, _, _ = _register_product_with_client(
+        session, client, account, product, return_center_code, outbound_center_code
+    )
+    return ok
+
+
+def _predict_category_code(client: CoupangClient, product: Product) -> int:
     predicted_category_code = 77800 # 기본값 (기타/미분류 등)
     try:
         # 가공된 이름 명 또는 원본 이름 사용
@@ -291,6 +312,25 @@ def register_product(session: Session, account_id: uuid.UUID, product_id: uuid.U
             logger.warning(f"카테고리 예측 실패: Code {code}, Msg {pred_data}")
     except Exception as e:
         logger.warning(f"카테고리 예측 중 오류 발생: {e}")
+    return predicted_category_code
+
+
+def _register_product_with_client(
+    session: Session,
+    client: CoupangClient,
+    account: MarketAccount,
+    product: Product,
+    return_center_code: str,
+    outbound_center_code: str,
+    predicted_category_code: int | None = None,
+) -> tuple[bool, int, dict[str, Any], str | None]:
+    """
+    이미 준비된 클라이언트/센터 코드로 단일 상품을 등록합니다.
+    (성공 여부, HTTP 상태, 응답 본문, sellerProductId)를 반환합니다.
+    """
+    # 1.5 카테고리 예측
+    if predicted_category_code is None:
+        predicted_category_code = _predict_category_code(client, product)
 
     payload = _map_product_to_coupang_payload(product, account, return_center_code, outbound_center_code, predicted_category_code)
     
@@ -299,17 +339,30 @@ def register_product(session: Session, account_id: uuid.UUID, product_id: uuid.U
     _log_fetch(session, account, "create_product", payload, code, data)
 
     # 성공 조건: HTTP 200 이면서 body의 code가 SUCCESS
-    if code != 200 or data.get("code") != "SUCCESS":
+    if not _is_create_success(code, data):
         logger.error(f"상품 생성 실패 (ID: {product.id}). HTTP: {code}, Msg: {data}")
         # 처리 상태 업데이트
         product.processing_status = "FAILED"
         session.commit()
-        return False
+        return False, code, data, None
 
     # 3. 성공 처리
     # data['data']에 sellerProductId (등록상품ID)가 포함됨
     seller_product_id = str(data.get("data"))
-    
+    _save_registered_listing(session, account, product, seller_product_id)
+    return True, code, data, seller_product_id
+
+
+def _is_create_success(code: int, data: dict[str, Any]) -> bool:
+    return code == 200 and data.get("code") == "SUCCESS"
+
+
+def _save_registered_listing(
+    session: Session,
+    account: MarketAccount,
+    product: Product,
+    seller_product_id: str,
+) -> None:
     # MarketListing 생성 또는 업데이트
     stmt = insert(MarketListing).values(
         product_id=product.id,
@@ -322,12 +375,312 @@ def register_product(session: Session, account_id: uuid.UUID, product_id: uuid.U
         set_={"status": "ACTIVE", "linked_at": func.now()}
     )
     session.execute(stmt)
+    _refresh_routes_safely(session, account.id, [seller_product_id])
     
     product.processing_status = "COMPLETED"
     session.commit()
     
     logger.info(f"상품 등록 성공 (ID: {product.id}, sellerProductId: {seller_product_id})")
-    return True
+
+
+def _find_created_seller_product_id(
+    session: Session,
+    client: CoupangClient,
+    account: MarketAccount,
+    seller_product_name: str,
+) -> str | None:
+    """
+    응답을 받지 못한 생성 요청이 실제로 반영됐는지 sellerProductName 으로 조회합니다.
+    이미 다른 상품에 연결된 sellerProductId 는 제외합니다. 조회 실패/미발견 시 None.
+    """
+    code, data = client.get_products(seller_product_name=seller_product_name, max_per_page=50)
+    if code != 200:
+        logger.warning(f"등록 여부 확인 조회 실패. HTTP: {code}, Msg: {data}")
+        return None
+
+    candidates = [
+        str(p.get("sellerProductId"))
+        for p in (data.get("data") or [])
+        if p.get("sellerProductId") and p.get("sellerProductName") == seller_product_name
+    ]
+    if not candidates:
+        return None
+
+    linked = set(
+        session.scalars(
+            select(MarketListing.market_item_id)
+            .where(MarketListing.market_account_id == account.id)
+            .where(MarketListing.market_item_id.in_(candidates))
+        ).all()
+    )
+    unlinked = [c for c in candidates if c not in linked]
+    if not unlinked:
+        return None
+    # 같은 이름이 여럿이면 가장 최근(가장 큰 ID)에 생성된 상품을 사용합니다.
+    return max(unlinked, key=lambda c: int(c) if c.isdigit() else 0)
+
+
+def _refresh_routes_safely(session: Session, account_id: uuid.UUID, market_item_ids: list[str]) -> None:
+    # 라우팅 테이블 갱신 실패가 등록/동기화 자체를 실패시키지 않도록 합니다.
+    try:
+        with session.begin_nested():
+            refresh_listing_routes(session, account_id, market_item_ids=market_item_ids)
+    except Exception as e:
+        logger.warning(f"주문 라우팅 갱신 실패 (sellerProductIds={market_item_ids[:5]}): {e}")
+
+
+def _is_retryable_status(code: int, data: dict[str, Any]) -> bool:
+    # 상품 생성(POST)은 멱등이 아니므로, 요청이 처리되지 않았음이 확실한 경우만 재전송합니다.
+    # - 429: 레이트리밋으로 거절됨
+    # - CONNECT_ERROR: 연결 단계 실패로 요청이 전송되지 않음
+    return code == 429 or data.get("code") == "CONNECT_ERROR"
+
+
+def _is_ambiguous_status(code: int, data: dict[str, Any]) -> bool:
+    # 5xx/타임아웃: 쿠팡에는 이미 생성됐을 수 있으므로 재전송하지 않고 조회로 확인합니다.
+    return code >= 500 and not _is_retryable_status(code, data)
+
+
+def run_coupang_bulk_registration_job(job_id: uuid.UUID) -> None:
+    """
+    대량 등록 작업을 실행합니다.
+
+    - 센터 코드는 작업당 1회만 조회합니다.
+    - 워커 스레드 N개가 상품을 병렬로 등록하며, 모든 API 호출은 계정 단위 RateLimiter를 거칩니다.
+    - 429/연결 실패(요청 미전송)만 지수 백오프(지터 포함)로 재시도합니다.
+      5xx/타임아웃은 생성 여부가 불확실하므로 재전송하지 않고 sellerProductName 조회로 확인합니다.
+    - 상품별 결과는 market_registration_job_items 에 남아 실패 건만 재시도할 수 있습니다.
+    """
+    with session_factory() as session:
+        job = session.get(MarketRegistrationJob, job_id)
+        if not job:
+            logger.error(f"대량 등록 작업을 찾을 수 없습니다: {job_id}")
+            return
+
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        job.finished_at = None
+        job.last_error = None
+        session.commit()
+
+        account = session.get(MarketAccount, job.account_id)
+        params = dict(job.params or {})
+        product_ids = session.scalars(
+            select(MarketRegistrationJobItem.product_id)
+            .where(MarketRegistrationJobItem.job_id == job_id)
+            .where(MarketRegistrationJobItem.status != "succeeded")
+        ).all()
+
+        def _fail_job(message: str) -> None:
+            logger.error(message)
+            job.status = "failed"
+            job.last_error = message
+            job.finished_at = datetime.now(timezone.utc)
+            session.commit()
+
+        if not account or account.market_code != "COUPANG":
+            _fail_job(f"쿠팡 등록을 위한 계정이 유효하지 않습니다: {job.account_id}")
+            return
+
+        concurrency = max(1, int(params.get("concurrency") or settings.coupang_register_concurrency))
+        limiter = RateLimiter(settings.coupang_api_rate_per_sec, burst=concurrency)
+
+        try:
+            client = _get_client_for_account(account, rate_limiter=limiter)
+        except Exception as e:
+            _fail_job(f"클라이언트 초기화 실패: {e}")
+            return
+
+        return_center_code, outbound_center_code = _get_default_centers(client)
+        if not return_center_code or not outbound_center_code:
+            _fail_job("반품/출고지 센터 코드를 확인할 수 없습니다.")
+            return
+
+        account_id = account.id
+
+    max_attempts = max(1, int(settings.coupang_register_max_attempts))
+    backoff_sec = float(settings.coupang_register_backoff_sec)
+    progress_lock = threading.Lock()
+
+    def _update_item(product_id: uuid.UUID, **values: Any) -> None:
+        with session_factory() as item_session:
+            item_session.execute(
+                update(MarketRegistrationJobItem)
+                .where(MarketRegistrationJobItem.job_id == job_id)
+                .where(MarketRegistrationJobItem.product_id == product_id)
+                .values(**values)
+            )
+            item_session.commit()
+
+    def _register_one(product_id: uuid.UUID) -> bool:
+        _update_item(product_id, status="running")
+        attempts = 0
+        code: int | None = None
+        data: dict[str, Any] = {}
+        seller_product_id: str | None = None
+
+        with session_factory() as worker_session:
+            account_row = worker_session.get(MarketAccount, account_id)
+            product = worker_session.get(Product, product_id)
+            if not product:
+                _update_item(product_id, status="failed", last_error="상품을 찾을 수 없습니다.")
+                return False
+
+            item = worker_session.scalars(
+                select(MarketRegistrationJobItem)
+                .where(MarketRegistrationJobItem.job_id == job_id)
+                .where(MarketRegistrationJobItem.product_id == product_id)
+            ).first()
+            attempts = int(item.attempts or 0) if item else 0
+
+            try:
+                # 카테고리 예측/페이로드는 상품당 1회만 만듭니다.
+                predicted_category_code = _predict_category_code(client, product)
+                payload = _map_product_to_coupang_payload(
+                    product, account_row, return_center_code, outbound_center_code, predicted_category_code
+                )
+                seller_product_name = payload["sellerProductName"]
+
+                if item and item.market_item_id:
+                    # 이전 실행에서 쿠팡 등록은 됐지만 저장에 실패한 건: 다시 생성하지 않습니다.
+                    seller_product_id = item.market_item_id
+                elif item and item.http_status and _is_ambiguous_status(int(item.http_status), {}):
+                    # 이전 실행에서 결과가 불확실했던 건: 재전송 전에 이미 생성됐는지 확인합니다.
+                    seller_product_id = _find_created_seller_product_id(
+                        worker_session, client, account_row, seller_product_name
+                    )
+            except Exception as e:
+                worker_session.rollback()
+                _update_item(product_id, status="failed", last_error=f"등록 준비 실패: {e}"[:2000])
+                return False
+
+            tries = 0
+            while seller_product_id is None:
+                attempts += 1
+                tries += 1
+                try:
+                    code, data = client.create_product(payload)
+                except Exception as e:
+                    # 전송 여부를 알 수 없으므로 타임아웃과 같이 취급합니다.
+                    code, data = 500, {"code": "INTERNAL_ERROR", "message": str(e)}
+                _log_fetch(worker_session, account_row, "create_product", payload, code, data)
+
+                if _is_create_success(code, data):
+                    seller_product_id = str(data.get("data"))
+                    break
+
+                if _is_ambiguous_status(code, data):
+                    seller_product_id = _find_created_seller_product_id(
+                        worker_session, client, account_row, seller_product_name
+                    )
+                    if seller_product_id:
+                        logger.warning(
+                            f"쿠팡 등록 응답 실패였지만 생성 확인됨 (productId={product_id}, HTTP: {code}, sellerProductId={seller_product_id})"
+                        )
+                        break
+                    logger.error(f"쿠팡 등록 결과 불확실 (productId={product_id}). HTTP: {code}, Msg: {data}")
+                    _update_item(
+                        product_id,
+                        status="failed",
+                        attempts=attempts,
+                        http_status=code,
+                        last_error=f"등록 여부 확인 불가(재전송하지 않음): {data}"[:2000],
+                    )
+                    return False
+
+                if not _is_retryable_status(code, data) or tries >= max_attempts:
+                    logger.error(f"상품 생성 실패 (ID: {product_id}). HTTP: {code}, Msg: {data}")
+                    product.processing_status = "FAILED"
+                    worker_session.commit()
+                    _update_item(
+                        product_id, status="failed", attempts=attempts, http_status=code, last_error=str(data)[:2000]
+                    )
+                    return False
+
+                delay = backoff_sec * (2 ** (tries - 1))
+                delay += random.uniform(0, delay)
+                logger.warning(
+                    f"쿠팡 등록 재시도 대기 (productId={product_id}, HTTP: {code}, attempt={attempts}, wait={delay:.1f}s)"
+                )
+                time.sleep(delay)
+
+            try:
+                _save_registered_listing(worker_session, account_row, product, seller_product_id)
+            except Exception as e:
+                # 쿠팡에는 이미 생성됐으므로 재전송 대상이 아닙니다. sellerProductId 를 남겨 저장만 다시 하게 합니다.
+                worker_session.rollback()
+                logger.error(f"쿠팡 등록 후 저장 실패 (productId={product_id}, sellerProductId={seller_product_id}): {e}")
+                _update_item(
+                    product_id,
+                    status="failed",
+                    attempts=attempts,
+                    http_status=code,
+                    market_item_id=seller_product_id,
+                    last_error=f"쿠팡 등록 후 저장 실패: {e}"[:2000],
+                )
+                return False
+
+        _update_item(
+            product_id,
+            status="succeeded",
+            attempts=attempts,
+            http_status=code,
+            market_item_id=seller_product_id,
+            last_error=None,
+        )
+        return True
+
+    def _report_progress() -> None:
+        # 재시도 작업에서도 이전 성공 건이 반영되도록 항목 테이블 기준으로 집계합니다.
+        with progress_lock, session_factory() as progress_session:
+            counts = dict(
+                progress_session.execute(
+                    select(MarketRegistrationJobItem.status, func.count())
+                    .where(MarketRegistrationJobItem.job_id == job_id)
+                    .group_by(MarketRegistrationJobItem.status)
+                ).all()
+            )
+            job_row = progress_session.get(MarketRegistrationJob, job_id)
+            if not job_row:
+                return
+            done = int(counts.get("succeeded", 0)) + int(counts.get("failed", 0))
+            job_row.succeeded = int(counts.get("succeeded", 0))
+            job_row.failed = int(counts.get("failed", 0))
+            job_row.progress = int((done / job_row.total) * 100) if job_row.total else 100
+            progress_session.commit()
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(_register_one, pid) for pid in product_ids]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"대량 등록 워커 오류: {e}")
+                _report_progress()
+    except Exception as e:
+        logger.error(f"대량 등록 작업 실패 (jobId={job_id}): {e}")
+        with session_factory() as session:
+            job = session.get(MarketRegistrationJob, job_id)
+            if job:
+                job.status = "failed"
+                job.last_error = str(e)
+                job.finished_at = datetime.now(timezone.utc)
+                session.commit()
+        return
+
+    _report_progress()
+    with session_factory() as session:
+        job = session.get(MarketRegistrationJob, job_id)
+        if job:
+            job.status = "succeeded" if job.failed == 0 else "failed"
+            job.last_error = None if job.failed == 0 else f"{job.failed}건 등록 실패"
+            job.progress = 100
+            job.finished_at = datetime.now(timezone.utc)
+            session.commit()
+            logger.info(
+                f"쿠팡 대량 등록 완료 (jobId={job_id}, total={job.total}, succeeded={job.succeeded}, failed={job.failed})"
+            )
 
 
 def fulfill_coupang_orders_via_ownerclan(
@@ -344,7 +697,7 @@ def fulfill_coupang_orders_via_ownerclan(
     쿠팡 발주서(주문) → 오너클랜 주문 생성(발주) 연동.
 
     - 1) 쿠팡 ordersheets(raw) 수집(업서트)
-    - 2) MarketListing(sellerProductId) → Product → SupplierItemRaw.item_code 매핑
+    - 2) market_listing_routes(sellerProductId/vendorItemId) → 오너클랜 item_code 매핑
     - 3) OwnerClan POST /v1/order 호출
     - 4) Order/ SupplierOrder 레코드로 연결
     """
@@ -388,17 +741,20 @@ def fulfill_coupang_orders_via_ownerclan(
         access_token=owner.access_token,
     )
 
-    # 2) 수집된 MarketOrderRaw 기준 처리
-    q = (
-        session.query(MarketOrderRaw)
-        .filter(MarketOrderRaw.market_code == "COUPANG")
-        .filter(MarketOrderRaw.account_id == coupang_account_id)
-        .order_by(MarketOrderRaw.fetched_at.desc())
+    # 2) 수집된 MarketOrderRaw 기준 처리 (최신 수집 순, 전체를 메모리에 올리지 않도록 keyset 으로 묶음씩 읽음)
+    stmt = (
+        select(MarketOrderRaw.id, MarketOrderRaw.order_id, MarketOrderRaw.fetched_at, MarketOrderRaw.raw)
+        .where(MarketOrderRaw.market_code == "COUPANG")
+        .where(MarketOrderRaw.account_id == coupang_account_id)
+    )
+    rows = iter_keyset(
+        session,
+        stmt,
+        (MarketOrderRaw.fetched_at, MarketOrderRaw.id),
+        chunk_size=200,
+        descending=True,
+        limit=limit if limit and limit > 0 else None,
     )
-    if limit and limit > 0:
-        q = q.limit(limit)
-
-    rows = q.all()
     for row in rows:
         processed += 1
         raw = row.raw or {}
@@ -427,35 +783,20 @@ def fulfill_coupang_orders_via_ownerclan(
             failures.append({"orderSheetId": order_sheet_id, "reason": "sellerProductId를 찾을 수 없습니다"})
             continue
 
-        listing = (
-            session.query(MarketListing)
-            .filter(MarketListing.market_account_id == coupang_account_id)
-            .filter(MarketListing.market_item_id == str(seller_product_id))
-            .one_or_none()
-        )
-        if not listing:
+        vendor_item_id = raw.get("vendorItemId") or (first_item.get("vendorItemId") if isinstance(first_item, dict) else None)
+        route = resolve_order_route(session, coupang_account_id, str(seller_product_id), vendor_item_id)
+        if not route:
             skipped += 1
             skipped_details.append(
                 {
                     "orderSheetId": order_sheet_id,
-                    "reason": f"MarketListing 없음(sellerProductId={seller_product_id})",
+                    "reason": f"주문 라우트 없음(MarketListing 또는 공급사 매핑 없음, sellerProductId={seller_product_id})",
                     "sellerProductName": (first_item.get("sellerProductName") if isinstance(first_item, dict) else None) or raw.get("sellerProductName"),
                 }
             )
             continue
 
-        product = session.get(Product, listing.product_id)
-        if not product or not product.supplier_item_id:
-            failed += 1
-            failures.append({"orderSheetId": order_sheet_id, "reason": "Product 또는 supplier_item_id 매핑이 없습니다"})
-            continue
-
-        supplier_item = session.get(SupplierItemRaw, product.supplier_item_id)
-        product_code = (supplier_item.item_code if supplier_item else None) or (supplier_item.item_key if supplier_item else None)
-        if not product_code:
-            failed += 1
-            failures.append({"orderSheetId": order_sheet_id, "reason": "오너클랜 product_code(item_code)가 없습니다"})
-            continue
+        product_code = route.item_code
 
         quantity = (
             raw.get("orderCount")
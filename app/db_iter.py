@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Iterator, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session
+
+
+def _key_values(row: Any, keys: Sequence[Any], scalars: bool) -> tuple:
+    if scalars:
+        return tuple(getattr(row, key.key) for key in keys)
+    return tuple(row._mapping[key] for key in keys)
+
+
+def iter_keyset_chunks(
+    session: Session,
+    stmt: Select,
+    keys: Sequence[Any],
+    chunk_size: int = 1000,
+    descending: bool = False,
+    limit: int | None = None,
+    scalars: bool = False,
+) -> Iterator[list]:
+    """
+    큰 테이블을 keyset 페이지네이션으로 chunk_size 개씩 읽어 리스트로 돌려줍니다(메모리는 한 묶음 크기로 고정).
+
+    - keys 는 행을 유일하게 정하는 컬럼 조합이어야 합니다. 예) (Model.created_at, Model.id)
+      stmt 의 select 목록(scalars=False)이나 엔티티(scalars=True)에서 읽을 수 있어야 합니다.
+    - 매 묶음은 (keys) > 마지막 값 조건의 새 쿼리이므로 OFFSET 없이 인덱스를 타고,
+      묶음 사이에 호출자가 커밋해도 됩니다(하나의 서버 사이드 커서를 열어 두면 커밋 시 커서가 닫힘).
+    - 한 묶음은 yield_per 로 서버 사이드 커서에서 스트리밍해 읽습니다.
+    - stmt 에는 order_by/limit 을 넣지 않습니다(여기서 keys 순서로 붙임). 시작 위치는 stmt 의 where 로 지정합니다.
+    """
+    chunk_size = max(1, int(chunk_size))
+    last: tuple | None = None
+    remaining = None if limit is None else max(0, int(limit))
+    order_by = [key.desc() for key in keys] if descending else list(keys)
+
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        page = stmt.order_by(*order_by).limit(size).execution_options(yield_per=size)
+        if last is not None:
+            page = page.where(tuple_(*keys) < last if descending else tuple_(*keys) > last)
+
+        result = session.scalars(page) if scalars else session.execute(page)
+        chunk = list(result)
+        if not chunk:
+            return
+
+        last = _key_values(chunk[-1], keys, scalars)
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+        if len(chunk) < size:
+            return
+
+
+def iter_keyset(
+    session: Session,
+    stmt: Select,
+    keys: Sequence[Any],
+    chunk_size: int = 1000,
+    descending: bool = False,
+    limit: int | None = None,
+    scalars: bool = False,
+) -> Iterator[Any]:
+    """
+    iter_keyset_chunks 를 한 행씩 풀어 돌려줍니다.
+    """
+    for chunk in iter_keyset_chunks(session, stmt, keys, chunk_size, descending, limit, scalars):
+        yield from chunk
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import EmbeddingCache as EmbeddingCacheRow
+from app.session_factory import session_factory
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    (model, sha256(text)) 기준 임베딩 캐시.
+
+    - 1차: 프로세스 메모리 LRU(float32 array 로 압축 저장, 항목 수와 바이트 수로 제한)
+    - 2차: embedding_cache 테이블(재시작/다른 워커와 공유)
+    DB 조회/저장 실패는 캐시 미스로 취급하고 임베딩 생성을 막지 않습니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        persist: bool | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self._max_entries = max(0, int(settings.embedding_cache_size if max_entries is None else max_entries))
+        if max_bytes is None:
+            max_bytes = int(float(settings.embedding_cache_max_mb) * 1024 * 1024)
+        self._max_bytes = max(0, int(max_bytes))
+        self._persist = bool(settings.embedding_cache_persist if persist is None else persist)
+        # list[float] 는 원소당 ~32바이트(float 객체+포인터)라 768차원 2만 건이면 0.5GB 가까이 되므로
+        # float32 array(원소당 4바이트)로 보관하고 읽을 때 list 로 풉니다.
+        self._lru: OrderedDict[tuple[str, str], array] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"memoryHits": 0, "dbHits": 0, "misses": 0, "stored": 0, "dbErrors": 0}
+
+    def _remember(self, key: tuple[str, str], embedding: list[float]) -> None:
+        if self._max_entries <= 0 or self._max_bytes <= 0:
+            return
+        packed = array("f", embedding)
+        size = packed.itemsize * len(packed)
+        with self._lock:
+            old = self._lru.pop(key, None)
+            if old is not None:
+                self._bytes -= old.itemsize * len(old)
+            self._lru[key] = packed
+            self._bytes += size
+            while self._lru and (len(self._lru) > self._max_entries or self._bytes > self._max_bytes):
+                _, evicted = self._lru.popitem(last=False)
+                self._bytes -= evicted.itemsize * len(evicted)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        if n <= 0:
+            return
+        with self._lock:
+            self._stats[name] += n
+
+    def get_many(self, model: str, texts: list[str]) -> dict[int, list[float]]:
+        """
+        캐시에 있는 항목만 {입력 인덱스: 임베딩} 으로 반환합니다.
+        """
+        found: dict[int, list[float]] = {}
+        pending: dict[str, list[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                if not text:
+                    continue
+                key = (model, text_hash(text))
+                packed = self._lru.get(key)
+                if packed is not None:
+                    self._lru.move_to_end(key)
+                    found[i] = packed.tolist()
+                else:
+                    pending.setdefault(key[1], []).append(i)
+        self._count("memoryHits", len(found))
+
+        if pending and self._persist:
+            db_found = self._load_from_db(model, list(pending.keys()))
+            for h, emb in db_found.items():
+                self._remember((model, h), emb)
+                for i in pending.pop(h, []):
+                    found[i] = emb
+                    self._count("dbHits")
+
+        self._count("misses", sum(len(v) for v in pending.values()))
+        return found
+
+    def put_many(self, model: str, items: list[tuple[str, list[float]]]) -> None:
+        rows: dict[str, list[float]] = {}
+        for text, emb in items:
+            if not text or not emb:
+                continue
+            h = text_hash(text)
+            emb = [float(x) for x in emb]
+            self._remember((model, h), emb)
+            rows[h] = emb
+        if not rows:
+            return
+        self._count("stored", len(rows))
+
+        if self._persist:
+            self._save_to_db(model, rows)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["memoryEntries"] = len(self._lru)
+            out["memoryBytes"] = self._bytes
+        lookups = out["memoryHits"] + out["dbHits"] + out["misses"]
+        out["hitRate"] = (out["memoryHits"] + out["dbHits"]) / lookups if lookups else 0.0
+        out["maxEntries"] = self._max_entries
+        out["maxBytes"] = self._max_bytes
+        out["persist"] = self._persist
+        return out
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+
+    def _load_from_db(self, model: str, hashes: list[str]) -> dict[str, list[float]]:
+        try:
+            with session_factory() as session:
+                rows = session.execute(
+                    select(EmbeddingCacheRow.text_hash, EmbeddingCacheRow.embedding)
+                    .where(EmbeddingCacheRow.model == model)
+                    .where(EmbeddingCacheRow.text_hash.in_(hashes))
+                ).all()
+                found = {h: emb for h, emb in rows if isinstance(emb, list) and emb}
+                if found:
+                    session.execute(
+                        update(EmbeddingCacheRow)
+                        .where(tuple_(EmbeddingCacheRow.model, EmbeddingCacheRow.text_hash).in_([(model, h) for h in found]))
+                        .values(last_used_at=func.now())
+                    )
+                    session.commit()
+                return found
+        except Exception as e:
+            self._count("dbErrors")
+            logger.warning(f"임베딩 캐시 조회 실패: {e}")
+            return {}
+
+    def _save_to_db(self, model: str, rows: dict[str, list[float]]) -> None:
+        try:
+            with session_factory() as session:
+                stmt = insert(EmbeddingCacheRow).values(
+                    [
+                        {"model": model, "text_hash": h, "embedding": emb, "dimensions": len(emb)}
+                        for h, emb in rows.items()
+                    ]
+                )
+                stmt = stmt.on_conflict_do_nothing(index_elements=["model", "text_hash"])
+                session.execute(stmt)
+                session.commit()
+        except Exception as e:
+            self._count("dbErrors")
+            logger.warning(f"임베딩 캐시 저장 실패: {e}")
+
+
+embedding_cache = EmbeddingCache()
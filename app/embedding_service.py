@@ -1,13 +1,58 @@
+import asyncio
 import logging
 import httpx
 from typing import List, Optional
 
+from app.embedding_cache import EmbeddingCache, embedding_cache
+from app.settings import settings
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingService:
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "nomic-embed-text"):
-        self.base_url = base_url
-        self.model = model
+    def __init__(self, base_url: str | None = None, model: str | None = None, cache: EmbeddingCache | None = None):
+        self.base_url = base_url or settings.ollama_base_url
+        self.model = model or settings.embedding_model
+        self.cache = cache if cache is not None else (embedding_cache if settings.embedding_cache_enabled else None)
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._batch_supported = True
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        커넥션 재사용을 위해 클라이언트를 유지합니다.
+        백그라운드 job 마다 asyncio.run 으로 루프가 바뀌므로, 루프가 달라지면 이전 클라이언트를 닫고 새로 만듭니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed and self._client_loop is not loop:
+            stale, self._client = self._client, None
+            try:
+                await stale.aclose()
+            except Exception as e:
+                # 이전 루프가 이미 닫혔으면 소켓 정리가 실패할 수 있습니다(참조는 이미 끊음).
+                logger.debug(f"이전 임베딩 클라이언트 정리 실패: {e}")
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=settings.embedding_timeout_sec)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    def generate_embeddings_sync(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        generate_embeddings 의 동기 호출용(이벤트 루프 밖에서만 사용). 끝나면 이번 루프의 클라이언트를 닫습니다.
+        """
+
+        async def _once() -> List[Optional[List[float]]]:
+            try:
+                return await self.generate_embeddings(texts)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_once())
 
     async def generate_embedding(self, text: str) -> Optional[List[float]]:
         """
@@ -15,23 +60,105 @@ class EmbeddingService:
         """
         if not text:
             return None
-        
+        return (await self.generate_embeddings([text]))[0]
+
+    async def _embed_one(self, text: str) -> Optional[List[float]]:
         url = f"{self.base_url}/api/embeddings"
         payload = {
             "model": self.model,
             "prompt": text
         }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, json=payload)
-                if response.status_code != 200:
-                    logger.error(f"Ollama embedding failed: {response.status_code} {response.text}")
-                    return None
-                
-                data = response.json()
-                return data.get("embedding")
-                
-            except Exception as e:
-                logger.error(f"Error generating embedding: {e}")
+
+        try:
+            client = await self._get_client()
+            response = await client.post(url, json=payload)
+            if response.status_code != 200:
+                logger.error(f"Ollama embedding failed: {response.status_code} {response.text}")
+                return None
+
+            data = response.json()
+            return data.get("embedding")
+
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            return None
+
+    async def generate_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> List[Optional[List[float]]]:
+        """
+        여러 텍스트를 Ollama /api/embed 배치 요청으로 임베딩합니다.
+
+        - 결과는 입력 순서를 유지하며, 빈 텍스트/실패 항목은 None
+        - 배치 요청이 실패하면 해당 배치만 단건 요청으로 재시도
+        - /api/embed 를 지원하지 않는 구버전 Ollama 는 단건 요청으로 대체
+        - 캐시(메모리 LRU → DB)에 있는 텍스트는 모델을 호출하지 않음
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        indexes = [i for i, t in enumerate(texts) if t]
+        if not indexes:
+            return results
+
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get_many, self.model, texts)
+            for i, emb in cached.items():
+                results[i] = emb
+            indexes = [i for i in indexes if i not in cached]
+            if not indexes:
+                return results
+
+        size = max(1, int(batch_size or settings.embedding_batch_size))
+        sem = asyncio.Semaphore(max(1, int(concurrency or settings.embedding_concurrency)))
+        batches = [indexes[i:i + size] for i in range(0, len(indexes), size)]
+
+        async def _run(batch: list[int]) -> None:
+            async with sem:
+                embeddings = await self._embed_batch([texts[i] for i in batch])
+                if embeddings is None:
+                    for i in batch:
+                        results[i] = await self._embed_one(texts[i])
+                    return
+                for i, emb in zip(batch, embeddings):
+                    results[i] = emb
+
+        await asyncio.gather(*[_run(b) for b in batches])
+
+        if self.cache is not None:
+            fresh = [(texts[i], results[i]) for i in indexes if results[i]]
+            if fresh:
+                await asyncio.to_thread(self.cache.put_many, self.model, fresh)
+        return results
+
+    async def _embed_batch(self, texts: List[str]) -> Optional[List[Optional[List[float]]]]:
+        if not self._batch_supported:
+            return None
+
+        url = f"{self.base_url}/api/embed"
+        payload = {
+            "model": self.model,
+            "input": texts,
+        }
+
+        try:
+            client = await self._get_client()
+            response = await client.post(url, json=payload)
+            if response.status_code == 404 and "model" not in response.text:
+                logger.warning("Ollama /api/embed 미지원: 단건 임베딩 요청으로 대체합니다")
+                self._batch_supported = False
                 return None
+            if response.status_code != 200:
+                logger.error(f"Ollama 배치 임베딩 실패: HTTP {response.status_code} {response.text}")
+                return None
+
+            embeddings = response.json().get("embeddings")
+            if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                logger.error("Ollama 배치 임베딩 응답 개수 불일치")
+                return None
+            return [emb if isinstance(emb, list) and emb else None for emb in embeddings]
+
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings: {e}")
+            return None
@@ -7,12 +7,11 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List
 
-from supabase import create_client
-
 from app.db import engine, get_session
 from app.models import Base, Embedding, SupplierAccount, SupplierSyncJob
 from app.ownerclan_client import OwnerClanClient
 from app.ownerclan_sync import start_background_ownerclan_job
+from app.services.storage_service import storage_service
 from app.session_factory import session_factory
 from app.settings import settings
 from app.api.endpoints import sourcing, products, coupang, settings as settings_endpoint, suppliers as suppliers_endpoint, benchmarks
@@ -74,6 +73,11 @@ def on_startup() -> None:
         Base.metadata.create_all(bind=engine)
 
 
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await storage_service.aclose()
+
+
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
@@ -105,7 +109,7 @@ class OwnerClanSyncRequestIn(BaseModel):
 
 @app.post("/images")
 async def upload_image(file: UploadFile = File(...)) -> dict:
-    if not settings.supabase_service_role_key:
+    if not storage_service.enabled:
         raise HTTPException(status_code=500, detail="SUPABASE_SERVICE_ROLE_KEY가 설정되어 있지 않습니다")
 
     content_type = file.content_type or "application/octet-stream"
@@ -126,18 +130,12 @@ async def upload_image(file: UploadFile = File(...)) -> dict:
 
     object_path = f"uploads/{uuid.uuid4().hex}{ext}"
 
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
-    result = supabase.storage.from_(settings.supabase_bucket).upload(
-        object_path,
-        data,
-        file_options={"content-type": content_type, "upsert": False},
-    )
-
-    if getattr(result, "error", None):
-        raise HTTPException(status_code=500, detail=f"이미지 업로드 실패: {result.error}")
+    # 프로세스 공용 커넥션 풀로 업로드합니다(요청마다 클라이언트를 만들지 않음).
+    public_url = await storage_service.aupload(object_path, data, content_type)
+    if public_url is None:
+        raise HTTPException(status_code=500, detail="이미지 업로드 실패")
 
-    public_url = f"{settings.supabase_url}/storage/v1/object/public/{settings.supabase_bucket}/{object_path}"
-    return {"bucket": settings.supabase_bucket, "path": object_path, "publicUrl": public_url}
+    return {"bucket": storage_service.bucket, "path": object_path, "publicUrl": public_url}
 
 
 @app.post("/ownerclan/accounts/primary")
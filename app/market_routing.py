@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import delete, not_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import MarketListing, MarketListingRoute, MarketProductRaw, Product, SupplierItemRaw
+
+logger = logging.getLogger(__name__)
+
+
+def _vendor_items(raw: dict[str, Any] | None) -> list[dict[str, Any]]:
+    items = (raw or {}).get("items")
+    if not isinstance(items, list):
+        return []
+    return [it for it in items if isinstance(it, dict) and (it.get("vendorItemId") or it.get("vendor_item_id")) is not None]
+
+
+def _option_label(option: dict[str, Any]) -> str:
+    attrs = option.get("optionAttributes") if isinstance(option.get("optionAttributes"), list) else []
+    return " ".join(str(a.get("value") or "").strip() for a in attrs if isinstance(a, dict)).strip()
+
+
+def _valid_options(raw: dict[str, Any] | None) -> list[dict[str, Any]]:
+    options = (raw or {}).get("options") if isinstance(raw, dict) else None
+    if not isinstance(options, list):
+        return []
+    return [o for o in options if isinstance(o, dict) and o.get("key") is not None]
+
+
+def _match_option_key(vendor_item: dict[str, Any] | None, options: list[Any]) -> str | None:
+    """
+    쿠팡 vendorItem 에 대응하는 오너클랜 옵션 key 를 찾습니다.
+    - 옵션이 하나면 그 옵션
+    - 여러 개면 itemName 에 옵션 값이 포함된 것 중 가장 구체적인(긴) 옵션
+    """
+    valid = [o for o in options if isinstance(o, dict) and o.get("key") is not None]
+    if not valid:
+        return None
+    if len(valid) == 1:
+        return str(valid[0]["key"])
+    if not vendor_item:
+        return None
+
+    item_name = str(vendor_item.get("itemName") or "")
+    best: tuple[int, str] | None = None
+    for opt in valid:
+        label = _option_label(opt)
+        if label and label in item_name:
+            if best is None or len(label) > best[0]:
+                best = (len(label), str(opt["key"]))
+    return best[1] if best else None
+
+
+def refresh_listing_routes(
+    session: Session,
+    account_id: uuid.UUID,
+    market_item_ids: list[str] | None = None,
+    product_ids: list[uuid.UUID] | None = None,
+) -> int:
+    """
+    market_listings 기준으로 market_listing_routes 를 다시 계산해 업서트합니다.
+
+    - market_item_ids/product_ids 를 주면 해당 리스팅만, 둘 다 없으면 계정 전체를 갱신합니다.
+    - vendorItemId 는 market_product_raw 캐시에서 읽고, 아직 모르면 vendor_item_id="" 로 저장합니다.
+    - 커밋은 호출자가 합니다.
+    """
+    stmt = select(MarketListing).where(MarketListing.market_account_id == account_id)
+    if market_item_ids is not None:
+        if not market_item_ids:
+            return 0
+        stmt = stmt.where(MarketListing.market_item_id.in_([str(x) for x in market_item_ids]))
+    if product_ids is not None:
+        if not product_ids:
+            return 0
+        stmt = stmt.where(MarketListing.product_id.in_(product_ids))
+    listings = session.scalars(stmt).all()
+    if not listings:
+        return 0
+
+    # DB 가 분리되어 있으므로 조인 대신 단계별 IN 조회
+    products = session.execute(
+        select(Product.id, Product.supplier_item_id).where(Product.id.in_({l.product_id for l in listings}))
+    ).all()
+    supplier_item_by_product = {pid: sid for pid, sid in products if sid is not None}
+
+    supplier_rows = session.execute(
+        select(SupplierItemRaw.id, SupplierItemRaw.supplier_code, SupplierItemRaw.item_code, SupplierItemRaw.item_key, SupplierItemRaw.raw).where(
+            SupplierItemRaw.id.in_(set(supplier_item_by_product.values()))
+        )
+    ).all() if supplier_item_by_product else []
+    supplier_by_id = {row.id: row for row in supplier_rows}
+
+    raw_rows = session.execute(
+        select(MarketProductRaw.market_item_id, MarketProductRaw.raw)
+        .where(MarketProductRaw.market_code == "COUPANG")
+        .where(MarketProductRaw.account_id == account_id)
+        .where(MarketProductRaw.market_item_id.in_({l.market_item_id for l in listings}))
+    ).all()
+    vendor_items_by_market_item = {str(mid): _vendor_items(raw) for mid, raw in raw_rows}
+
+    now = datetime.now(timezone.utc)
+    values: list[dict[str, Any]] = []
+    for listing in listings:
+        supplier_item_id = supplier_item_by_product.get(listing.product_id)
+        supplier = supplier_by_id.get(supplier_item_id) if supplier_item_id else None
+        item_code = (supplier.item_code or supplier.item_key) if supplier else None
+        if not supplier or not item_code:
+            continue
+
+        options = _valid_options(supplier.raw)
+
+        vendor_items = vendor_items_by_market_item.get(listing.market_item_id) or [None]
+        for vendor_item in vendor_items:
+            vid = ""
+            if vendor_item:
+                vid = str(vendor_item.get("vendorItemId") or vendor_item.get("vendor_item_id"))
+            values.append(
+                {
+                    "market_account_id": account_id,
+                    "market_item_id": listing.market_item_id,
+                    "vendor_item_id": vid,
+                    "listing_id": listing.id,
+                    "product_id": listing.product_id,
+                    "supplier_code": supplier.supplier_code,
+                    "supplier_item_id": supplier.id,
+                    "item_code": str(item_code),
+                    "option_key": _match_option_key(vendor_item, options),
+                    "updated_at": now,
+                }
+            )
+
+    listing_item_ids = [l.market_item_id for l in listings]
+    if not values:
+        session.execute(
+            delete(MarketListingRoute)
+            .where(MarketListingRoute.market_account_id == account_id)
+            .where(MarketListingRoute.market_item_id.in_(listing_item_ids))
+        )
+        return 0
+
+    stmt_upsert = insert(MarketListingRoute).values(values)
+    stmt_upsert = stmt_upsert.on_conflict_do_update(
+        index_elements=["market_account_id", "market_item_id", "vendor_item_id"],
+        set_={
+            "listing_id": stmt_upsert.excluded.listing_id,
+            "product_id": stmt_upsert.excluded.product_id,
+            "supplier_code": stmt_upsert.excluded.supplier_code,
+            "supplier_item_id": stmt_upsert.excluded.supplier_item_id,
+            "item_code": stmt_upsert.excluded.item_code,
+            "option_key": stmt_upsert.excluded.option_key,
+            "updated_at": stmt_upsert.excluded.updated_at,
+        },
+    )
+    session.execute(stmt_upsert)
+
+    # 더 이상 존재하지 않는 라우트(예: vendorItemId 확인 전 "" 자리표시자) 정리
+    keep = [(v["market_item_id"], v["vendor_item_id"]) for v in values]
+    session.execute(
+        delete(MarketListingRoute)
+        .where(MarketListingRoute.market_account_id == account_id)
+        .where(MarketListingRoute.market_item_id.in_(listing_item_ids))
+        .where(not_(tuple_(MarketListingRoute.market_item_id, MarketListingRoute.vendor_item_id).in_(keep)))
+        .execution_options(synchronize_session=False)
+    )
+    return len(values)
+
+
+def refresh_routes_for_products(session: Session, product_ids: list[uuid.UUID]) -> int:
+    """
+    상품이 다시 정규화됐을 때(공급사 raw/옵션 변경) 그 상품의 리스팅 라우트를 계정별로 다시 계산합니다.
+    리스팅이 없는 상품은 건너뜁니다. 커밋은 호출자가 합니다.
+    """
+    if not product_ids:
+        return 0
+    rows = session.execute(
+        select(MarketListing.market_account_id, MarketListing.product_id)
+        .where(MarketListing.product_id.in_(set(product_ids)))
+    ).all()
+    by_account: dict[uuid.UUID, set[uuid.UUID]] = {}
+    for account_id, product_id in rows:
+        by_account.setdefault(account_id, set()).add(product_id)
+
+    refreshed = 0
+    for account_id, ids in by_account.items():
+        refreshed += refresh_listing_routes(session, account_id, product_ids=list(ids))
+    return refreshed
+
+
+def resolve_order_route(
+    session: Session,
+    account_id: uuid.UUID,
+    seller_product_id: str | None,
+    vendor_item_id: str | None = None,
+) -> MarketListingRoute | None:
+    """
+    주문 라인(sellerProductId/vendorItemId)을 공급사 상품으로 라우팅합니다.
+    인덱스 조회 1회로 끝나며, 라우트가 없으면 리스팅 기준으로 한 번 백필 후 재조회합니다.
+    vendorItemId 가 주어졌는데 정확히 일치하는 라우트가 없으면 라우트를 다시 계산해 보고,
+    그래도 없으면 vendorItemId 를 아직 모르는 자리표시자("") 라우트가 옵션이 하나뿐인 상품일 때만 그 라우트를 씁니다
+    (상품 동기화 전에 등록된 리스팅). 옵션이 여러 개면 임의의 옵션으로 보내지 않고 None 을 반환합니다.
+    """
+    vid = str(vendor_item_id).strip() if vendor_item_id is not None else ""
+    spid = str(seller_product_id).strip() if seller_product_id is not None else ""
+    if not vid and not spid:
+        return None
+
+    def _lookup() -> MarketListingRoute | None:
+        stmt = select(MarketListingRoute).where(MarketListingRoute.market_account_id == account_id)
+        if vid:
+            # vendorItemId 가 정확히 일치하는 라우트만 사용합니다(같은 sellerProductId 의 다른 옵션으로 보내지 않음).
+            stmt = stmt.where(MarketListingRoute.vendor_item_id == vid)
+        else:
+            stmt = stmt.where(MarketListingRoute.market_item_id == spid)
+        return session.scalars(stmt.limit(1)).first()
+
+    route = _lookup()
+    if route or not spid:
+        return route
+
+    if refresh_listing_routes(session, account_id, market_item_ids=[spid]):
+        session.commit()
+        route = _lookup()
+    if route or not vid:
+        return route
+    return _single_option_placeholder_route(session, account_id, spid)
+
+
+def _single_option_placeholder_route(session: Session, account_id: uuid.UUID, spid: str) -> MarketListingRoute | None:
+    routes = session.scalars(
+        select(MarketListingRoute)
+        .where(MarketListingRoute.market_account_id == account_id)
+        .where(MarketListingRoute.market_item_id == spid)
+        .limit(2)
+    ).all()
+    if len(routes) != 1 or routes[0].vendor_item_id != "":
+        return None
+
+    route = routes[0]
+    raw = session.scalar(select(SupplierItemRaw.raw).where(SupplierItemRaw.id == route.supplier_item_id))
+    if len(_valid_options(raw)) > 1:
+        return None
+    return route
@@ -2,7 +2,7 @@ from pgvector.sqlalchemy import Vector
 from datetime import datetime
 import uuid
 
-from sqlalchemy import BigInteger, DateTime, Integer, Text, UniqueConstraint, ForeignKey, Float
+from sqlalchemy import BigInteger, DateTime, Integer, Text, UniqueConstraint, ForeignKey, Float, Index
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -113,6 +113,8 @@ class SupplierItemRaw(SourceBase):
     __table_args__ = (
         UniqueConstraint("supplier_code", "item_code", name="uq_supplier_item_raw_supplier_item_code"),
         UniqueConstraint("supplier_code", "item_key", name="uq_supplier_item_raw_supplier_item_key"),
+        # 변경분 배치(정규화/임베딩/가격 동기화)의 (fetched_at, id) keyset 스캔용
+        Index("ix_supplier_item_raw_supplier_fetched_id", "supplier_code", "fetched_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -125,6 +127,31 @@ class SupplierItemRaw(SourceBase):
     raw: Mapped[dict] = mapped_column(JSONB, nullable=False)
 
 
+class SupplierItemEmbedding(SourceBase):
+    """
+    supplier_item_raw 의 (상품명 + 카테고리 + 주요 스펙) 임베딩.
+    content_hash 가 바뀐 상품만 다시 임베딩합니다.
+    """
+    __tablename__ = "supplier_item_embeddings"
+    __table_args__ = (
+        Index(
+            "ix_supplier_item_embeddings_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    supplier_item_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("supplier_item_raw.id", ondelete="CASCADE"), primary_key=True)
+    supplier_code: Mapped[str] = mapped_column(Text, nullable=False)
+    item_code: Mapped[str | None] = mapped_column(Text, nullable=True)
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(Vector(768), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class SupplierOrderRaw(SourceBase):
     __tablename__ = "supplier_order_raw"
     __table_args__ = (
@@ -185,6 +212,8 @@ class MarketOrderRaw(MarketBase):
     __tablename__ = "market_order_raw"
     __table_args__ = (
         UniqueConstraint("market_code", "account_id", "order_id", name="uq_market_order_raw_account_order"),
+        # 발주 연동의 (fetched_at, id) keyset 스캔용
+        Index("ix_market_order_raw_account_fetched_id", "account_id", "fetched_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -215,6 +244,10 @@ class MarketProductRaw(MarketBase):
 
 class Product(DropshipBase):
     __tablename__ = "products"
+    __table_args__ = (
+        # 공급사 상품 1건 = 상품 1건 (정규화 시 ON CONFLICT upsert 기준)
+        Index("uq_products_supplier_item_id", "supplier_item_id", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     supplier_item_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
@@ -229,6 +262,8 @@ class Product(DropshipBase):
     processed_keywords: Mapped[list[str] | None] = mapped_column(JSONB, nullable=True)
     processed_image_urls: Mapped[list[str] | None] = mapped_column(JSONB, nullable=True)
     processing_status: Mapped[str] = mapped_column(Text, nullable=False, default="PENDING") # PENDING, PROCESSING, COMPLETED, FAILED
+    # 마지막 정규화에 쓴 공급사 값(상품명/브랜드/설명/가격)의 해시. 같으면 다시 정규화하지 않습니다.
+    source_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -246,6 +281,75 @@ class MarketListing(MarketBase):
     market_item_id: Mapped[str] = mapped_column(Text, nullable=False)  # e.g. sellerProductId
     status: Mapped[str] = mapped_column(Text, nullable=False, default="ACTIVE")
     linked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # 마지막으로 마켓에 반영한 가격/재고 (변경분만 push 하기 위한 기준값)
+    synced_price: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    synced_stock: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    synced_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class MarketListingRoute(MarketBase):
+    """
+    주문 라우팅용 비정규화 테이블.
+    sellerProductId/vendorItemId 만으로 공급사 상품(item_code/옵션)을 한 번에 찾기 위해 사용합니다.
+    (market_listings → products → supplier_item_raw 3단계 조회를 대체)
+    """
+
+    __tablename__ = "market_listing_routes"
+    __table_args__ = (
+        UniqueConstraint(
+            "market_account_id", "market_item_id", "vendor_item_id", name="uq_market_listing_routes_account_item_vendor"
+        ),
+        Index("ix_market_listing_routes_account_vendor_item", "market_account_id", "vendor_item_id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    market_account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("market_accounts.id"), nullable=False)
+    market_item_id: Mapped[str] = mapped_column(Text, nullable=False)  # sellerProductId
+    vendor_item_id: Mapped[str] = mapped_column(Text, nullable=False, default="")  # 미확인 시 ""
+    listing_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("market_listings.id"), nullable=False)
+    product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    supplier_code: Mapped[str] = mapped_column(Text, nullable=False)
+    supplier_item_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    item_code: Mapped[str] = mapped_column(Text, nullable=False)
+    option_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MarketRegistrationJob(MarketBase):
+    __tablename__ = "market_registration_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    market_code: Mapped[str] = mapped_column(Text, nullable=False, default="COUPANG")
+    account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("market_accounts.id"), nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="queued")  # queued, running, succeeded, failed
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    succeeded: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MarketRegistrationJobItem(MarketBase):
+    __tablename__ = "market_registration_job_items"
+    __table_args__ = (
+        UniqueConstraint("job_id", "product_id", name="uq_market_registration_job_items_job_product"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("market_registration_jobs.id"), nullable=False)
+    product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="queued")  # queued, running, succeeded, failed
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    market_item_id: Mapped[str | None] = mapped_column(Text, nullable=True)  # 성공 시 sellerProductId
+    http_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class SupplierOrder(MarketBase):
@@ -282,6 +386,13 @@ class BenchmarkProduct(MarketBase):
     __tablename__ = "benchmark_products"
     __table_args__ = (
         UniqueConstraint("market_code", "product_id", name="uq_benchmark_products_market_product"),
+        Index(
+            "ix_benchmark_products_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -310,6 +421,15 @@ class SourcingCandidate(DropshipBase):
     These are transient candidates before being promoted to real 'Products'.
     """
     __tablename__ = "sourcing_candidates"
+    __table_args__ = (
+        Index(
+            "ix_sourcing_candidates_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     supplier_code: Mapped[str] = mapped_column(Text, nullable=False)
@@ -346,3 +466,101 @@ class APIKey(DropshipBase):
     is_active: Mapped[bool] = mapped_column(default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+
+
+class EmbeddingCache(DropshipBase):
+    """
+    (모델, 텍스트 sha256) 기준 임베딩 캐시. 같은 텍스트를 다시 임베딩하지 않기 위함.
+    """
+    __tablename__ = "embedding_cache"
+
+    model: Mapped[str] = mapped_column(Text, primary_key=True)
+    text_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    embedding: Mapped[list[float]] = mapped_column(JSONB, nullable=False)
+    dimensions: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class LLMResponseCache(DropshipBase):
+    """
+    (provider, model, temperature, prompt) 해시 기준 LLM 응답 캐시.
+    """
+    __tablename__ = "llm_response_cache"
+
+    cache_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    provider: Mapped[str] = mapped_column(Text, nullable=False)
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    task: Mapped[str] = mapped_column(Text, nullable=False)
+    response: Mapped[dict | list | str] = mapped_column(JSONB, nullable=False)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class AIBatchJob(DropshipBase):
+    """
+    오프라인 AI 배치 작업(OpenAI Batch API 또는 로컬 대체 실행). 요청 JSONL 을 제출하고 완료되면 결과를 대상 행에 반영합니다.
+    """
+    __tablename__ = "ai_batch_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    provider: Mapped[str] = mapped_column(Text, nullable=False)  # openai, local
+    task: Mapped[str] = mapped_column(Text, nullable=False)  # seo, specs
+    target: Mapped[str] = mapped_column(Text, nullable=False)  # product, sourcing_candidate
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="SUBMITTED", index=True)  # SUBMITTED, IN_PROGRESS, COMPLETED, FAILED, EXPIRED, CANCELLED
+    remote_batch_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    input_file_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    output_file_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error_file_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    key_fingerprint: Mapped[str | None] = mapped_column(Text, nullable=True)  # 제출한 API 키의 해시(같은 키로 조회해야 함)
+    input_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    request_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    succeeded_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class AIBatchJobItem(DropshipBase):
+    """
+    배치 작업에 포함된 대상 행(products.id 또는 sourcing_candidates.id). custom_id 로 결과를 다시 매핑합니다.
+    """
+    __tablename__ = "ai_batch_job_items"
+
+    job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("ai_batch_jobs.id", ondelete="CASCADE"), primary_key=True)
+    target_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="PENDING")  # PENDING, SUCCEEDED, FAILED
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class ImageSource(DropshipBase):
+    """
+    원본 이미지 URL -> 내용 sha256. 같은 URL 은 다시 받지 않고 내용 해시로 가공본을 찾습니다.
+    """
+    __tablename__ = "image_sources"
+
+    url_hash: Mapped[str] = mapped_column(Text, primary_key=True)  # sha256(url)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    content_sha256: Mapped[str] = mapped_column(Text, nullable=False, index=True)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class ImageVariant(DropshipBase):
+    """
+    원본 내용(sha256) + 가공 방식(variant) + 범위(scope_key: 전역이면 "", 상품별이면 상품 id) 기준으로 업로드된 가공본.
+    """
+    __tablename__ = "image_variants"
+
+    content_sha256: Mapped[str] = mapped_column(Text, primary_key=True)
+    variant: Mapped[str] = mapped_column(Text, primary_key=True)
+    scope_key: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    public_url: Mapped[str] = mapped_column(Text, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
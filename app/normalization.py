@@ -1,15 +1,25 @@
+import hashlib
+import json
 import logging
+import time
 import uuid
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import select, func
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app.models import SupplierItemRaw, Product
+from app.db_iter import iter_keyset_chunks
+from app.market_routing import refresh_routes_for_products
+from app.models import SupplierItemRaw, SupplierSyncJob, SupplierSyncState, Product
 from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+SYNC_TYPE = "normalization"
+
 def _parse_int_price(value) -> int:
     if value is None:
         return 0
@@ -18,88 +28,318 @@ def _parse_int_price(value) -> int:
     except Exception:
         return 0
 
-def normalize_supplier_items(session: Session, batch_size: int = 1000, item_ids: list[uuid.UUID] | None = None) -> int:
+def parse_supply_price(data: dict) -> int:
+    """
+    공급사 raw 데이터에서 공급가(원가)를 추출합니다.
+    """
+    supply_price = (
+        data.get("supply_price")
+        or data.get("supplyPrice")
+        or data.get("fixedPrice")
+        or data.get("fixed_price")
+        or data.get("price")
+        or 0
+    )
+    return _parse_int_price(supply_price)
+
+
+def calc_selling_price(cost: int) -> int:
+    """
+    원가에 기본 마진율(settings.pricing_default_margin_rate)을 적용한 판매가를 계산합니다.
+    """
+    try:
+        margin_rate = float(settings.pricing_default_margin_rate or 0.0)
+    except Exception:
+        margin_rate = 0.0
+    if margin_rate < 0:
+        margin_rate = 0.0
+    return int(cost * (1.0 + margin_rate))
+
+
+def calc_stock_quantity(data: dict) -> int | None:
+    """
+    공급사 raw 데이터에서 판매 가능 재고를 계산합니다.
+    - 품절/판매중지 상태면 0
+    - 옵션이 있으면 옵션 수량 합계, 없으면 상품 단위 수량
+    - 수량 정보를 알 수 없으면 None (재고를 임의로 0 처리하지 않기 위함)
+    """
+    # 오너클랜 상품 상태: ACTIVE / INACTIVE / OUT_OF_STOCK / DELETED
+    status = str(data.get("status") or "").strip().upper()
+    if status in ("INACTIVE", "OUT_OF_STOCK", "DELETED", "SOLDOUT"):
+        return 0
+
+    options = data.get("options")
+    if isinstance(options, list) and options:
+        quantities = [
+            opt.get("quantity") for opt in options if isinstance(opt, dict) and opt.get("quantity") is not None
+        ]
+        if not quantities:
+            return None
+        return sum(max(0, _parse_int_price(q)) for q in quantities)
+
+    quantity = data.get("quantity") if data.get("quantity") is not None else data.get("stock")
+    if quantity is None:
+        return None
+    return max(0, _parse_int_price(quantity))
+
+
+@dataclass
+class NormalizationResult:
+    scanned: int = 0
+    upserted: int = 0
+    unchanged: int = 0
+    skipped: int = 0  # raw 가 비어 있는 상품
+
+    @property
+    def processed(self) -> int:
+        return self.upserted + self.unchanged
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scanned": self.scanned,
+            "upserted": self.upserted,
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+        }
+
+
+def source_hash(values: dict) -> str:
+    """
+    정규화 결과(상품명/브랜드/설명/원가/판매가)의 해시. 마진율이 바뀌어도 해시가 달라져 다시 반영됩니다.
+    """
+    payload = [values["name"], values["brand"], values["description"], values["cost_price"], values["selling_price"]]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def build_product_values(supplier_item_id: uuid.UUID, data: dict) -> dict:
+    """
+    공급사 raw 데이터(OwnerClan 스펙, 폴백 포함)를 products upsert 값으로 변환합니다.
+    """
+    cost = parse_supply_price(data)
+    values = {
+        "id": uuid.uuid4(),
+        "supplier_item_id": supplier_item_id,
+        "name": data.get("item_name") or data.get("name") or "Untitled",
+        "brand": data.get("brand") or data.get("brand_name"),
+        "description": data.get("description") or data.get("content"),
+        "cost_price": cost,
+        # Calculate Selling Price (Simple Logic: Cost * margin_rate)
+        "selling_price": calc_selling_price(cost),
+        "status": "DRAFT",
+    }
+    values["source_hash"] = source_hash(values)
+    return values
+
+
+def _upsert_products(session: Session, values: list[dict]) -> int:
+    """
+    supplier_item_id 기준 bulk upsert. 기존 상품은 기본 정보/가격만 갱신하고 상태는 건드리지 않으며,
+    값이 같은 행은 다시 쓰지 않습니다. 실제로 쓴 행 수를 반환합니다.
+    """
+    stmt = insert(Product).values(values)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["supplier_item_id"],
+        set_={
+            "name": excluded.name,
+            "brand": excluded.brand,
+            "description": excluded.description,
+            "cost_price": excluded.cost_price,
+            "selling_price": excluded.selling_price,
+            "source_hash": excluded.source_hash,
+            "updated_at": func.now(),
+        },
+        where=or_(
+            Product.source_hash.is_distinct_from(excluded.source_hash),
+            Product.name.is_distinct_from(excluded.name),
+            Product.brand.is_distinct_from(excluded.brand),
+            Product.description.is_distinct_from(excluded.description),
+            Product.cost_price.is_distinct_from(excluded.cost_price),
+            Product.selling_price.is_distinct_from(excluded.selling_price),
+        ),
+    )
+    return int(session.execute(stmt).rowcount or 0)
+
+
+def _normalize_rows(session: Session, rows: list, result: NormalizationResult) -> None:
+    """
+    (id, raw) 묶음을 정규화합니다. 마지막 정규화와 해시가 같은 상품은 upsert 하지 않습니다.
+    이미 있던 상품은 공급사 raw(옵션 등)가 바뀌었을 수 있으므로 마켓 리스팅의 주문 라우트도 다시 계산합니다.
+    """
+    result.scanned += len(rows)
+    values = [build_product_values(row.id, row.raw) for row in rows if row.raw]
+    result.skipped += len(rows) - len(values)
+    if not values:
+        return
+
+    existing = {
+        supplier_item_id: (product_id, product_hash)
+        for supplier_item_id, product_id, product_hash in session.execute(
+            select(Product.supplier_item_id, Product.id, Product.source_hash)
+            .where(Product.supplier_item_id.in_([v["supplier_item_id"] for v in values]))
+        ).all()
+    }
+    changed = [v for v in values if existing.get(v["supplier_item_id"], (None, None))[1] != v["source_hash"]]
+    result.unchanged += len(values) - len(changed)
+    if changed:
+        written = _upsert_products(session, changed)
+        result.upserted += written
+        result.unchanged += len(changed) - written
+
+    # 새로 만든 상품은 아직 리스팅이 없으므로 기존 상품만 대상입니다.
+    _refresh_routes_safely(session, [product_id for product_id, _ in existing.values()])
+
+
+def _refresh_routes_safely(session: Session, product_ids: list[uuid.UUID]) -> None:
+    # 라우팅 테이블 갱신 실패가 정규화 자체를 실패시키지 않도록 합니다.
+    if not product_ids:
+        return
+    try:
+        with session.begin_nested():
+            refresh_routes_for_products(session, product_ids)
+    except Exception as e:
+        logger.warning(f"정규화 후 주문 라우팅 갱신 실패 (products={len(product_ids)}): {e}")
+
+
+def normalize_supplier_items(
+    session: Session,
+    batch_size: int = 1000,
+    item_ids: list[uuid.UUID] | None = None,
+    limit: int | None = None,
+) -> int:
     """
     Normalizes raw supplier items into Core Product table.
-    - Reads from SupplierItemRaw
-    - Upserts into Product
-    - Default Margin: 20% (1.2x)
+    - SupplierItemRaw 를 id 순서로 batch_size 개씩 읽어(keyset) Python 에서 상품명/가격/브랜드를 계산하고
+    - 묶음마다 INSERT ... ON CONFLICT (supplier_item_id) 한 문장으로 Product 에 upsert 합니다.
+      (supplier_item_raw 와 products 는 다른 DB 라 INSERT ... SELECT 는 쓸 수 없음)
+    - item_ids 가 없으면 전체(limit 개까지), 묶음마다 커밋합니다.
+    변경분만 처리하려면 normalize_changed_supplier_items 를 사용합니다.
     """
     logger.info("Starting normalization of supplier items...")
-    
-    stmt = select(SupplierItemRaw)
-    
+    batch_size = max(1, int(batch_size))
+    started = time.perf_counter()
+
+    result = NormalizationResult()
     if item_ids:
-        stmt = stmt.filter(SupplierItemRaw.id.in_(item_ids))
+        ids = list(dict.fromkeys(item_ids))
+        chunks = (
+            session.execute(select(SupplierItemRaw.id, SupplierItemRaw.raw).where(SupplierItemRaw.id.in_(ids[i:i + batch_size]))).all()
+            for i in range(0, len(ids), batch_size)
+        )
     else:
-        stmt = stmt.limit(batch_size)
-        
-    raw_items = session.scalars(stmt).all()
-    
-    processed_count = 0
-    
-    for raw_item in raw_items:
-        data = raw_item.raw
-        if not data:
-            continue
-            
-        # Extract Fields (OwnerClan Spec)
-        # Fallbacks included for safety
-        item_name = data.get("item_name") or data.get("name") or "Untitled"
-        supply_price = (
-            data.get("supply_price")
-            or data.get("supplyPrice")
-            or data.get("fixedPrice")
-            or data.get("fixed_price")
-            or data.get("price")
-            or 0
+        chunks = iter_keyset_chunks(
+            session, select(SupplierItemRaw.id, SupplierItemRaw.raw), (SupplierItemRaw.id,), chunk_size=batch_size, limit=limit
         )
-        brand_name = data.get("brand") or data.get("brand_name")
-        description = data.get("description") or data.get("content")
-        
-        # Calculate Selling Price (Simple Logic: Cost * margin_rate)
-        cost = _parse_int_price(supply_price)
-            
-        try:
-            margin_rate = float(settings.pricing_default_margin_rate or 0.0)
-        except Exception:
-            margin_rate = 0.0
-        if margin_rate < 0:
-            margin_rate = 0.0
-        selling_price = int(cost * (1.0 + margin_rate))
-        
-        # Check if Product exists for this raw item
-        # We need a way to look up Product by supplier_item_id.
-        # Since supplier_item_id is a FK in Product, we can query Product.
-        
-        existing_product = session.query(Product).filter(
-            Product.supplier_item_id == raw_item.id
-        ).one_or_none()
-        
-        if existing_product:
-            # Update
-            existing_product.name = item_name
-            existing_product.brand = brand_name
-            existing_product.description = description
-            existing_product.cost_price = cost
-            existing_product.selling_price = selling_price
-            # We don't overwrite status if it's already active, unless we want to sync status?
-            # Keeping status as is for now, or maybe sync 'SOLD_OUT' if stock=0.
-            processed_count += 1
-        else:
-            # Create
-            new_product = Product(
-                supplier_item_id=raw_item.id,
-                name=item_name,
-                brand=brand_name,
-                description=description,
-                cost_price=cost,
-                selling_price=selling_price,
-                status="DRAFT"
-            )
-            session.add(new_product)
-            processed_count += 1
-            
-    session.commit()
-    logger.info(f"Normalized {processed_count} items.")
-    return processed_count
+
+    for rows in chunks:
+        _normalize_rows(session, rows, result)
+        session.commit()
+
+    logger.info(f"Normalized {result.processed} items ({result.to_dict()}, {time.perf_counter() - started:.1f}s).")
+    return result.processed
+
+
+def _get_watermark(session: Session, supplier_code: str) -> datetime | None:
+    state = session.scalars(
+        select(SupplierSyncState)
+        .where(SupplierSyncState.supplier_code == supplier_code)
+        .where(SupplierSyncState.sync_type == SYNC_TYPE)
+        .where(SupplierSyncState.account_id == uuid.UUID(int=0))
+    ).one_or_none()
+    if not state or state.watermark_ms is None:
+        return None
+    return datetime.fromtimestamp(state.watermark_ms / 1000, tz=timezone.utc)
+
+
+def _set_watermark(session: Session, supplier_code: str, watermark: datetime) -> None:
+    watermark_ms = int(watermark.timestamp() * 1000)
+    stmt = insert(SupplierSyncState).values(
+        supplier_code=supplier_code,
+        sync_type=SYNC_TYPE,
+        account_id=uuid.UUID(int=0),
+        watermark_ms=watermark_ms,
+        cursor=None,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["supplier_code", "sync_type", "account_id"],
+        set_={"watermark_ms": watermark_ms, "updated_at": datetime.now(timezone.utc)},
+    )
+    session.execute(stmt)
+
+
+def normalize_changed_supplier_items(
+    session: Session,
+    supplier_code: str = "ownerclan",
+    full: bool = False,
+    limit: int | None = None,
+    batch_size: int | None = None,
+) -> NormalizationResult:
+    """
+    fetched_at 워터마크 이후 수집된 supplier_item_raw 만 (fetched_at, id) keyset 으로 읽어 정규화합니다.
+    다시 수집됐지만 내용이 같은 상품은 source_hash 로 걸러 upsert 하지 않습니다.
+    full=True 면 전체 카탈로그를 다시 확인합니다. 묶음마다 커밋하고 워터마크를 전진시키므로 중단돼도 이어서 처리합니다.
+
+    fetched_at 은 수집 쪽에서 커밋 전에 정해지므로, 동시에 진행 중인 수집이 나중에 커밋한 행은 워터마크보다
+    작은 값을 가질 수 있습니다. 그래서 normalization_watermark_overlap_min 만큼 앞에서부터 다시 읽습니다
+    (이미 반영된 행은 해시가 같아 upsert 하지 않음).
+    """
+    result = NormalizationResult()
+    batch_size = max(1, int(batch_size or settings.normalization_batch_size))
+    started = time.perf_counter()
+
+    watermark = None if full else _get_watermark(session, supplier_code)
+    stmt = (
+        select(SupplierItemRaw.id, SupplierItemRaw.fetched_at, SupplierItemRaw.raw)
+        .where(SupplierItemRaw.supplier_code == supplier_code)
+    )
+    if watermark is not None:
+        overlap = timedelta(minutes=max(0, int(settings.normalization_watermark_overlap_min)))
+        stmt = stmt.where(SupplierItemRaw.fetched_at > watermark - overlap)
+
+    for rows in iter_keyset_chunks(
+        session, stmt, (SupplierItemRaw.fetched_at, SupplierItemRaw.id), chunk_size=batch_size, limit=limit
+    ):
+        _normalize_rows(session, rows, result)
+
+        # 같은 트랜잭션으로 적재된 상품은 fetched_at 이 같을 수 있어, 저장하는 워터마크는 1ms 앞으로 둡니다.
+        # (다음 실행에서 마지막 묶음을 다시 읽지만 해시가 같으면 upsert 하지 않습니다)
+        # 겹쳐 읽는 구간에서 끝나도 워터마크가 뒤로 가지 않게 합니다.
+        next_watermark = rows[-1].fetched_at - timedelta(milliseconds=1)
+        if watermark is None or next_watermark > watermark:
+            watermark = next_watermark
+            _set_watermark(session, supplier_code, watermark)
+        session.commit()
+
+    logger.info(f"공급사 상품 정규화 완료 (supplierCode={supplier_code}): {result.to_dict()} ({time.perf_counter() - started:.1f}s)")
+    return result
+
+
+def items_sync_running(session: Session, supplier_code: str) -> bool:
+    """
+    같은 공급사의 상품 수집(<supplier_code>_items_raw) job 이 대기/실행 중인지 여부.
+    """
+    return (
+        session.scalar(
+            select(SupplierSyncJob.id)
+            .where(SupplierSyncJob.supplier_code == supplier_code)
+            .where(SupplierSyncJob.job_type == f"{supplier_code}_items_raw")
+            .where(SupplierSyncJob.status.in_(["queued", "running"]))
+            .limit(1)
+        )
+        is not None
+    )
+
+
+def run_normalization_sync(session_factory: Any, supplier_code: str, full: bool = False, limit: int | None = None) -> None:
+    """
+    백그라운드 실행용. 실패해도 예외를 올리지 않고 로그만 남깁니다.
+    상품 수집이 진행 중이면 건너뜁니다(수집 job 이 끝나면서 정규화를 다시 실행함).
+    """
+    try:
+        with session_factory() as session:
+            if items_sync_running(session, supplier_code):
+                logger.warning(f"상품 수집 진행 중이라 정규화를 건너뜁니다 (supplierCode={supplier_code})")
+                return
+            normalize_changed_supplier_items(session, supplier_code=supplier_code, full=full, limit=limit)
+    except Exception as e:
+        logger.error(f"공급사 상품 정규화 실패 (supplierCode={supplier_code}): {e}")
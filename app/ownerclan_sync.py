@@ -1105,6 +1105,7 @@ def start_background_ownerclan_job(session_factory: Any, job_id: uuid.UUID) -> N
                 run_ownerclan_job(session, job)
                 job.status = "succeeded"
                 job.finished_at = datetime.now(timezone.utc)
+                job_type = job.job_type
                 session.commit()
         except Exception as e:
             with session_factory() as session:
@@ -1115,6 +1116,23 @@ def start_background_ownerclan_job(session_factory: Any, job_id: uuid.UUID) -> N
                 job.last_error = str(e)
                 job.finished_at = datetime.now(timezone.utc)
                 session.commit()
+            return
+
+        if job_type == "ownerclan_items_raw":
+            # 이번 수집에서 바뀐 공급사 상품만 products 로 정규화합니다.
+            from app.normalization import run_normalization_sync
+
+            run_normalization_sync(session_factory, "ownerclan")
+
+            # 상품 수집이 끝나면 변경된 가격/재고를 쿠팡 리스팅에 바로 반영합니다.
+            from app.coupang_price_sync import sync_active_coupang_accounts
+
+            sync_active_coupang_accounts(session_factory)
+
+            # 변경된 상품의 임베딩을 갱신해 벤치마크 소싱(벡터 검색)에 바로 반영합니다.
+            from app.supplier_embedding import run_supplier_embedding_sync
+
+            run_supplier_embedding_sync(session_factory, "ownerclan")
 
     t = threading.Thread(target=_run, daemon=True)
     t.start()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    스레드 안전한 토큰 버킷 레이트 리미터.
+
+    - rate_per_sec: 초당 허용 호출 수(0 이하이면 제한하지 않음)
+    - burst: 순간적으로 허용할 최대 호출 수
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1) -> None:
+        self._rate = float(rate_per_sec or 0.0)
+        self._capacity = float(max(1, int(burst)))
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self._rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+                self._updated_at = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_sec = (1.0 - self._tokens) / self._rate
+            time.sleep(wait_sec)
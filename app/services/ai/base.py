@@ -1,7 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 
 class AIProvider(ABC):
+    # 동시에 보낼 수 있는 요청 수(키 수 x 키당 동시 요청 수). 배치 처리의 동시성 상한으로 쓰입니다.
+    max_concurrency: int = 1
+
     @abstractmethod
     def generate_text(self, prompt: str) -> str:
         """
@@ -15,3 +19,18 @@ class AIProvider(ABC):
         Generates structured JSON response.
         """
         pass
+
+    async def agenerate_text(self, prompt: str) -> str:
+        """
+        비동기 텍스트 생성. 네이티브 비동기 클라이언트가 없는 프로바이더는 스레드에서 동기 호출을 실행합니다.
+        """
+        return await asyncio.to_thread(self.generate_text, prompt)
+
+    async def agenerate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
+        """
+        비동기 JSON 생성.
+        """
+        return await asyncio.to_thread(self.generate_json, prompt)
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,456 @@
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from openai import OpenAI
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from app.models import AIBatchJob, AIBatchJobItem, Product, SourcingCandidate, SupplierItemRaw
+from app.services.ai.base import AIProvider
+from app.services.ai.cache import llm_cache, make_cache_key
+from app.services.ai.providers.openai import OpenAIProvider
+from app.services.ai.service import AIService, build_specs_prompt
+from app.services.gemini_utils import build_seo_prompt
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("SUBMITTED", "IN_PROGRESS")
+
+# OpenAI Batch API 상태 -> ai_batch_jobs.status
+_REMOTE_STATUS = {
+    "validating": "IN_PROGRESS",
+    "in_progress": "IN_PROGRESS",
+    "finalizing": "IN_PROGRESS",
+    "cancelling": "IN_PROGRESS",
+    "completed": "COMPLETED",
+    "failed": "FAILED",
+    "expired": "EXPIRED",
+    "cancelled": "CANCELLED",
+}
+
+
+@dataclass
+class BatchStatus:
+    status: str
+    output_file_id: str | None = None
+    error_file_id: str | None = None
+    error: str | None = None
+
+
+def key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class OpenAIBatchBackend:
+    """
+    OpenAI Batch API(/v1/chat/completions, 24h 완료 창). 일반 호출보다 저렴하고 rate limit 을 따로 씁니다.
+    """
+
+    name = "openai"
+
+    def __init__(self, provider: OpenAIProvider, api_key: str):
+        self.provider = provider
+        self.model = provider.model_name
+        self.fingerprint = key_fingerprint(api_key)
+        self.client = OpenAI(api_key=api_key)
+
+    def build_request(self, custom_id: str, prompt: str) -> Dict[str, Any]:
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": self.provider.build_chat_request(prompt, json_mode=True),
+        }
+
+    def submit(self, input_path: Path) -> Tuple[str, str]:
+        with input_path.open("rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id, uploaded.id
+
+    def status(self, remote_batch_id: str) -> BatchStatus:
+        batch = self.client.batches.retrieve(remote_batch_id)
+        error = None
+        errors = getattr(getattr(batch, "errors", None), "data", None)
+        if errors:
+            error = "; ".join(str(getattr(e, "message", e)) for e in errors[:5])
+        return BatchStatus(
+            status=_REMOTE_STATUS.get(batch.status, "IN_PROGRESS"),
+            output_file_id=batch.output_file_id,
+            error_file_id=batch.error_file_id,
+            error=error,
+        )
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+class LocalBatchBackend:
+    """
+    Batch API 대체 실행(테스트/키 없는 환경용). 제출 시 프로바이더로 바로 처리하고
+    OpenAI 배치 출력과 같은 형식의 JSONL 을 파일로 남깁니다.
+    """
+
+    name = "local"
+    fingerprint = None
+
+    def __init__(self, provider: AIProvider):
+        self.provider = provider
+        self.model = str(getattr(provider, "model_name", "") or "local")
+
+    def build_request(self, custom_id: str, prompt: str) -> Dict[str, Any]:
+        return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": {"prompt": prompt}}
+
+    def submit(self, input_path: Path) -> Tuple[str, str]:
+        job_key = input_path.name.removesuffix(".input.jsonl")
+        output_path = input_path.with_name(f"{job_key}.output.jsonl")
+        with input_path.open("r", encoding="utf-8") as src, output_path.open("w", encoding="utf-8") as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                result = self.provider.generate_json(request["body"]["prompt"])
+                if result in ({}, [], None):
+                    entry = {"custom_id": request["custom_id"], "response": None, "error": {"message": "빈 응답"}}
+                else:
+                    content = json.dumps(result, ensure_ascii=False)
+                    entry = {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+                        "error": None,
+                    }
+                dst.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return f"local-{job_key}", str(output_path)
+
+    def status(self, remote_batch_id: str) -> BatchStatus:
+        output_path = Path(settings.ai_batch_dir) / f"{remote_batch_id.removeprefix('local-')}.output.jsonl"
+        if not output_path.exists():
+            return BatchStatus(status="FAILED", error=f"출력 파일이 없습니다: {output_path}")
+        return BatchStatus(status="COMPLETED", output_file_id=str(output_path))
+
+    def download(self, file_id: str) -> str:
+        return Path(file_id).read_text(encoding="utf-8")
+
+
+@dataclass
+class BatchTask:
+    target: str
+    # (대상 id, 프롬프트) 목록
+    collect: Callable[[Session, int], List[Tuple[uuid.UUID, str]]]
+    # 파싱된 JSON 응답을 대상 행에 반영. 반영하지 못하면 False
+    apply: Callable[[Session, uuid.UUID, Any], bool]
+
+
+def _not_in_active_batch(target_id_column):
+    return ~exists(
+        select(AIBatchJobItem.target_id)
+        .join(AIBatchJob, AIBatchJob.id == AIBatchJobItem.job_id)
+        .where(AIBatchJobItem.target_id == target_id_column)
+        .where(AIBatchJob.status.in_(ACTIVE_STATUSES))
+    )
+
+
+def _collect_seo(db: Session, limit: int) -> List[Tuple[uuid.UUID, str]]:
+    products = db.scalars(
+        select(Product)
+        .where(Product.processing_status == "PENDING")
+        .where(Product.processed_name.is_(None))
+        .where(_not_in_active_batch(Product.id))
+        .order_by(Product.created_at)
+        .limit(limit)
+    ).all()
+
+    raw_by_id: Dict[uuid.UUID, dict] = {}
+    supplier_ids = [p.supplier_item_id for p in products if p.supplier_item_id]
+    if supplier_ids:
+        for row in db.execute(select(SupplierItemRaw.id, SupplierItemRaw.raw).where(SupplierItemRaw.id.in_(supplier_ids))).all():
+            raw_by_id[row.id] = row.raw or {}
+
+    result = []
+    for p in products:
+        raw = raw_by_id.get(p.supplier_item_id) or {}
+        # ProcessingService.process_product 와 같은 입력으로 프롬프트를 만듭니다.
+        detail_text = raw.get("content") or raw.get("description") or p.description or ""
+        keywords = [p.brand] if p.brand else []
+        result.append((p.id, build_seo_prompt(p.name, keywords, detail_text=detail_text)))
+    return result
+
+
+def _apply_seo(db: Session, target_id: uuid.UUID, value: Any) -> bool:
+    if not isinstance(value, dict) or not value.get("title"):
+        return False
+    product = db.get(Product, target_id)
+    if product is None:
+        return False
+    tags = value.get("tags")
+    product.processed_name = str(value["title"])
+    product.processed_keywords = [str(t) for t in tags][:20] if isinstance(tags, list) else []
+    return True
+
+
+def _collect_specs(db: Session, limit: int) -> List[Tuple[uuid.UUID, str]]:
+    candidates = db.scalars(
+        select(SourcingCandidate)
+        .where(SourcingCandidate.spec_data.is_(None))
+        .where(_not_in_active_batch(SourcingCandidate.id))
+        .order_by(SourcingCandidate.created_at)
+        .limit(limit)
+    ).all()
+
+    raw_by_code: Dict[Tuple[str, str], dict] = {}
+    item_codes = list({c.supplier_item_id for c in candidates})
+    if item_codes:
+        rows = db.execute(
+            select(SupplierItemRaw.supplier_code, SupplierItemRaw.item_code, SupplierItemRaw.raw)
+            .where(SupplierItemRaw.item_code.in_(item_codes))
+        ).all()
+        for row in rows:
+            raw_by_code[(row.supplier_code, row.item_code)] = row.raw or {}
+
+    result = []
+    for c in candidates:
+        raw = raw_by_code.get((c.supplier_code, c.supplier_item_id))
+        # 소싱 시(extract_specs_batch)와 같이 공급사 상품 전체를 텍스트로 넘깁니다.
+        result.append((c.id, build_specs_prompt(str(raw) if raw else c.name)))
+    return result
+
+
+def _apply_specs(db: Session, target_id: uuid.UUID, value: Any) -> bool:
+    if not isinstance(value, dict) or not value:
+        return False
+    candidate = db.get(SourcingCandidate, target_id)
+    if candidate is None:
+        return False
+    candidate.spec_data = value
+    return True
+
+
+TASKS: Dict[str, BatchTask] = {
+    "seo": BatchTask(target="product", collect=_collect_seo, apply=_apply_seo),
+    "specs": BatchTask(target="sourcing_candidate", collect=_collect_specs, apply=_apply_specs),
+}
+
+
+def get_batch_backend(ai_service: AIService, provider: str | None = None):
+    """
+    provider 가 openai 인데 키가 없으면 실패합니다. local 은 기본 프로바이더로 바로 처리합니다.
+    """
+    provider = provider or settings.ai_batch_provider
+    if provider == "openai":
+        if not ai_service.openai.api_keys:
+            raise ValueError("OpenAI Batch API 를 쓰려면 OpenAI API 키가 필요합니다")
+        return OpenAIBatchBackend(ai_service.openai, ai_service.openai.api_keys[0])
+    if provider == "local":
+        _, local_provider = ai_service._resolve_provider("auto")
+        return LocalBatchBackend(local_provider)
+    raise ValueError(f"지원하지 않는 배치 프로바이더입니다: {provider}")
+
+
+class AIBatchService:
+    """
+    지연이 중요하지 않은 대량 AI 작업(SEO 상품명, 스펙 추출)을 오프라인 배치로 처리합니다.
+    submit 으로 요청 JSONL 을 만들어 제출하고, poll 로 완료 여부를 확인해 결과를 대상 행에 반영합니다.
+    워커 스레드를 붙잡지 않으므로 밤새 수만 건을 처리하는 용도에 맞습니다.
+    """
+
+    def __init__(self, db: Session, ai_service: AIService | None = None):
+        self.db = db
+        self._ai_service = ai_service
+
+    @property
+    def ai_service(self) -> AIService:
+        if self._ai_service is None:
+            self._ai_service = AIService()
+        return self._ai_service
+
+    def _backend_for_job(self, job: AIBatchJob):
+        if job.provider == "openai":
+            for key in self.ai_service.openai.api_keys:
+                if key_fingerprint(key) == job.key_fingerprint:
+                    return OpenAIBatchBackend(self.ai_service.openai, key)
+            raise ValueError("배치를 제출한 OpenAI 키를 찾을 수 없습니다")
+        return get_batch_backend(self.ai_service, job.provider)
+
+    def submit(self, task: str, limit: int | None = None, provider: str | None = None) -> AIBatchJob | None:
+        if task not in TASKS:
+            raise ValueError(f"지원하지 않는 배치 작업입니다: {task}")
+        spec = TASKS[task]
+        limit = max(1, min(int(limit or settings.ai_batch_max_requests), int(settings.ai_batch_max_requests)))
+
+        requests = spec.collect(self.db, limit)
+        if not requests:
+            logger.info(f"AI 배치 대상이 없습니다 (task={task})")
+            return None
+
+        backend = get_batch_backend(self.ai_service, provider)
+        job = AIBatchJob(
+            id=uuid.uuid4(),
+            provider=backend.name,
+            task=task,
+            target=spec.target,
+            model=backend.model,
+            status="SUBMITTED",
+            key_fingerprint=backend.fingerprint,
+            request_count=len(requests),
+            succeeded_count=0,
+            failed_count=0,
+        )
+
+        batch_dir = Path(settings.ai_batch_dir)
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        input_path = batch_dir / f"{job.id}.input.jsonl"
+        with input_path.open("w", encoding="utf-8") as f:
+            for target_id, prompt in requests:
+                f.write(json.dumps(backend.build_request(str(target_id), prompt), ensure_ascii=False) + "\n")
+        job.input_path = str(input_path)
+
+        # 제출 전에 작업/대상 행을 먼저 저장해, 같은 대상이 다른 배치에 중복으로 들어가지 않게 합니다.
+        self.db.add(job)
+        self.db.flush()
+        self.db.add_all([AIBatchJobItem(job_id=job.id, target_id=target_id, status="PENDING") for target_id, _ in requests])
+        self.db.commit()
+
+        try:
+            job.remote_batch_id, job.input_file_id = backend.submit(input_path)
+        except Exception as e:
+            logger.error(f"AI 배치 제출 실패 (job={job.id}): {e}")
+            job.status = "FAILED"
+            job.error = str(e)
+        self.db.commit()
+        logger.info(f"AI 배치 제출: job={job.id} task={task} provider={job.provider} requests={job.request_count}")
+        return job
+
+    def poll(self, job: AIBatchJob) -> AIBatchJob:
+        if job.status not in ACTIVE_STATUSES or not job.remote_batch_id:
+            return job
+
+        backend = self._backend_for_job(job)
+        remote = backend.status(job.remote_batch_id)
+        if remote.status == "IN_PROGRESS":
+            if job.status != "IN_PROGRESS":
+                job.status = "IN_PROGRESS"
+                self.db.commit()
+            return job
+
+        job.output_file_id = remote.output_file_id
+        job.error_file_id = remote.error_file_id
+        job.error = remote.error
+        # 만료/취소된 배치도 일부 결과가 있을 수 있으므로 출력 파일이 있으면 반영합니다.
+        if remote.output_file_id:
+            self._apply_output(job, backend.download(remote.output_file_id))
+        job.status = remote.status
+        job.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        logger.info(
+            f"AI 배치 완료: job={job.id} status={job.status} succeeded={job.succeeded_count} failed={job.failed_count}"
+        )
+        return job
+
+    def poll_active(self) -> List[AIBatchJob]:
+        jobs = self.db.scalars(
+            select(AIBatchJob).where(AIBatchJob.status.in_(ACTIVE_STATUSES)).order_by(AIBatchJob.created_at)
+        ).all()
+        result = []
+        for job in jobs:
+            try:
+                result.append(self.poll(job))
+            except Exception as e:
+                logger.error(f"AI 배치 상태 조회 실패 (job={job.id}): {e}")
+                self.db.rollback()
+        return result
+
+    def _apply_output(self, job: AIBatchJob, output_text: str) -> None:
+        spec = TASKS[job.task]
+        items = {
+            item.target_id: item
+            for item in self.db.scalars(select(AIBatchJobItem).where(AIBatchJobItem.job_id == job.id)).all()
+        }
+        prompts: Dict[str, str] = {}
+        if job.input_path and Path(job.input_path).exists():
+            prompts = self._read_prompts(Path(job.input_path))
+
+        succeeded = failed = 0
+        for line in output_text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            try:
+                target_id = uuid.UUID(str(entry.get("custom_id")))
+            except ValueError:
+                continue
+            item = items.get(target_id)
+            if item is None:
+                continue
+
+            value, error = self._parse_entry(entry)
+            if value is not None and spec.apply(self.db, target_id, value):
+                item.status = "SUCCEEDED"
+                succeeded += 1
+                prompt = prompts.get(str(target_id))
+                if prompt and job.provider == "openai":
+                    # 같은 프롬프트의 단건 호출이 캐시를 쓰도록 저장합니다.
+                    key = make_cache_key("openai", job.model, prompt, OpenAIProvider.json_temperature, "json")
+                    llm_cache.put(key, "openai", job.model, job.task, value)
+            else:
+                item.status = "FAILED"
+                item.error = error or "결과를 반영할 수 없습니다"
+                failed += 1
+
+        # 출력에 없는 대상(오류 파일로 빠진 요청)은 실패로 남깁니다.
+        for item in items.values():
+            if item.status == "PENDING":
+                item.status = "FAILED"
+                item.error = "배치 출력에 결과가 없습니다"
+                failed += 1
+
+        job.succeeded_count = succeeded
+        job.failed_count = failed
+
+    def _parse_entry(self, entry: Dict[str, Any]) -> Tuple[Any, str | None]:
+        if entry.get("error"):
+            return None, str(entry["error"].get("message") if isinstance(entry["error"], dict) else entry["error"])
+        response = entry.get("response") or {}
+        if response.get("status_code") != 200:
+            return None, f"HTTP {response.get('status_code')}"
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            return json.loads(content), None
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return None, f"응답 파싱 실패: {e}"
+
+    def _read_prompts(self, input_path: Path) -> Dict[str, str]:
+        prompts: Dict[str, str] = {}
+        with input_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = request.get("body") or {}
+                messages = body.get("messages") or []
+                prompt = messages[-1].get("content") if messages else body.get("prompt")
+                if prompt:
+                    prompts[str(request.get("custom_id"))] = prompt
+        return prompts
+
+
+def run_ai_batch_submit(session_factory: Any, task: str, limit: int | None = None, provider: str | None = None) -> None:
+    """
+    백그라운드 실행용(local 프로바이더는 제출 시 모든 요청을 바로 처리하므로 오래 걸림).
+    submit 이 중간에 커밋하므로 요청 세션이 아닌 별도 세션에서 실행합니다. 실패해도 예외를 올리지 않고 로그만 남깁니다.
+    """
+    try:
+        with session_factory() as db:
+            AIBatchService(db).submit(task, limit=limit, provider=provider)
+    except Exception as e:
+        logger.error(f"AI 배치 제출 실패 (task={task}, provider={provider}): {e}")
@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import LLMResponseCache
+from app.services.ai.base import AIProvider
+from app.session_factory import session_factory
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_MISS = object()
+
+
+def _is_empty(value: Any) -> bool:
+    # 프로바이더는 실패 시 {} / [] / "" 를 반환하므로 이런 응답은 캐시하지 않습니다.
+    return value is None or value == {} or value == [] or value == ""
+
+
+def make_cache_key(provider: str, model: str, prompt: str, temperature: float | None, kind: str) -> str:
+    raw = json.dumps([provider, model, temperature, kind, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def expires_at_for(task: str, now: datetime | None = None) -> datetime | None:
+    """
+    작업 종류별 만료 시각. seasonality 는 프롬프트에 "이번 달"이 들어가므로 다음 달 1일에 만료됩니다.
+    ttl 이 0 이하면 만료 없음(None).
+    """
+    now = now or datetime.now(timezone.utc)
+    if task == "seasonality":
+        if now.month == 12:
+            return datetime(now.year + 1, 1, 1, tzinfo=timezone.utc)
+        return datetime(now.year, now.month + 1, 1, tzinfo=timezone.utc)
+
+    ttl_days = settings.llm_cache_ttl_days.get(task, settings.llm_cache_ttl_days.get("default", 7))
+    if ttl_days is None or int(ttl_days) <= 0:
+        return None
+    return now + timedelta(days=int(ttl_days))
+
+
+class LLMResponseCacheStore:
+    """
+    llm_response_cache 테이블 기반 응답 캐시(+ 프로세스 메모리 사본). DB 오류는 캐시 미스로 처리합니다.
+    """
+
+    def __init__(self) -> None:
+        self._memory: Dict[str, Tuple[Any, datetime | None]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, task: str, name: str) -> None:
+        with self._lock:
+            bucket = self._stats.setdefault(task, {"hits": 0, "misses": 0, "stored": 0, "errors": 0})
+            bucket[name] += 1
+
+    def get(self, key: str, task: str) -> Any:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is not None:
+            value, expires_at = cached
+            if expires_at is None or expires_at > now:
+                self._count(task, "hits")
+                return value
+            with self._lock:
+                self._memory.pop(key, None)
+
+        try:
+            with session_factory() as session:
+                row = session.execute(
+                    select(LLMResponseCache.response, LLMResponseCache.expires_at)
+                    .where(LLMResponseCache.cache_key == key)
+                ).one_or_none()
+                if row is None or (row.expires_at is not None and row.expires_at <= now):
+                    self._count(task, "misses")
+                    return CACHE_MISS
+                session.execute(
+                    update(LLMResponseCache)
+                    .where(LLMResponseCache.cache_key == key)
+                    .values(hit_count=LLMResponseCache.hit_count + 1, last_hit_at=func.now())
+                )
+                session.commit()
+        except Exception as e:
+            self._count(task, "errors")
+            self._count(task, "misses")
+            logger.warning(f"LLM 캐시 조회 실패: {e}")
+            return CACHE_MISS
+
+        self._remember(key, row.response, row.expires_at)
+        self._count(task, "hits")
+        return row.response
+
+    def put(self, key: str, provider: str, model: str, task: str, value: Any) -> None:
+        if _is_empty(value):
+            return
+        expires_at = expires_at_for(task)
+        self._remember(key, value, expires_at)
+        self._count(task, "stored")
+        try:
+            with session_factory() as session:
+                stmt = insert(LLMResponseCache).values(
+                    cache_key=key,
+                    provider=provider,
+                    model=model,
+                    task=task,
+                    response=value,
+                    expires_at=expires_at,
+                    hit_count=0,
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["cache_key"],
+                    set_={"response": stmt.excluded.response, "expires_at": stmt.excluded.expires_at},
+                )
+                session.execute(stmt)
+                session.commit()
+        except Exception as e:
+            self._count(task, "errors")
+            logger.warning(f"LLM 캐시 저장 실패: {e}")
+
+    def _remember(self, key: str, value: Any, expires_at: datetime | None) -> None:
+        max_entries = int(settings.llm_cache_memory_size)
+        if max_entries <= 0:
+            return
+        with self._lock:
+            if len(self._memory) >= max_entries:
+                # 가장 오래 넣은 항목부터 제거(dict 는 삽입 순서를 유지)
+                self._memory.pop(next(iter(self._memory)))
+            self._memory[key] = (value, expires_at)
+
+    def purge_expired(self) -> int:
+        with session_factory() as session:
+            result = session.execute(
+                delete(LLMResponseCache).where(LLMResponseCache.expires_at <= func.now())
+            )
+            session.commit()
+            return int(result.rowcount or 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_task = {task: dict(v) for task, v in self._stats.items()}
+            memory_entries = len(self._memory)
+        for bucket in by_task.values():
+            lookups = bucket["hits"] + bucket["misses"]
+            bucket["hitRate"] = bucket["hits"] / lookups if lookups else 0.0
+        hits = sum(b["hits"] for b in by_task.values())
+        misses = sum(b["misses"] for b in by_task.values())
+        return {
+            "enabled": bool(settings.llm_cache_enabled),
+            "hits": hits,
+            "misses": misses,
+            "hitRate": hits / (hits + misses) if (hits + misses) else 0.0,
+            "memoryEntries": memory_entries,
+            "byTask": by_task,
+        }
+
+
+llm_cache = LLMResponseCacheStore()
+
+
+def cached_call(provider: str, model: str, task: str, kind: str, prompt: str, temperature: float | None, call) -> Any:
+    """
+    캐시를 먼저 조회하고, 없으면 call() 결과를 저장해 반환합니다.
+    """
+    if not settings.llm_cache_enabled:
+        return call()
+    key = make_cache_key(provider, model, prompt, temperature, kind)
+    value = llm_cache.get(key, task)
+    if value is not CACHE_MISS:
+        return value
+    value = call()
+    llm_cache.put(key, provider, model, task, value)
+    return value
+
+
+async def acached_call(provider: str, model: str, task: str, kind: str, prompt: str, temperature: float | None, call) -> Any:
+    """
+    cached_call 의 비동기 버전. call 은 코루틴 함수이며, 캐시 조회/저장(DB)은 스레드에서 실행합니다.
+    """
+    if not settings.llm_cache_enabled:
+        return await call()
+    key = make_cache_key(provider, model, prompt, temperature, kind)
+    value = await asyncio.to_thread(llm_cache.get, key, task)
+    if value is not CACHE_MISS:
+        return value
+    value = await call()
+    await asyncio.to_thread(llm_cache.put, key, provider, model, task, value)
+    return value
+
+
+class CachedProvider(AIProvider):
+    """
+    AIProvider 의 generate_text / generate_json 을 (provider, model, prompt, temperature) 기준으로 캐시합니다.
+    """
+
+    def __init__(self, inner: AIProvider, provider_name: str, task: str) -> None:
+        self.inner = inner
+        self.provider_name = provider_name
+        self.task = task
+        self.max_concurrency = getattr(inner, "max_concurrency", 1)
+
+    @property
+    def model_name(self) -> str:
+        return str(getattr(self.inner, "model_name", "") or "")
+
+    def generate_text(self, prompt: str) -> str:
+        return cached_call(
+            self.provider_name, self.model_name, self.task, "text", prompt,
+            getattr(self.inner, "text_temperature", None),
+            lambda: self.inner.generate_text(prompt),
+        )
+
+    def generate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
+        return cached_call(
+            self.provider_name, self.model_name, self.task, "json", prompt,
+            getattr(self.inner, "json_temperature", None),
+            lambda: self.inner.generate_json(prompt),
+        )
+
+    async def agenerate_text(self, prompt: str) -> str:
+        return await acached_call(
+            self.provider_name, self.model_name, self.task, "text", prompt,
+            getattr(self.inner, "text_temperature", None),
+            lambda: self.inner.agenerate_text(prompt),
+        )
+
+    async def agenerate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
+        return await acached_call(
+            self.provider_name, self.model_name, self.task, "json", prompt,
+            getattr(self.inner, "json_temperature", None),
+            lambda: self.inner.agenerate_json(prompt),
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_POLL_INTERVAL_SEC = 0.05
+_WINDOW_SEC = 60.0
+
+
+def estimate_tokens(prompt: str, completion_tokens: int = 512) -> int:
+    # 정확한 토크나이저 대신 대략치(문자 3개 ≈ 1토큰)를 사용합니다. 응답 후 실제 사용량으로 보정합니다.
+    return max(1, len(prompt) // 3) + int(completion_tokens)
+
+
+class KeyPoolUnavailable(RuntimeError):
+    """
+    쓸 수 있는 키가 없거나(모두 비활성) 제한 시간 안에 키를 빌리지 못했습니다.
+    """
+
+
+@dataclass
+class _KeyState:
+    key: str
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    disabled: bool = False
+    usage: Deque[Tuple[float, int]] = field(default_factory=deque)
+
+    def used_tokens(self, now: float) -> int:
+        while self.usage and self.usage[0][0] <= now - _WINDOW_SEC:
+            self.usage.popleft()
+        return sum(tokens for _, tokens in self.usage)
+
+
+class KeySlot:
+    """
+    KeyPool 에서 빌린 키. 응답의 실제 토큰 사용량을 record() 로 알려주면 예산이 보정됩니다.
+    """
+
+    def __init__(self, pool: "KeyPool", index: int, reserved: int, reserved_at: float) -> None:
+        self._pool = pool
+        self.index = index
+        self.key = pool._states[index].key
+        self._reserved = reserved
+        self._reserved_at = reserved_at
+
+    def record(self, tokens: int | None) -> None:
+        if tokens is None:
+            return
+        self._pool._adjust_usage(self.index, self._reserved_at, self._reserved, int(tokens))
+        self._reserved = int(tokens)
+
+    def rate_limited(self, cooldown_sec: float = 20.0) -> None:
+        self._pool.cooldown(self.index, cooldown_sec)
+
+    def disable(self, reason: str = "") -> None:
+        self._pool.disable(self.index, reason)
+
+
+class KeyPool:
+    """
+    API 키 풀. 키마다 동시 요청 수(max_concurrency)와 분당 토큰 예산(tokens_per_minute, 0=무제한)을 지키면서
+    라운드로빈으로 다음 키를 빌려줍니다. 여유 있는 키가 없으면 생길 때까지 기다리되,
+    acquire_timeout_sec(None=무제한) 안에 빌리지 못하거나 남은 키가 모두 그 이후까지 쉬는 중이면
+    KeyPoolUnavailable 을 냅니다. 인증에 실패한 키는 disable() 로 풀에서 뺍니다.
+
+    스레드(동기 호출)와 여러 이벤트 루프(asyncio.run)에서 함께 쓰이므로 asyncio 세마포어 대신
+    threading.Lock 으로 상태를 보호하고 짧게 폴링합니다.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 0,
+        name: str = "ai",
+        acquire_timeout_sec: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.tokens_per_minute = max(0, int(tokens_per_minute or 0))
+        self.acquire_timeout_sec = acquire_timeout_sec
+        self._states = [_KeyState(key=k) for k in keys if k]
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def capacity(self) -> int:
+        """
+        전체 키를 동시에 쓸 때의 최대 동시 요청 수.
+        """
+        return len(self._states) * self.max_concurrency
+
+    @property
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for state in self._states if not state.disabled)
+
+    def _try_acquire(self, tokens: int) -> KeySlot | None:
+        now = time.monotonic()
+        with self._lock:
+            count = len(self._states)
+            for offset in range(count):
+                index = (self._next + offset) % count
+                state = self._states[index]
+                if state.disabled or state.in_flight >= self.max_concurrency or state.cooldown_until > now:
+                    continue
+                if self.tokens_per_minute:
+                    used = state.used_tokens(now)
+                    # 예산보다 큰 단일 요청은 창이 비었을 때만 보냅니다.
+                    if used and used + tokens > self.tokens_per_minute:
+                        continue
+                state.in_flight += 1
+                state.usage.append((now, tokens))
+                self._next = (index + 1) % count
+                return KeySlot(self, index, tokens, now)
+        return None
+
+    def _release(self, slot: KeySlot) -> None:
+        with self._lock:
+            state = self._states[slot.index]
+            state.in_flight = max(0, state.in_flight - 1)
+
+    def _adjust_usage(self, index: int, reserved_at: float, reserved: int, actual: int) -> None:
+        with self._lock:
+            usage = self._states[index].usage
+            for i, (ts, tokens) in enumerate(usage):
+                if ts == reserved_at and tokens == reserved:
+                    usage[i] = (ts, actual)
+                    break
+
+    def cooldown(self, index: int, seconds: float) -> None:
+        with self._lock:
+            state = self._states[index]
+            state.cooldown_until = max(state.cooldown_until, time.monotonic() + float(seconds))
+        logger.warning(f"{self.name} 키 {index} 를 {seconds:.0f}초간 쉬게 합니다(rate limit)")
+
+    def disable(self, index: int, reason: str = "") -> None:
+        with self._lock:
+            self._states[index].disabled = True
+            remaining = sum(1 for state in self._states if not state.disabled)
+        logger.error(f"{self.name} 키 {index} 를 풀에서 제외합니다({reason or '인증 실패'}). 남은 키: {remaining}")
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        timeout = self.acquire_timeout_sec if timeout is None else timeout
+        return None if timeout is None else time.monotonic() + max(0.0, float(timeout))
+
+    def _check_wait(self, deadline: Optional[float]) -> None:
+        # 기다려도 키를 얻을 수 없으면 폴링을 멈추고 바로 실패합니다.
+        now = time.monotonic()
+        with self._lock:
+            active = [state for state in self._states if not state.disabled]
+            if not active:
+                raise KeyPoolUnavailable(f"{self.name} 사용 가능한 API 키가 없습니다")
+            if deadline is None:
+                return
+            if now >= deadline:
+                raise KeyPoolUnavailable(f"{self.name} API 키를 제한 시간 안에 빌리지 못했습니다")
+            if all(state.cooldown_until > deadline for state in active):
+                raise KeyPoolUnavailable(f"{self.name} API 키가 모두 제한 시간 이후까지 쉬는 중입니다")
+
+    @contextlib.contextmanager
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> Iterator[KeySlot]:
+        if not self._states:
+            raise RuntimeError(f"{self.name} API 키가 없습니다")
+        deadline = self._deadline(timeout)
+        while True:
+            slot = self._try_acquire(tokens)
+            if slot is not None:
+                break
+            self._check_wait(deadline)
+            time.sleep(_POLL_INTERVAL_SEC)
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    @contextlib.asynccontextmanager
+    async def aacquire(self, tokens: int = 1, timeout: Optional[float] = None) -> AsyncIterator[KeySlot]:
+        if not self._states:
+            raise RuntimeError(f"{self.name} API 키가 없습니다")
+        deadline = self._deadline(timeout)
+        while True:
+            slot = self._try_acquire(tokens)
+            if slot is not None:
+                break
+            self._check_wait(deadline)
+            await asyncio.sleep(_POLL_INTERVAL_SEC)
+        try:
+            yield slot
+        finally:
+            self._release(slot)
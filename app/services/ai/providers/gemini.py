@@ -4,14 +4,19 @@ import logging
 from typing import Dict, Any, List, Optional
 from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
 from app.services.ai.base import AIProvider
+from app.services.ai.key_pool import KeyPool
 
 logger = logging.getLogger(__name__)
 
 class GeminiProvider(AIProvider):
-    def __init__(self, api_keys: List[str], model_name: str = "gemini-1.5-flash"):
+    def __init__(self, api_keys: List[str], model_name: str = "gemini-1.5-flash", max_concurrency: int = 4):
         self.api_keys = [k for k in api_keys if k] # Filter empty
         self.model_name = model_name
         self.current_key_index = 0
+        # genai.configure 는 프로세스 전역 설정이라 키를 동시에 나눠 쓸 수 없습니다.
+        # 현재 키 하나에 대한 동시 요청 수만 제한하고, 키 교체는 소진 시에만 합니다.
+        self.pool = KeyPool([model_name], max_concurrency, name="Gemini")
+        self.max_concurrency = max(1, self.pool.capacity)
         self._configure_current_key()
 
     def _configure_current_key(self):
@@ -46,7 +51,8 @@ class GeminiProvider(AIProvider):
 
         while attempts < max_retries:
             try:
-                response = self.model.generate_content(prompt)
+                with self.pool.acquire():
+                    response = self.model.generate_content(prompt)
                 return response.text
             except (ResourceExhausted, ServiceUnavailable) as e:
                 logger.warning(f"Gemini Key {self.current_key_index} exhausted/unavailable: {e}")
@@ -68,10 +74,11 @@ class GeminiProvider(AIProvider):
 
         while attempts < max_retries:
             try:
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config={"response_mime_type": "application/json"}
-                )
+                with self.pool.acquire():
+                    response = self.model.generate_content(
+                        prompt,
+                        generation_config={"response_mime_type": "application/json"}
+                    )
                 return json.loads(response.text)
             except (ResourceExhausted, ServiceUnavailable) as e:
                 logger.warning(f"Gemini Key {self.current_key_index} exhausted/unavailable: {e}")
@@ -83,3 +90,39 @@ class GeminiProvider(AIProvider):
                 logger.error(f"Gemini generate_json failed (non-retryable): {e}")
                 return {}
         return {}
+
+    async def _agenerate(self, prompt: str, json_mode: bool) -> Optional[str]:
+        if not self.model:
+            return None
+
+        max_retries = len(self.api_keys)
+        attempts = 0
+        generation_config = {"response_mime_type": "application/json"} if json_mode else None
+
+        while attempts < max_retries:
+            try:
+                async with self.pool.aacquire():
+                    response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+                return response.text
+            except (ResourceExhausted, ServiceUnavailable) as e:
+                logger.warning(f"Gemini Key {self.current_key_index} exhausted/unavailable: {e}")
+                if not self._rotate_key():
+                    logger.error("All Gemini keys exhausted.")
+                    return None
+                attempts += 1
+        return None
+
+    async def agenerate_text(self, prompt: str) -> str:
+        try:
+            return await self._agenerate(prompt, json_mode=False) or ""
+        except Exception as e:
+            logger.error(f"Gemini agenerate_text failed (non-retryable): {e}")
+            return ""
+
+    async def agenerate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
+        try:
+            text = await self._agenerate(prompt, json_mode=True)
+            return json.loads(text) if text else {}
+        except Exception as e:
+            logger.error(f"Gemini agenerate_json failed (non-retryable): {e}")
+            return {}
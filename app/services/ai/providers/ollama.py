@@ -1,47 +1,97 @@
+import asyncio
+import threading
 import httpx
 import json
 import logging
 from typing import Dict, Any, List, Optional
 from app.services.ai.base import AIProvider
+from app.services.ai.key_pool import KeyPool
 
 logger = logging.getLogger(__name__)
 
 class OllamaProvider(AIProvider):
-    def __init__(self, base_url: str = "http://localhost:11434", model_name: str = "gemma2"):
+    def __init__(self, base_url: str = "http://localhost:11434", model_name: str = "gemma2", max_concurrency: int = 2, timeout: float = 60.0):
         self.base_url = base_url
         self.model_name = model_name
+        self.timeout = timeout
+        # 로컬 서버 하나를 키 하나처럼 취급해 동시 요청 수만 제한합니다.
+        self.pool = KeyPool([base_url], max_concurrency, name="Ollama")
+        self.max_concurrency = max(1, self.pool.capacity)
+        self._client: httpx.Client | None = None
+        self._client_lock = threading.Lock()
+        self._async_client: httpx.AsyncClient | None = None
+        self._async_loop: asyncio.AbstractEventLoop | None = None
 
-    def generate_text(self, prompt: str) -> str:
-        url = f"{self.base_url}/api/generate"
-        payload = {
+    def _get_client(self) -> httpx.Client:
+        with self._client_lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(timeout=self.timeout)
+            return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client.is_closed or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout)
+            self._async_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        if self._async_client is not None and not self._async_client.is_closed:
+            await self._async_client.aclose()
+        self._async_client = None
+        self._async_loop = None
+
+    def _payload(self, prompt: str, json_mode: bool) -> Dict[str, Any]:
+        if json_mode:
+            # Ollama's JSON mode is model dependent, often requires explicit prompt engineering + format=json
+            return {
+                "model": self.model_name,
+                "prompt": prompt + "\nRespond in valid JSON.",
+                "format": "json",
+                "stream": False
+            }
+        return {
             "model": self.model_name,
             "prompt": prompt,
             "stream": False
         }
+
+    def _post(self, payload: Dict[str, Any]) -> str:
+        with self.pool.acquire():
+            resp = self._get_client().post(f"{self.base_url}/api/generate", json=payload)
+        resp.raise_for_status()
+        return resp.json().get("response", "")
+
+    async def _apost(self, payload: Dict[str, Any]) -> str:
+        async with self.pool.aacquire():
+            resp = await self._get_async_client().post(f"{self.base_url}/api/generate", json=payload)
+        resp.raise_for_status()
+        return resp.json().get("response", "")
+
+    def generate_text(self, prompt: str) -> str:
         try:
-            with httpx.Client(timeout=60.0) as client:
-                resp = client.post(url, json=payload)
-                resp.raise_for_status()
-                return resp.json().get("response", "")
+            return self._post(self._payload(prompt, json_mode=False))
         except Exception as e:
             logger.error(f"Ollama generate_text failed: {e}")
             return ""
 
     def generate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
-        # Ollama's JSON mode is model dependent, often requires explicit prompt engineering + format=json
-        url = f"{self.base_url}/api/generate"
-        payload = {
-            "model": self.model_name,
-            "prompt": prompt + "\nRespond in valid JSON.",
-            "format": "json",
-            "stream": False
-        }
         try:
-            with httpx.Client(timeout=60.0) as client:
-                resp = client.post(url, json=payload)
-                resp.raise_for_status()
-                text = resp.json().get("response", "")
-                return json.loads(text)
+            return json.loads(self._post(self._payload(prompt, json_mode=True)))
         except Exception as e:
             logger.error(f"Ollama generate_json failed: {e}")
             return {}
+
+    async def agenerate_text(self, prompt: str) -> str:
+        try:
+            return await self._apost(self._payload(prompt, json_mode=False))
+        except Exception as e:
+            logger.error(f"Ollama agenerate_text failed: {e}")
+            return ""
+
+    async def agenerate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
+        try:
+            return json.loads(await self._apost(self._payload(prompt, json_mode=True)))
+        except Exception as e:
+            logger.error(f"Ollama agenerate_json failed: {e}")
+            return {}
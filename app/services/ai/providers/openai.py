@@ -1,91 +1,174 @@
+import asyncio
 import logging
 import json
 from typing import Dict, Any, List, Optional
 import openai
-from openai import OpenAI, RateLimitError, AuthenticationError, APIConnectionError
+from openai import AsyncOpenAI, OpenAI, RateLimitError, AuthenticationError, APIConnectionError
 from app.services.ai.base import AIProvider
+from app.services.ai.key_pool import KeyPool, KeyPoolUnavailable, KeySlot, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
 class OpenAIProvider(AIProvider):
-    def __init__(self, api_keys: List[str], model_name: str = "gpt-4o-mini"):
+    text_temperature = 0.7
+    json_temperature = 0.3
+
+    def __init__(
+        self,
+        api_keys: List[str],
+        model_name: str = "gpt-4o-mini",
+        max_concurrency_per_key: int = 4,
+        tokens_per_minute: int = 0,
+        rate_limit_cooldown_sec: float = 20.0,
+        acquire_timeout_sec: float | None = 60.0,
+    ):
         self.api_keys = [k for k in api_keys if k]
         self.model_name = model_name
-        self.current_key_index = 0
-        self.client: Optional[OpenAI] = None
-        self._configure_current_key()
-
-    def _configure_current_key(self):
+        self.rate_limit_cooldown_sec = rate_limit_cooldown_sec
+        # 실패 후에만 키를 바꾸던 방식 대신, 요청마다 여유 있는 다음 키를 라운드로빈으로 빌립니다.
+        self.pool = KeyPool(
+            self.api_keys, max_concurrency_per_key, tokens_per_minute, name="OpenAI", acquire_timeout_sec=acquire_timeout_sec
+        )
+        self.max_concurrency = max(1, self.pool.capacity)
+        self._clients: Dict[str, OpenAI] = {}
+        self._async_clients: Dict[str, AsyncOpenAI] = {}
+        self._async_loop: asyncio.AbstractEventLoop | None = None
         if not self.api_keys:
             logger.warning("No OpenAI API Keys provided.")
-            self.client = None
-            return
-        
-        current_key = self.api_keys[self.current_key_index]
-        self.client = OpenAI(api_key=current_key)
-        logger.info(f"Switched to OpenAI Key Index: {self.current_key_index}")
-
-    def _rotate_key(self) -> bool:
-        if len(self.api_keys) <= 1:
-            return False
-        
-        self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-        self._configure_current_key()
-        return True
 
-    def generate_text(self, prompt: str) -> str:
-        if not self.client:
-            return ""
+    def _client_for(self, key: str) -> OpenAI:
+        client = self._clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=key)
+            self._clients[key] = client
+        return client
 
-        max_retries = len(self.api_keys)
-        attempts = 0
+    async def _async_client_for(self, key: str) -> AsyncOpenAI:
+        # 비동기 클라이언트의 커넥션 풀은 이벤트 루프에 묶이므로, 루프가 바뀌면 이전 클라이언트를 닫고 새로 만듭니다.
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            stale, self._async_clients = self._async_clients, {}
+            self._async_loop = loop
+            await self._close_clients(stale.values())
+        client = self._async_clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(api_key=key)
+            self._async_clients[key] = client
+        return client
 
-        while attempts < max_retries:
+    @staticmethod
+    async def _close_clients(clients) -> None:
+        for client in clients:
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7
-                )
-                return response.choices[0].message.content or ""
-            except (RateLimitError, AuthenticationError, APIConnectionError) as e:
-                logger.warning(f"OpenAI Key {self.current_key_index} error: {e}. Rotating.")
-                if not self._rotate_key():
-                    logger.error("All OpenAI keys exhausted.")
-                    return ""
-                attempts += 1
+                await client.close()
             except Exception as e:
-                logger.error(f"OpenAI generate_text failed: {e}")
-                return ""
-        return ""
+                # 이전 루프가 이미 닫혔으면 소켓 정리가 실패할 수 있습니다(참조는 이미 끊음).
+                logger.debug(f"OpenAI 비동기 클라이언트 정리 실패: {e}")
+
+    async def aclose(self) -> None:
+        clients, self._async_clients = self._async_clients, {}
+        self._async_loop = None
+        await self._close_clients(clients.values())
+
+    def build_chat_request(self, prompt: str, json_mode: bool) -> Dict[str, Any]:
+        if json_mode:
+            return {
+                "model": self.model_name,
+                "messages": [
+                    {"role": "system", "content": "You are a helpful assistant. Output valid JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                "response_format": {"type": "json_object"},
+                "temperature": self.json_temperature,
+            }
+        return {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.text_temperature,
+        }
+
+    def _handle_key_error(self, slot: KeySlot, e: Exception) -> None:
+        logger.warning(f"OpenAI Key {slot.index} error: {e}. Rotating.")
+        if isinstance(e, RateLimitError):
+            slot.rate_limited(self.rate_limit_cooldown_sec)
+        elif isinstance(e, AuthenticationError):
+            # 잘못된/폐기된 키는 기다려도 살아나지 않으므로 풀에서 뺍니다.
+            slot.disable("AuthenticationError")
+
+    @staticmethod
+    def _total_tokens(response: Any) -> Optional[int]:
+        usage = getattr(response, "usage", None)
+        return getattr(usage, "total_tokens", None) if usage is not None else None
+
+    def _complete(self, prompt: str, json_mode: bool) -> Optional[str]:
+        if not self.api_keys:
+            return None
+
+        request = self.build_chat_request(prompt, json_mode)
+        tokens = estimate_tokens(prompt)
+        try:
+            for _ in range(len(self.api_keys)):
+                with self.pool.acquire(tokens) as slot:
+                    try:
+                        response = self._client_for(slot.key).chat.completions.create(**request)
+                        slot.record(self._total_tokens(response))
+                        return response.choices[0].message.content or ""
+                    except (RateLimitError, AuthenticationError, APIConnectionError) as e:
+                        self._handle_key_error(slot, e)
+        except KeyPoolUnavailable as e:
+            logger.error(f"OpenAI 키를 빌리지 못했습니다: {e}")
+            return None
+        logger.error("All OpenAI keys exhausted.")
+        return None
+
+    async def _acomplete(self, prompt: str, json_mode: bool) -> Optional[str]:
+        if not self.api_keys:
+            return None
+
+        request = self.build_chat_request(prompt, json_mode)
+        tokens = estimate_tokens(prompt)
+        try:
+            for _ in range(len(self.api_keys)):
+                async with self.pool.aacquire(tokens) as slot:
+                    try:
+                        client = await self._async_client_for(slot.key)
+                        response = await client.chat.completions.create(**request)
+                        slot.record(self._total_tokens(response))
+                        return response.choices[0].message.content or ""
+                    except (RateLimitError, AuthenticationError, APIConnectionError) as e:
+                        self._handle_key_error(slot, e)
+        except KeyPoolUnavailable as e:
+            logger.error(f"OpenAI 키를 빌리지 못했습니다: {e}")
+            return None
+        logger.error("All OpenAI keys exhausted.")
+        return None
+
+    def generate_text(self, prompt: str) -> str:
+        try:
+            return self._complete(prompt, json_mode=False) or ""
+        except Exception as e:
+            logger.error(f"OpenAI generate_text failed: {e}")
+            return ""
 
     def generate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
-        if not self.client:
+        try:
+            content = self._complete(prompt, json_mode=True)
+            return json.loads(content) if content else {}
+        except Exception as e:
+            logger.error(f"OpenAI generate_json failed: {e}")
             return {}
 
-        max_retries = len(self.api_keys)
-        attempts = 0
+    async def agenerate_text(self, prompt: str) -> str:
+        try:
+            return await self._acomplete(prompt, json_mode=False) or ""
+        except Exception as e:
+            logger.error(f"OpenAI agenerate_text failed: {e}")
+            return ""
 
-        while attempts < max_retries:
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant. Output valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.3
-                )
-                content = response.choices[0].message.content
-                return json.loads(content)
-            except (RateLimitError, AuthenticationError, APIConnectionError) as e:
-                logger.warning(f"OpenAI Key {self.current_key_index} error: {e}. Rotating.")
-                if not self._rotate_key():
-                    logger.error("All OpenAI keys exhausted.")
-                    return {}
-                attempts += 1
-            except Exception as e:
-                logger.error(f"OpenAI generate_json failed: {e}")
-                return {}
-        return {}
+    async def agenerate_json(self, prompt: str) -> Dict[str, Any] | List[Any]:
+        try:
+            content = await self._acomplete(prompt, json_mode=True)
+            return json.loads(content) if content else {}
+        except Exception as e:
+            logger.error(f"OpenAI agenerate_json failed: {e}")
+            return {}
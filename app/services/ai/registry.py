@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import APIKey
+from app.services.ai.base import AIProvider
+from app.services.ai.providers.gemini import GeminiProvider
+from app.services.ai.providers.ollama import OllamaProvider
+from app.services.ai.providers.openai import OpenAIProvider
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    프로세스 전역 AI 프로바이더 레지스트리.
+
+    - API 키(env + api_keys 테이블)는 한 번 읽어 캐시하고, /api/settings/ai/keys 변경 시 무효화합니다.
+      다른 워커 프로세스의 변경은 ai_key_cache_ttl_sec 이 지나면 반영됩니다.
+    - 프로바이더(SDK 클라이언트)는 처음 쓰일 때 만들고, 키가 바뀌었을 때만 다시 만듭니다.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self._lock = threading.RLock()
+        self._keys: Dict[str, Tuple[List[str], float]] = {}
+        self._providers: Dict[str, Tuple[AIProvider, Tuple[str, ...]]] = {}
+
+    def _load_db_keys(self, provider: str) -> List[str]:
+        try:
+            with self._session_factory() as db:
+                keys = db.query(APIKey.key).filter(
+                    APIKey.provider == provider,
+                    APIKey.is_active == True
+                ).all()
+                return [k[0] for k in keys]
+        except Exception as e:
+            logger.error(f"Failed to fetch {provider} keys from DB: {e}")
+            return []
+
+    def _load_keys(self, provider: str) -> List[str]:
+        if provider == "gemini":
+            keys = settings.gemini_api_keys.copy()
+            if settings.gemini_api_key and settings.gemini_api_key not in keys:
+                keys.insert(0, settings.gemini_api_key)
+        elif provider == "openai":
+            keys = settings.openai_api_keys.copy()
+        else:
+            return []
+        keys.extend([k for k in self._load_db_keys(provider) if k not in keys])
+        return keys
+
+    def keys(self, provider: str) -> List[str]:
+        with self._lock:
+            cached = self._keys.get(provider)
+            if cached is not None and time.monotonic() - cached[1] < settings.ai_key_cache_ttl_sec:
+                return list(cached[0])
+            keys = self._load_keys(provider)
+            self._keys[provider] = (keys, time.monotonic())
+            return list(keys)
+
+    def _build(self, provider: str, keys: List[str]) -> AIProvider:
+        if provider == "gemini":
+            return GeminiProvider(api_keys=keys, max_concurrency=settings.gemini_max_concurrency)
+        if provider == "ollama":
+            return OllamaProvider(
+                base_url=settings.ollama_base_url,
+                model_name=settings.ollama_model,
+                max_concurrency=settings.ollama_max_concurrency,
+            )
+        if provider == "openai":
+            return OpenAIProvider(
+                api_keys=keys,
+                model_name=settings.openai_model,
+                max_concurrency_per_key=settings.openai_key_max_concurrency,
+                tokens_per_minute=settings.openai_tokens_per_minute,
+                rate_limit_cooldown_sec=settings.openai_rate_limit_cooldown_sec,
+                acquire_timeout_sec=settings.openai_key_acquire_timeout_sec,
+            )
+        raise ValueError(f"Unknown AI provider: {provider}")
+
+    def get(self, provider: str) -> AIProvider:
+        with self._lock:
+            keys = tuple(self.keys(provider))
+            cached = self._providers.get(provider)
+            if cached is not None and cached[1] == keys:
+                return cached[0]
+            instance = self._build(provider, list(keys))
+            self._providers[provider] = (instance, keys)
+            return instance
+
+    def invalidate(self, provider: str | None = None) -> None:
+        """
+        키 캐시를 비웁니다. 프로바이더 인스턴스는 다음 get() 에서 키가 달라졌을 때만 다시 만듭니다.
+        """
+        with self._lock:
+            if provider is None:
+                self._keys.clear()
+            else:
+                self._keys.pop(provider, None)
+
+    def invalidate_on_commit(self, session: Session, provider: str | None = None) -> None:
+        """
+        요청 세션이 커밋된 뒤에 무효화합니다(커밋 전에 다시 읽으면 이전 키가 캐시되므로).
+        """
+        event.listen(session, "after_commit", lambda _session: self.invalidate(provider), once=True)
+
+
+provider_registry = ProviderRegistry()
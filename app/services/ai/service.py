@@ -1,78 +1,78 @@
+import json
 import logging
-from typing import Dict, Any, List, Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Literal
 
 from app.settings import settings
-from app.db import SessionLocal
-from app.models import APIKey
 from app.services.ai.base import AIProvider
-from app.services.ai.providers.gemini import GeminiProvider
-from app.services.ai.providers.ollama import OllamaProvider
-from app.services.ai.providers.openai import OpenAIProvider
+from app.services.ai.cache import CACHE_MISS, CachedProvider, llm_cache, make_cache_key
+from app.services.ai.registry import ProviderRegistry, provider_registry
 
 logger = logging.getLogger(__name__)
 
 ProviderType = Literal["gemini", "ollama", "openai", "auto"]
 
-class AIService:
-    def __init__(self):
-        # 1. Fetch DB Keys
-        db_gemini_keys = self._get_db_keys("gemini")
-        db_openai_keys = self._get_db_keys("openai")
-
-        # 2. Setup Gemini Keys (Env + DB)
-        gemini_keys = settings.gemini_api_keys.copy()
-        if settings.gemini_api_key and settings.gemini_api_key not in gemini_keys:
-             gemini_keys.insert(0, settings.gemini_api_key)
-        gemini_keys.extend([k for k in db_gemini_keys if k not in gemini_keys])
-        
-        # 3. Setup OpenAI Keys (Env + DB)
-        openai_keys = settings.openai_api_keys.copy()
-        openai_keys.extend([k for k in db_openai_keys if k not in openai_keys])
 
-        self.gemini = GeminiProvider(api_keys=gemini_keys)
-        self.ollama = OllamaProvider(base_url=settings.ollama_base_url, model_name=settings.ollama_model)
-        self.openai = OpenAIProvider(api_keys=openai_keys, model_name=settings.openai_model)
+def build_specs_prompt(text: str) -> str:
+    return f"""
+        Extract technical specifications from the following product description.
+        Return ONLY a valid JSON object where keys are spec names (normalized to snake_case if possible) and values are the values found.
+        Focus on dimensions, material, weight, voltage, power, etc.
         
-        self.default_provider_name = settings.default_ai_provider
+        Text: {text[:4000]}
+        """
 
-    def _get_db_keys(self, provider: str) -> List[str]:
-        try:
-            with SessionLocal() as db:
-                keys = db.query(APIKey.key).filter(
-                    APIKey.provider == provider, 
-                    APIKey.is_active == True
-                ).all()
-                return [k[0] for k in keys]
-        except Exception as e:
-            logger.error(f"Failed to fetch {provider} keys from DB: {e}")
-            return []
-        
+
+class AIService:
+    """
+    프로바이더/키는 프로세스 전역 레지스트리에서 가져오므로 생성 비용이 없습니다(요청마다 만들어도 됨).
+    """
+
+    def __init__(self, registry: ProviderRegistry | None = None):
+        self.registry = registry or provider_registry
         self.default_provider_name = settings.default_ai_provider
 
-    def _get_provider(self, provider_type: ProviderType = "auto") -> AIProvider:
+    @property
+    def gemini(self) -> AIProvider:
+        return self.registry.get("gemini")
+
+    @property
+    def ollama(self) -> AIProvider:
+        return self.registry.get("ollama")
+
+    @property
+    def openai(self) -> AIProvider:
+        return self.registry.get("openai")
+
+    def _resolve_provider(self, provider_type: ProviderType = "auto") -> tuple[str, AIProvider]:
         if provider_type == "auto":
             provider_type = self.default_provider_name
         
         if provider_type == "gemini":
-            return self.gemini
+            return "gemini", self.gemini
         elif provider_type == "ollama":
-            return self.ollama
+            return "ollama", self.ollama
         elif provider_type == "openai":
-            return self.openai
+            return "openai", self.openai
         else:
             # Fallback based on default, or hard fallback to openai?
             # If default is auto and name was unknown, fallback to openai
-            return self.openai
+            return "openai", self.openai
 
-    def extract_specs(self, text: str, provider: ProviderType = "auto") -> Dict[str, Any]:
-        prompt = f"""
-        Extract technical specifications from the following product description.
-        Return ONLY a valid JSON object where keys are spec names (normalized to snake_case if possible) and values are the values found.
-        Focus on dimensions, material, weight, voltage, power, etc.
-        
-        Text: {text[:4000]}
+    def _get_provider(self, provider_type: ProviderType = "auto", task: str | None = None) -> AIProvider:
+        """
+        task 를 주면 응답 캐시(llm_response_cache)를 거치는 프로바이더를 반환합니다.
         """
-        return self._get_provider(provider).generate_json(prompt)
+        name, provider = self._resolve_provider(provider_type)
+        if task and settings.llm_cache_enabled:
+            return CachedProvider(provider, name, task)
+        return provider
+
+    def _specs_prompt(self, text: str) -> str:
+        return build_specs_prompt(text)
+
+    def extract_specs(self, text: str, provider: ProviderType = "auto") -> Dict[str, Any]:
+        return self._get_provider(provider, task="specs").generate_json(self._specs_prompt(text))
 
     def analyze_pain_points(self, text: str, provider: ProviderType = "auto") -> List[str]:
         prompt = f"""
@@ -81,7 +81,7 @@ class AIService:
         
         Text: {text[:4000]}
         """
-        result = self._get_provider(provider).generate_json(prompt)
+        result = self._get_provider(provider, task="pain_points").generate_json(prompt)
         if isinstance(result, list):
             return result
         return []
@@ -93,13 +93,172 @@ class AIService:
         Keywords: {', '.join(keywords)}
         Return JSON {{ "title": "...", "tags": [...] }}
         """
-        return self._get_provider(provider).generate_json(prompt)
+        return self._get_provider(provider, task="seo").generate_json(prompt)
 
-    def predict_seasonality(self, product_name: str, provider: ProviderType = "auto") -> Dict[str, Any]:
+    def _seasonality_prompt(self, product_name: str) -> str:
         import datetime
         current_month = datetime.datetime.now().month
-        prompt = f"""
+        return f"""
         Analyze seasonality for "{product_name}".
         Return JSON {{ "months": [int], "current_month_score": float (relevance to month {current_month}) }}
         """
-        return self._get_provider(provider).generate_json(prompt)
+
+    def predict_seasonality(self, product_name: str, provider: ProviderType = "auto") -> Dict[str, Any]:
+        return self._get_provider(provider, task="seasonality").generate_json(self._seasonality_prompt(product_name))
+
+    def _run_batched(
+        self,
+        items: List[Any],
+        build_prompt: Callable[[List[Any]], str],
+        parse_one: Callable[[Any], Any],
+        fallback: Callable[[Any], Any],
+        provider: ProviderType,
+        batch_size: int | None,
+        concurrency: int | None,
+        task: str | None = None,
+        single_prompt: Callable[[Any], str] | None = None,
+    ) -> List[Any]:
+        """
+        items 를 batch_size 개씩 하나의 프롬프트로 묶어 호출하고, 묶음들은 concurrency 개까지 동시에 실행합니다.
+        concurrency 를 정하지 않으면 프로바이더의 동시 처리량(키 수 x 키당 동시 요청 수)까지 키를 나눠 씁니다.
+        응답은 {"results": [{"index": i, ...}]} (또는 같은 형태의 JSON 배열)이어야 하며,
+        빠졌거나 해석할 수 없는 항목은 단건 호출(fallback)로 다시 처리합니다.
+        """
+        results: List[Any] = [None] * len(items)
+        if not items:
+            return results
+
+        # 단건 호출과 같은 캐시 키(단건 프롬프트 기준)로 먼저 조회하고, 없는 항목만 묶어서 호출합니다.
+        provider_name, ai = self._resolve_provider(provider)
+        cache_keys: Dict[int, str] = {}
+        pending = list(range(len(items)))
+        if task and single_prompt and settings.llm_cache_enabled:
+            model = str(getattr(ai, "model_name", "") or "")
+            temperature = getattr(ai, "json_temperature", None)
+            pending = []
+            for i, item in enumerate(items):
+                key = make_cache_key(provider_name, model, single_prompt(item), temperature, "json")
+                cached = llm_cache.get(key, task)
+                if cached is CACHE_MISS:
+                    cache_keys[i] = key
+                    pending.append(i)
+                else:
+                    results[i] = cached
+
+        size = max(1, int(batch_size or settings.ai_batch_size))
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        if not chunks:
+            return results
+
+        def _run_chunk(indexes: List[int]) -> None:
+            prompt = build_prompt([items[i] for i in indexes])
+            try:
+                response = ai.generate_json(prompt)
+            except Exception as e:
+                logger.warning(f"AI 배치 호출 실패: {e}")
+                response = None
+
+            entries = response.get("results") if isinstance(response, dict) else response
+            parsed: Dict[int, Any] = {}
+            if isinstance(entries, list):
+                for entry in entries:
+                    if not isinstance(entry, dict):
+                        continue
+                    try:
+                        local_idx = int(entry.get("index"))
+                    except (TypeError, ValueError):
+                        continue
+                    if 0 <= local_idx < len(indexes):
+                        value = parse_one(entry)
+                        if value is not None:
+                            parsed[local_idx] = value
+
+            for local_idx, global_idx in enumerate(indexes):
+                if local_idx in parsed:
+                    results[global_idx] = parsed[local_idx]
+                    if global_idx in cache_keys:
+                        llm_cache.put(cache_keys[global_idx], provider_name, str(getattr(ai, "model_name", "") or ""), task, parsed[local_idx])
+                else:
+                    results[global_idx] = fallback(items[global_idx])
+
+        workers = int(concurrency or settings.ai_batch_concurrency or ai.max_concurrency)
+        workers = max(1, min(workers, len(chunks)))
+        if workers == 1:
+            for chunk in chunks:
+                _run_chunk(chunk)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_run_chunk, chunks))
+        return results
+
+    def extract_specs_batch(
+        self,
+        texts: List[str],
+        provider: ProviderType = "auto",
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 상품의 스펙을 묶어서 추출합니다. 결과는 입력 순서를 유지합니다.
+        """
+        def _build(chunk: List[str]) -> str:
+            payload = [{"index": i, "text": t[:1500]} for i, t in enumerate(chunk)]
+            return f"""
+        Extract technical specifications for EACH product below.
+        Return ONLY a valid JSON object: {{ "results": [{{ "index": int, "specs": {{...}} }}] }}
+        with exactly one entry per input index. Spec keys should be snake_case; focus on dimensions, material, weight, voltage, power, etc.
+
+        Products: {json.dumps(payload, ensure_ascii=False)}
+        """
+
+        def _parse(entry: Dict[str, Any]) -> Dict[str, Any] | None:
+            specs = entry.get("specs")
+            return specs if isinstance(specs, dict) else None
+
+        def _fallback(text: str) -> Dict[str, Any]:
+            result = self.extract_specs(text, provider=provider)
+            return result if isinstance(result, dict) else {}
+
+        return self._run_batched(
+            texts, _build, _parse, _fallback, provider, batch_size, concurrency,
+            task="specs", single_prompt=self._specs_prompt,
+        )
+
+    def predict_seasonality_batch(
+        self,
+        product_names: List[str],
+        provider: ProviderType = "auto",
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 상품의 계절성을 묶어서 예측합니다. 결과는 입력 순서를 유지합니다.
+        """
+        import datetime
+        current_month = datetime.datetime.now().month
+
+        def _build(chunk: List[str]) -> str:
+            payload = [{"index": i, "name": n} for i, n in enumerate(chunk)]
+            return f"""
+        Analyze seasonality for EACH product below.
+        Return ONLY a valid JSON object: {{ "results": [{{ "index": int, "months": [int], "current_month_score": float (relevance to month {current_month}) }}] }}
+        with exactly one entry per input index.
+
+        Products: {json.dumps(payload, ensure_ascii=False)}
+        """
+
+        def _parse(entry: Dict[str, Any]) -> Dict[str, Any] | None:
+            score = entry.get("current_month_score")
+            if not isinstance(score, (int, float)):
+                return None
+            months = entry.get("months")
+            return {"months": months if isinstance(months, list) else [], "current_month_score": float(score)}
+
+        def _fallback(name: str) -> Dict[str, Any]:
+            result = self.predict_seasonality(name, provider=provider)
+            return result if isinstance(result, dict) else {}
+
+        return self._run_batched(
+            product_names, _build, _parse, _fallback, provider, batch_size, concurrency,
+            task="seasonality", single_prompt=self._seasonality_prompt,
+        )
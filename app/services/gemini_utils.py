@@ -1,20 +1,37 @@
 import google.generativeai as genai
 from app.settings import settings
+from app.services.ai.cache import cached_call
 import json
 import logging
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "gemini-1.5-flash"
+
 # Configure Gemini
 if settings.gemini_api_key:
     genai.configure(api_key=settings.gemini_api_key)
     # Using existing stable model
-    model = genai.GenerativeModel('gemini-1.5-flash')
+    model = genai.GenerativeModel(MODEL_NAME)
 else:
     logger.warning("GEMINI_API_KEY is not set. AI features heavily restricted.")
     model = None
 
+def _generate_json(task: str, prompt: str) -> Any:
+    """
+    JSON 응답 생성. 같은 프롬프트는 LLM 응답 캐시(llm_response_cache)에서 돌려줍니다.
+    호출/파싱 실패는 예외로 올라가므로 기본값 응답은 캐시되지 않습니다.
+    """
+    def _call() -> Any:
+        response = model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        return json.loads(response.text)
+
+    return cached_call("gemini", MODEL_NAME, task, "json", prompt, None, _call)
+
 def extract_specs(text: str) -> Dict[str, Any]:
     """
     Extracts technical specifications from product description text/html.
@@ -34,11 +51,7 @@ def extract_specs(text: str) -> Dict[str, Any]:
     """
     
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
-        )
-        return json.loads(response.text)
+        return _generate_json("specs", prompt)
     except Exception as e:
         logger.error(f"Error extracting specs: {e}")
         return {}
@@ -61,25 +74,16 @@ def analyze_pain_points(text: str) -> List[str]:
     """
     
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
-        )
-        return json.loads(response.text)
+        return _generate_json("pain_points", prompt)
     except Exception as e:
         logger.error(f"Error analyzing pain points: {e}")
         return []
 
-def optimize_seo(product_name: str, original_keywords: List[str], detail_text: str = "") -> Dict[str, Any]:
+def build_seo_prompt(product_name: str, original_keywords: List[str], detail_text: str = "") -> str:
     """
-    Optimizes product title and generates tags for SEO.
-    Uses detail_text to extract USP (Unique Selling Points) for more unique names.
-    Returns dict with 'title' and 'tags'.
+    SEO 상품명 프롬프트. 오프라인 배치(app.services.ai.batch)에서도 같은 프롬프트를 씁니다.
     """
-    if not model:
-        return {"title": product_name, "tags": original_keywords[:20]}
-
-    prompt = f"""
+    return f"""
     Optimize the following product name for SEO on a Korean e-commerce platform (Coupang).
     
     Goal: Create a UNIQUE, high-click-through-rate title that avoids "Item Winner" grouping (exact name matches).
@@ -100,13 +104,20 @@ def optimize_seo(product_name: str, original_keywords: List[str], detail_text: s
     - "title": (string) The optimized Korean title.
     - "tags": (list of strings) Top 20 search tags.
     """
+
+def optimize_seo(product_name: str, original_keywords: List[str], detail_text: str = "") -> Dict[str, Any]:
+    """
+    Optimizes product title and generates tags for SEO.
+    Uses detail_text to extract USP (Unique Selling Points) for more unique names.
+    Returns dict with 'title' and 'tags'.
+    """
+    if not model:
+        return {"title": product_name, "tags": original_keywords[:20]}
+
+    prompt = build_seo_prompt(product_name, original_keywords, detail_text)
     
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
-        )
-        return json.loads(response.text)
+        return _generate_json("seo", prompt)
     except Exception as e:
         logger.error(f"Error optimizing SEO: {e}")
         return {"title": product_name, "tags": original_keywords[:20]}
@@ -133,11 +144,7 @@ def predict_seasonality(product_name: str) -> Dict[str, Any]:
     """
     
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
-        )
-        return json.loads(response.text)
+        return _generate_json("seasonality", prompt)
     except Exception as e:
         logger.error(f"Error predicting seasonality: {e}")
         return {"score": 0.5, "months": []} # Default neutral
@@ -0,0 +1,94 @@
+import logging
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8  # 8x8 = 64비트 dHash
+HASH_BITS = HASH_SIZE * HASH_SIZE
+# 켜진 비트가 이 수 이하(또는 64 - 이 수 이상)인 해시는 거의 단색이라 서로 다른 그림도 가깝게 나옵니다.
+LOW_INFORMATION_BITS = 4
+
+
+def dhash(content: bytes, min_side: int = 64, min_contrast: float = 0.0) -> Optional[int]:
+    """
+    difference hash(64비트). 크기/압축률이 달라도 같은 그림이면 거의 같은 값이 나옵니다.
+    JPEG 는 줄여서 디코드합니다(짧은 변이 min_side 이상 남는 선에서). 디코드 실패 시 None.
+    9x8 로 줄인 밝기의 표준편차가 min_contrast 미만이면(흰 바탕 상세 조각 등) 해시가 잡음에 가까우므로
+    None 을 반환해 중복 비교에서 제외합니다.
+
+    프로세스 풀에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    try:
+        buf = np.frombuffer(content, np.uint8)
+        img = None
+        if content[:2] == b"\xff\xd8":
+            for flag in (cv2.IMREAD_REDUCED_GRAYSCALE_8, cv2.IMREAD_REDUCED_GRAYSCALE_4, cv2.IMREAD_REDUCED_GRAYSCALE_2):
+                img = cv2.imdecode(buf, flag)
+                if img is None or min(img.shape[:2]) >= min_side:
+                    break
+        if img is None or min(img.shape[:2]) < min_side:
+            img = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            return None
+
+        small = cv2.resize(img, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA).astype(np.int16)
+        if min_contrast > 0 and float(small.std()) < min_contrast:
+            return None
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+    except Exception as e:
+        logger.error(f"이미지 해시 계산 실패: {e}")
+        return None
+
+
+def is_low_information(value: int) -> bool:
+    """
+    켜진 비트가 거의 없거나 거의 다 켜진 해시(단색/단순 그라데이션)인지 여부.
+    """
+    bits = bin(value).count("1")
+    return bits <= LOW_INFORMATION_BITS or bits >= HASH_BITS - LOW_INFORMATION_BITS
+
+
+def hamming_matrix(hashes: Sequence[int]) -> np.ndarray:
+    """
+    (n, n) 해밍 거리 행렬. XOR 후 바이트 단위 비트 전개로 한 번에 계산합니다.
+    """
+    values = np.asarray(hashes, dtype=np.uint64)
+    xor = values[:, None] ^ values[None, :]
+    return np.unpackbits(xor.view(np.uint8).reshape(len(values), len(values), 8), axis=2).sum(axis=2)
+
+
+def select_unique(
+    hashes: Sequence[int],
+    priorities: Sequence[int],
+    max_distance: int,
+    kept: Sequence[int] = (),
+) -> List[int]:
+    """
+    서로 max_distance 비트 이내인 이미지 중 하나만 남기고, 남길 인덱스를 원래 순서로 반환합니다.
+
+    - priorities 가 큰 것(예: 픽셀 수가 큰 원본)을 먼저 남깁니다.
+    - kept 는 이미 남긴 이미지의 해시(이전 묶음/재사용 가공본)이며, 이와 가까운 이미지는 모두 제외합니다.
+    - 정보량이 적은 해시(is_low_information)는 비교하지 않고 항상 남깁니다.
+    """
+    n = len(hashes)
+    if n == 0:
+        return []
+    kept = [h for h in kept if not is_low_information(h)]
+    distances = hamming_matrix(list(kept) + list(hashes))
+    offset = len(kept)
+    taken = list(range(offset))
+    always = []
+    order = sorted(range(n), key=lambda i: (-priorities[i], i))
+    for i in order:
+        if is_low_information(hashes[i]):
+            always.append(i)
+            continue
+        row = distances[offset + i]
+        if taken and (row[taken] <= max_distance).any():
+            continue
+        taken.append(offset + i)
+    return sorted([i - offset for i in taken[offset:]] + always)
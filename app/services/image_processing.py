@@ -1,17 +1,250 @@
+import asyncio
 import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 import cv2
+import httpx
 import numpy as np
-import requests
 from bs4 import BeautifulSoup
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import random
+import struct
+import threading
 
+from app.services.image_dedup import dhash, select_unique
+from app.services.image_store import image_store, sha256_hex
 from app.services.storage_service import storage_service
+from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+_executor: Executor | None = None
+_executor_mode: str | None = None
+_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ImageOutputProfile:
+    max_width: int   # 0 이면 제한 없음
+    max_height: int  # 0 이면 제한 없음(세로로 긴 상세 이미지는 폭만 맞춰 읽을 수 있게 둠)
+    fmt: str         # jpg, webp
+    quality: int
+
+    def scale_for(self, width: int, height: int) -> float:
+        # 제한 안에 들어가도록 줄이는 배율(1.0 이면 줄일 필요 없음)
+        scale = 1.0
+        if self.max_width and width > self.max_width:
+            scale = min(scale, self.max_width / width)
+        if self.max_height and height > self.max_height:
+            scale = min(scale, self.max_height / height)
+        return scale
+
+
+IMAGE_OUTPUT_PROFILES: Dict[str, ImageOutputProfile] = {
+    "original": ImageOutputProfile(0, 0, "jpg", 90),  # 이전 동작(원본 해상도, JPEG 90)
+    "market": ImageOutputProfile(1000, 0, "jpg", 85),
+    "webp": ImageOutputProfile(1000, 0, "webp", 80),
+    "thumbnail": ImageOutputProfile(500, 500, "webp", 75),
+}
+
+
+def get_output_profile(name: str | None = None) -> ImageOutputProfile:
+    name = str(name or settings.image_output_profile or "market").strip().lower()
+    profile = IMAGE_OUTPUT_PROFILES.get(name)
+    if profile is None:
+        logger.warning(f"알 수 없는 이미지 출력 프로필: {name}, market 으로 처리합니다")
+        return IMAGE_OUTPUT_PROFILES["market"]
+    return profile
+
+
+def probe_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    헤더만 읽어 (width, height) 를 반환합니다(JPEG/PNG/GIF/WebP). 알 수 없으면 None.
+    """
+    try:
+        if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+            return struct.unpack(">II", data[16:24])
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", data[6:10])
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            chunk = data[12:16]
+            if chunk == b"VP8 ":
+                w, h = struct.unpack("<HH", data[26:30])
+                return w & 0x3FFF, h & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(data[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+            return None
+        if data[:2] == b"\xff\xd8":
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xFF:
+                    i += 1
+                    continue
+                marker = data[i + 1]
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                    i += 1 if marker == 0xFF else 2
+                    continue
+                length = struct.unpack(">H", data[i + 2:i + 4])[0]
+                # SOF0~SOF15 (DHT/JPG/DAC 제외)
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    h, w = struct.unpack(">HH", data[i + 5:i + 9])
+                    return w, h
+                i += 2 + length
+    except struct.error:
+        return None
+    return None
+
+
+def _decode_flag(size: Optional[Tuple[int, int]], is_jpeg: bool, profile: ImageOutputProfile) -> int:
+    # JPEG 는 디코딩 단계에서 1/2, 1/4, 1/8 로 줄여 읽을 수 있습니다(목표 크기보다 작아지지 않는 선에서).
+    if not (size and is_jpeg):
+        return cv2.IMREAD_COLOR
+    scale = profile.scale_for(*size)
+    for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if scale * factor <= 1.0:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def prepare_image(
+    content: bytes,
+    profile_name: str | None = None,
+    min_dimension: int | None = None,
+) -> Tuple[Optional[bytes], str]:
+    """
+    업로드용 이미지를 만듭니다: 작은 이미지 거르기 -> (축소) 디코드 -> 해시 브레이킹 -> 프로필 형식으로 인코드.
+    반환: (바이트, 상태) 상태는 ok / rejected(아이콘·추적 픽셀 등 너무 작음) / failed
+
+    프로세스 풀에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    profile = get_output_profile(profile_name)
+    min_dim = int(settings.image_min_dimension if min_dimension is None else min_dimension)
+    try:
+        # 포크된 워커끼리 난수 상태가 같지 않도록 호출마다 새로 시드합니다.
+        rng = random.Random()
+
+        # 1. 헤더의 크기로 먼저 거르고, 가능하면 줄여서 디코드
+        size = probe_image_size(content)
+        if size and min(size) < min_dim:
+            return None, "rejected"
+        flag = _decode_flag(size, content[:2] == b"\xff\xd8", profile)
+        img = cv2.imdecode(np.frombuffer(content, np.uint8), flag)
+        if img is None:
+            return None, "failed"
+
+        height, width = img.shape[:2]
+        if size is None and min(height, width) < min_dim:
+            return None, "rejected"
+
+        # 2. Resize: 최대 크기보다 크면 그 안으로 줄이고(98~100% 무작위), 아니면 이전처럼 1~2% 확대
+        scale = profile.scale_for(width, height)
+        if scale < 1.0:
+            scale *= rng.uniform(0.98, 1.0)
+            interpolation = cv2.INTER_AREA
+        else:
+            scale = rng.uniform(1.01, 1.02)
+            interpolation = cv2.INTER_LANCZOS4
+        img = cv2.resize(img, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=interpolation)
+
+        # 3. Brightness/Contrast Adjustment (Random minimal)
+        alpha = rng.uniform(0.98, 1.02) # Contrast
+        beta = rng.randint(-5, 5)       # Brightness
+        img = cv2.convertScaleAbs(img, alpha=alpha, beta=beta)
+
+        # 4. Strip Metadata (Implicit by decoding/encoding) & Encode
+        if profile.fmt == "webp":
+            success, encoded_img = cv2.imencode(".webp", img, [int(cv2.IMWRITE_WEBP_QUALITY), profile.quality])
+        else:
+            success, encoded_img = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), profile.quality])
+        if not success:
+            return None, "failed"
+        return encoded_img.tobytes(), "ok"
+
+    except Exception as e:
+        logger.error(f"Error in hash breaking: {e}")
+        return None, "failed"
+
+
+def hash_break_image(image_api_response_content: bytes) -> Optional[bytes]:
+    """
+    Applies subtle modifications to the image to break perceptual hashing (Winner System Avoidance).
+    원본 해상도/JPEG 90 으로 가공합니다(이전 동작). 파이프라인은 prepare_image 를 씁니다.
+    """
+    processed, _status = prepare_image(image_api_response_content, "original", min_dimension=0)
+    return processed
+
+
+def _get_executor() -> Executor | None:
+    global _executor, _executor_mode
+
+    mode = str(settings.image_process_executor or "process").strip().lower()
+    if mode == "inline":
+        return None
+    # 여러 스레드(백그라운드 job)가 동시에 처음 호출해도 풀은 하나만 만듭니다.
+    with _executor_lock:
+        if _executor is not None and _executor_mode == mode:
+            return _executor
+
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        workers = max(1, int(settings.image_process_workers or (os.cpu_count() or 2)))
+        if mode == "thread":
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-process")
+        else:
+            # OpenCV 는 디코드/리사이즈/인코드 중 GIL 을 일부만 놓으므로 프로세스 풀이 기본입니다.
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_mode = mode
+        return _executor
+
+
+@dataclass
+class ImagePipelineResult:
+    urls: List[str] = field(default_factory=list)
+    attempted: int = 0
+    reused: int = 0  # 이미 업로드된 가공본을 재사용한 수
+    rejected: int = 0  # 아이콘/추적 픽셀 등 너무 작아 제외한 수
+    duplicates: int = 0  # 유사 중복(dHash)으로 제외한 수
+    bytes_in: int = 0  # 가공한 원본 바이트
+    bytes_out: int = 0  # 업로드한 바이트
+    # 단계별 (합계 초, 가장 느린 이미지 초) 와 전체 소요 시간
+    stage_sec: Dict[str, List[float]] = field(default_factory=lambda: {"download": [0.0, 0.0], "dedup": [0.0, 0.0], "process": [0.0, 0.0], "upload": [0.0, 0.0]})
+    wall_sec: float = 0.0
+
+    def add(self, stage: str, elapsed: float) -> None:
+        total, slowest = self.stage_sec[stage]
+        self.stage_sec[stage] = [total + elapsed, max(slowest, elapsed)]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "uploaded": len(self.urls),
+            "attempted": self.attempted,
+            "reused": self.reused,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "bytesIn": self.bytes_in,
+            "bytesOut": self.bytes_out,
+            "wallSec": round(self.wall_sec, 3),
+            "stages": {k: {"totalSec": round(v[0], 3), "maxSec": round(v[1], 3)} for k, v in self.stage_sec.items()},
+        }
+
+
+@dataclass
+class _FetchedImage:
+    url: str
+    content: Optional[bytes]
+    sha: Optional[str] = None
+    dhash: Optional[int] = None
+    pixels: int = 0
+    reused_url: Optional[str] = None  # 이미 업로드된 가공본(다시 가공/업로드하지 않음)
+
+
 class ImageProcessingService:
-    
+
     def extract_images_from_html(self, html_content: str, limit: int = 10) -> List[str]:
         """
         Extracts image URLs from HTML content (e.g. detail page).
@@ -30,8 +263,8 @@ class ImageProcessingService:
                     if src.startswith("//"):
                         src = "https:" + src
                     
-                    # Filter out tiny icons or tracking pixels if possible (naive check by name/ext)
-                    if not any(x in src.lower() for x in [".gif", "icon", "logo", "pixel"]):
+                    # 아이콘/추적 픽셀은 다운로드 후 실제 크기로 거릅니다(image_min_dimension).
+                    if not src.startswith("data:"):
                         urls.append(src)
                         
                 if len(urls) >= limit:
@@ -42,108 +275,279 @@ class ImageProcessingService:
             return []
 
     def hash_breaking(self, image_api_response_content: bytes) -> Optional[bytes]:
+        return hash_break_image(image_api_response_content)
+
+    def _candidate_urls(self, image_urls: List[str], detail_html: str) -> List[str]:
+        target_count = 5
+
+        # 1. Supplement Images
+        candidates = image_urls[:]
+        if len(candidates) < target_count and detail_html:
+            logger.info(f"Not enough images ({len(candidates)}), extracting from detail HTML...")
+            extra_images = self.extract_images_from_html(detail_html, limit=target_count - len(candidates) + 5) # Get a few more to be safe
+            candidates.extend(extra_images)
+
+        # Deduplicate
+        return list(dict.fromkeys(candidates))
+
+    def variant_name(self) -> str:
+        # 출력 프로필이 다르면 다른 가공본입니다.
+        return f"{settings.image_variant_name}:{str(settings.image_output_profile).strip().lower()}"
+
+    def new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=settings.image_download_timeout_sec,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max(1, int(settings.image_download_concurrency))),
+        )
+
+    async def _run_cpu(self, func, *args):
+        executor = _get_executor()
+        if executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def _fetch_one(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        product_id: str,
+        result: ImagePipelineResult,
+        download_sem: asyncio.Semaphore,
+        known_sha: Optional[str] = None,
+        known_variants: Optional[Dict[str, str]] = None,
+    ) -> _FetchedImage | None:
         """
-        Applies subtle modifications to the image to break perceptual hashing (Winner System Avoidance).
-        1. Decode
-        2. Resize slightly (101% - 102%)
-        3. Adjust brightness/contrast slightly
-        4. Encode back to bytes
+        원본을 가져옵니다(디스크 캐시 또는 다운로드). 이미 가공본이 있으면 reused_url 에 그 URL 을 담아 반환합니다.
         """
+        use_store = bool(settings.image_store_enabled)
         try:
-            # 1. Decode
-            nparr = np.frombuffer(image_api_response_content, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                return None
-            
-            # 2. Resize (Zoom in/Scale up slightly)
-            scale = random.uniform(1.01, 1.02) # 1% ~ 2%
-            height, width = img.shape[:2]
-            new_height, new_width = int(height * scale), int(width * scale)
-            img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
-            
-            # Crop back to roughly original or keep scaled (Keeping scaled is fine for now, usually better quality)
-            # Let's crop center to remove potential border artifacts if we want original size, 
-            # but usually just resizing is enough to break hash. 
-            # To be safe, let's crop the center to original size to avoid weird aspect ratios if we just stretched.
-            # start_h = (new_height - height) // 2
-            # start_w = (new_width - width) // 2
-            # img = img[start_h:start_h+height, start_w:start_w+width]
-
-            # 3. Brightness/Contrast Adjustment (Random minimal)
-            alpha = random.uniform(0.98, 1.02) # Contrast
-            beta = random.randint(-5, 5)       # Brightness
-            img = cv2.convertScaleAbs(img, alpha=alpha, beta=beta)
-            
-            # 4. Strip Metadata (Implicit by decoding/encoding) & Encode
-            success, encoded_img = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
-            if not success:
+            content: Optional[bytes] = None
+            sha = known_sha
+            if use_store and sha:
+                # 이미 가공/업로드한 원본이면 다운로드와 업로드를 모두 건너뜁니다.
+                # (중복 제거가 켜져 있고 디스크에 원본이 남아 있으면 해시만 계산해 같은 그림의 다른 URL 을 걸러냅니다)
+                if known_variants and sha in known_variants:
+                    image_store.count("variantHits")
+                    result.reused += 1
+                    if settings.image_dedup_enabled:
+                        content = await asyncio.to_thread(image_store.disk.get, sha)
+                    return await self._with_hash(
+                        _FetchedImage(url=url, content=content, sha=sha, reused_url=known_variants[sha]), result
+                    )
+                content = await asyncio.to_thread(image_store.disk.get, sha)
+                if content is not None:
+                    image_store.count("diskHits")
+
+            if content is None:
+                # Download
+                started = time.perf_counter()
+                async with download_sem:
+                    resp = await client.get(url)
+                result.add("download", time.perf_counter() - started)
+                if resp.status_code != 200:
+                    logger.warning(f"이미지 다운로드 실패: HTTP {resp.status_code} ({url})")
+                    return None
+                content = resp.content
+
+                if use_store:
+                    image_store.count("downloads")
+                    sha = sha256_hex(content)
+                    await asyncio.to_thread(image_store.disk.put, sha, content)
+                    await asyncio.to_thread(image_store.record_source, url, sha, len(content))
+                    # URL 은 달라도 내용이 같은 이미지를 이미 가공했을 수 있습니다.
+                    existing = await asyncio.to_thread(
+                        image_store.lookup_variants, [sha], self.variant_name(), image_store.scope_key(product_id)
+                    )
+                    if sha in existing:
+                        image_store.count("variantHits")
+                        result.reused += 1
+                        return await self._with_hash(
+                            _FetchedImage(url=url, content=content, sha=sha, reused_url=existing[sha]), result
+                        )
+
+            return await self._with_hash(_FetchedImage(url=url, content=content, sha=sha), result)
+
+        except Exception as e:
+            logger.error(f"Failed to process image {url}: {e}")
+            return None
+
+    async def _with_hash(self, fetched: _FetchedImage, result: ImagePipelineResult) -> _FetchedImage:
+        if settings.image_dedup_enabled and fetched.content is not None:
+            started = time.perf_counter()
+            fetched.dhash = await self._run_cpu(dhash, fetched.content, 64, float(settings.image_dedup_min_contrast))
+            result.add("dedup", time.perf_counter() - started)
+            size = probe_image_size(fetched.content)
+            fetched.pixels = size[0] * size[1] if size else 0
+        return fetched
+
+    async def _render_and_upload(
+        self,
+        fetched: _FetchedImage,
+        product_id: str,
+        result: ImagePipelineResult,
+        upload_sem: asyncio.Semaphore,
+    ) -> Optional[str]:
+        url, content, sha = fetched.url, fetched.content, fetched.sha
+        try:
+            # 크기 제한/해시 브레이킹/인코드 (프로세스 풀)
+            profile_name = str(settings.image_output_profile)
+            min_dim = int(settings.image_min_dimension)
+            started = time.perf_counter()
+            processed_bytes, status = await self._run_cpu(prepare_image, content, profile_name, min_dim)
+            result.add("process", time.perf_counter() - started)
+            result.bytes_in += len(content)
+            if status == "rejected":
+                result.rejected += 1
                 return None
-                
-            return encoded_img.tobytes()
-            
+            file_ext = get_output_profile(profile_name).fmt
+            if not processed_bytes:
+                # Fallback to original if processing fails (e.g. invalid format)
+                logger.warning(f"Hash breaking failed for {url}, using original.")
+                processed_bytes = content
+                file_ext = "jpg"
+
+            # Upload (공유 커넥션 풀)
+            started = time.perf_counter()
+            async with upload_sem:
+                new_url = await storage_service.aupload_image(
+                    processed_bytes,
+                    file_ext=file_ext,
+                    path_prefix=f"market_processing/{product_id}",
+                )
+            result.add("upload", time.perf_counter() - started)
+            if new_url:
+                result.bytes_out += len(processed_bytes)
+
+            if new_url and settings.image_store_enabled and sha:
+                image_store.count("uploads")
+                new_url = await asyncio.to_thread(
+                    image_store.record_variant,
+                    sha,
+                    self.variant_name(),
+                    image_store.scope_key(product_id),
+                    new_url,
+                    len(processed_bytes),
+                )
+            return new_url
+
         except Exception as e:
-            logger.error(f"Error in hash breaking: {e}")
+            logger.error(f"Failed to process image {url}: {e}")
             return None
 
+    def _drop_near_duplicates(
+        self,
+        fetched: List[_FetchedImage | None],
+        kept_hashes: List[int],
+        result: ImagePipelineResult,
+    ) -> List[_FetchedImage | None]:
+        # 같은 그림이 다른 URL/크기로 들어온 경우 가장 큰 원본 하나만 남깁니다(이전 묶음/재사용 가공본 포함).
+        hashed = [
+            i for i, item in enumerate(fetched) if item is not None and item.reused_url is None and item.dhash is not None
+        ]
+        if not hashed:
+            return fetched
+        keep = set(
+            hashed[i]
+            for i in select_unique(
+                [fetched[i].dhash for i in hashed],
+                [fetched[i].pixels for i in hashed],
+                int(settings.image_dedup_max_distance),
+                kept=kept_hashes,
+            )
+        )
+        dropped = [i for i in hashed if i not in keep]
+        if dropped:
+            result.duplicates += len(dropped)
+            logger.info(f"유사 중복 이미지 {len(dropped)}장 제외: {[fetched[i].url for i in dropped]}")
+        return [None if i in dropped else item for i, item in enumerate(fetched)]
+
+    async def process_and_upload_images_async(
+        self,
+        image_urls: List[str],
+        detail_html: str = "",
+        product_id: str = "temp",
+        client: httpx.AsyncClient | None = None,
+    ) -> ImagePipelineResult:
+        """
+        후보 이미지를 묶음 단위로 동시에 다운로드 -> 유사 중복 제거 -> 해시 브레이킹 -> 업로드합니다.
+        결과 URL 은 후보 순서를 유지하며, 최대 image_max_per_product 장까지 올립니다.
+        실패하거나 중복으로 빠진 이미지가 있으면 남은 후보로 부족한 만큼만 다시 시도합니다.
+        여러 상품을 처리하는 호출자는 client 를 넘겨 커넥션을 재사용할 수 있습니다.
+        """
+        if client is None:
+            async with self.new_client() as own_client:
+                return await self.process_and_upload_images_async(image_urls, detail_html, product_id, client=own_client)
+
+        result = ImagePipelineResult()
+        started = time.perf_counter()
+        candidates = self._candidate_urls(image_urls, detail_html)
+        max_images = max(1, int(settings.image_max_per_product))
+
+        logger.info(f"Processing {len(candidates)} images for product {product_id}...")
+
+        download_sem = asyncio.Semaphore(max(1, int(settings.image_download_concurrency)))
+        upload_sem = asyncio.Semaphore(max(1, int(settings.image_upload_concurrency)))
+        kept_hashes: List[int] = []
+        remaining = candidates
+        while remaining and len(result.urls) < max_images:
+            wave, remaining = remaining[: max_images - len(result.urls)], remaining[max_images - len(result.urls):]
+            result.attempted += len(wave)
+            sources: Dict[str, str] = {}
+            variants: Dict[str, str] = {}
+            if settings.image_store_enabled:
+                # 이번 묶음의 URL -> 원본 해시 -> 가공본을 한 번에 조회합니다.
+                sources = await asyncio.to_thread(image_store.lookup_sources, wave)
+                variants = await asyncio.to_thread(
+                    image_store.lookup_variants,
+                    list(sources.values()),
+                    self.variant_name(),
+                    image_store.scope_key(product_id),
+                )
+            fetched = await asyncio.gather(
+                *(self._fetch_one(client, url, product_id, result, download_sem, sources.get(url), variants) for url in wave)
+            )
+            if settings.image_dedup_enabled:
+                # 재사용하는 가공본도 결과에 들어가므로, 같은 그림의 새 이미지를 올리지 않도록 먼저 기준에 넣습니다.
+                kept_hashes.extend(
+                    item.dhash for item in fetched if item is not None and item.reused_url and item.dhash is not None
+                )
+                fetched = self._drop_near_duplicates(fetched, kept_hashes, result)
+
+            async def _finish(item: _FetchedImage | None) -> Optional[str]:
+                if item is None:
+                    return None
+                if item.reused_url:
+                    return item.reused_url
+                return await self._render_and_upload(item, product_id, result, upload_sem)
+
+            uploaded = await asyncio.gather(*(_finish(item) for item in fetched))
+            kept_hashes.extend(
+                item.dhash
+                for item, new_url in zip(fetched, uploaded)
+                if item is not None and item.reused_url is None and item.dhash is not None and new_url
+            )
+            # 내용이 같은 이미지(URL 만 다름)는 같은 가공본 URL 이 되므로 한 번만 넣습니다.
+            result.urls.extend(u for u in dict.fromkeys(uploaded) if u and u not in result.urls)
+
+        result.wall_sec = time.perf_counter() - started
+        logger.info(f"이미지 처리 완료 (product={product_id}): {result.to_dict()}")
+        return result
+
     def process_and_upload_images(self, image_urls: List[str], detail_html: str = "", product_id: str = "temp") -> List[str]:
         """
         Main pipeline:
         1. Check image count, supplement from HTML if < 5.
-        2. Download -> Hash Break -> Upload to Supabase.
+        2. Download -> Hash Break -> Upload to Supabase (이미지별 동시 실행).
         3. Return new URLs.
         """
-        target_count = 5
-        processed_urls = []
-        
-        # 1. Supplement Images
-        candidates = image_urls[:]
-        if len(candidates) < target_count and detail_html:
-            logger.info(f"Not enough images ({len(candidates)}), extracting from detail HTML...")
-            extra_images = self.extract_images_from_html(detail_html, limit=target_count - len(candidates) + 5) # Get a few more to be safe
-            candidates.extend(extra_images)
-            
-        # Deduplicate
-        seen = set()
-        unique_candidates = []
-        for url in candidates:
-            if url not in seen:
-                unique_candidates.append(url)
-                seen.add(url)
-        
-        # 2. Process
-        logger.info(f"Processing {len(unique_candidates)} images for product {product_id}...")
-        
-        for i, url in enumerate(unique_candidates):
-            if len(processed_urls) >= 10: # Safety cap
-                break
-                
+
+        async def _run() -> ImagePipelineResult:
             try:
-                # Download
-                resp = requests.get(url, timeout=10)
-                if resp.status_code != 200:
-                    continue
-                
-                # Hash Breaking
-                processed_bytes = self.hash_breaking(resp.content)
-                if not processed_bytes:
-                    # Fallback to original if processing fails (e.g. invalid format)
-                    logger.warning(f"Hash breaking failed for {url}, using original.")
-                    processed_bytes = resp.content
-                
-                # Upload
-                new_url = storage_service.upload_image(
-                    processed_bytes, 
-                    path_prefix=f"market_processing/{product_id}"
-                )
-                
-                if new_url:
-                    processed_urls.append(new_url)
-                    
-            except Exception as e:
-                logger.error(f"Failed to process image {url}: {e}")
-                
-        return processed_urls
+                return await self.process_and_upload_images_async(image_urls, detail_html, product_id)
+            finally:
+                await storage_service.aclose()
+
+        return asyncio.run(_run()).urls
 
 image_processing_service = ImageProcessingService()
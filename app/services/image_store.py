@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import ImageSource, ImageVariant
+from app.session_factory import session_factory
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class DiskLRUCache:
+    """
+    원본 이미지 바이트를 sha256 파일명으로 디스크에 보관합니다(ab/abcdef... 구조).
+    최대 용량을 넘으면 가장 오래 쓰지 않은(mtime 기준) 파일부터 지웁니다.
+    """
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._total: int | None = None
+
+    def _path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha
+
+    def _scan(self) -> int:
+        if self._total is None:
+            self._total = sum(p.stat().st_size for p in self.root.glob("*/*") if p.is_file()) if self.root.exists() else 0
+        return self._total
+
+    def get(self, sha: str) -> bytes | None:
+        if self.max_bytes <= 0:
+            return None
+        path = self._path(sha)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"이미지 캐시 읽기 실패: {e}")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, sha: str, data: bytes) -> None:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        path = self._path(sha)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                os.utime(path)
+                return
+            tmp = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"이미지 캐시 저장 실패: {e}")
+            return
+
+        with self._lock:
+            self._total = self._scan() + len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 용량의 90% 까지 줄입니다(매번 전체를 훑지 않도록 여유를 둠).
+        target = int(self.max_bytes * 0.9)
+        files = sorted(
+            (p for p in self.root.glob("*/*") if p.is_file()),
+            key=lambda p: p.stat().st_mtime,
+        )
+        total = sum(p.stat().st_size for p in files)
+        for p in files:
+            if total <= target:
+                break
+            try:
+                size = p.stat().st_size
+                p.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._total = total
+
+
+class ImageStore:
+    """
+    내용 주소 기반 이미지 저장소.
+
+    URL -> sha256(image_sources) -> 가공본 URL(image_variants), 원본 바이트는 디스크 LRU.
+    이미 가공/업로드한 이미지는 다운로드와 업로드를 모두 건너뜁니다.
+    DB 오류는 캐시 미스로 처리하고 가공을 막지 않습니다.
+    """
+
+    def __init__(self, disk: DiskLRUCache | None = None) -> None:
+        self.disk = disk or DiskLRUCache(settings.image_cache_dir, int(settings.image_cache_max_mb) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._stats = {"variantHits": 0, "diskHits": 0, "downloads": 0, "uploads": 0, "dbErrors": 0}
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def scope_key(self, product_id: str) -> str:
+        # global: 같은 원본이면 모든 상품이 가공본 하나를 공유, product: 상품마다 따로 가공(다운로드 캐시만 공유)
+        return product_id if settings.image_variant_scope == "product" else ""
+
+    def lookup_sources(self, urls: list[str]) -> dict[str, str]:
+        """
+        {url: content_sha256} (알려진 URL 만)
+        """
+        if not urls:
+            return {}
+        by_hash = {url_hash(u): u for u in urls}
+        try:
+            with session_factory() as session:
+                rows = session.execute(
+                    select(ImageSource.url_hash, ImageSource.content_sha256).where(ImageSource.url_hash.in_(list(by_hash)))
+                ).all()
+        except Exception as e:
+            self.count("dbErrors")
+            logger.warning(f"이미지 원본 조회 실패: {e}")
+            return {}
+        return {by_hash[row.url_hash]: row.content_sha256 for row in rows}
+
+    def lookup_variants(self, shas: list[str], variant: str, scope_key: str) -> dict[str, str]:
+        """
+        {content_sha256: public_url}
+        """
+        if not shas:
+            return {}
+        try:
+            with session_factory() as session:
+                rows = session.execute(
+                    select(ImageVariant.content_sha256, ImageVariant.public_url)
+                    .where(tuple_(ImageVariant.content_sha256, ImageVariant.variant, ImageVariant.scope_key).in_(
+                        [(sha, variant, scope_key) for sha in set(shas)]
+                    ))
+                ).all()
+        except Exception as e:
+            self.count("dbErrors")
+            logger.warning(f"이미지 가공본 조회 실패: {e}")
+            return {}
+        return {row.content_sha256: row.public_url for row in rows}
+
+    def record_source(self, url: str, sha: str, size: int) -> None:
+        try:
+            with session_factory() as session:
+                stmt = insert(ImageSource).values(url_hash=url_hash(url), url=url, content_sha256=sha, size_bytes=size)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["url_hash"],
+                    set_={"content_sha256": stmt.excluded.content_sha256, "size_bytes": stmt.excluded.size_bytes, "fetched_at": stmt.excluded.fetched_at},
+                )
+                session.execute(stmt)
+                session.commit()
+        except Exception as e:
+            self.count("dbErrors")
+            logger.warning(f"이미지 원본 저장 실패: {e}")
+
+    def record_variant(self, sha: str, variant: str, scope_key: str, public_url: str, size: int) -> str:
+        """
+        가공본을 등록하고 최종 URL 을 반환합니다. 다른 워커가 먼저 등록했으면 그 URL 을 씁니다.
+        """
+        try:
+            with session_factory() as session:
+                stmt = insert(ImageVariant).values(
+                    content_sha256=sha, variant=variant, scope_key=scope_key, public_url=public_url, size_bytes=size
+                ).on_conflict_do_nothing(index_elements=["content_sha256", "variant", "scope_key"])
+                session.execute(stmt)
+                existing = session.scalar(
+                    select(ImageVariant.public_url)
+                    .where(ImageVariant.content_sha256 == sha)
+                    .where(ImageVariant.variant == variant)
+                    .where(ImageVariant.scope_key == scope_key)
+                )
+                session.commit()
+                return existing or public_url
+        except Exception as e:
+            self.count("dbErrors")
+            logger.warning(f"이미지 가공본 저장 실패: {e}")
+            return public_url
+
+
+image_store = ImageStore()
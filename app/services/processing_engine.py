@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import Product, SupplierItemRaw
+from app.services.gemini_utils import optimize_seo
+from app.services.image_processing import image_processing_service
+from app.services.processing_service import processing_inputs
+from app.services.storage_service import storage_service
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessingStats:
+    claimed: int = 0
+    completed: int = 0
+    partial: int = 0
+    failed: int = 0
+    elapsed_sec: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        # ProcessingService.process_pending_products 와 같은 기준(예외 없이 끝난 상품 수)
+        return self.completed + self.partial
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "partialFailure": self.partial,
+            "failed": self.failed,
+            "elapsedSec": round(self.elapsed_sec, 1),
+            "perMinute": round(self.claimed / self.elapsed_sec * 60, 1) if self.elapsed_sec else 0.0,
+        }
+
+
+class ProcessingEngine:
+    """
+    PENDING 상품을 묶음 단위로 가져와(FOR UPDATE SKIP LOCKED) 여러 상품을 동시에 가공합니다.
+
+    - SEO(LLM)와 이미지 단계는 상품마다 동시에 진행하고, 단계별 동시 상품 수를 따로 제한합니다.
+    - 결과는 묶음마다 한 번의 bulk UPDATE 로 저장합니다.
+    - 여러 워커 프로세스가 동시에 돌아도 SKIP LOCKED 로 같은 상품을 가져가지 않습니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int | None = None,
+        llm_concurrency: int | None = None,
+        image_concurrency: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = max(1, int(batch_size or settings.processing_batch_size))
+        self.llm_concurrency = max(1, int(llm_concurrency or settings.processing_llm_concurrency))
+        self.image_concurrency = max(1, int(image_concurrency or settings.processing_image_concurrency))
+
+    def release_stale_claims(self) -> int:
+        """
+        워커가 죽어서 PROCESSING 으로 남은 상품을 다시 PENDING 으로 돌립니다.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=int(settings.processing_claim_timeout_min))
+        with self.session_factory() as session:
+            result = session.execute(
+                update(Product)
+                .where(Product.processing_status == "PROCESSING")
+                .where(Product.updated_at < cutoff)
+                .values(processing_status="PENDING", updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        released = int(result.rowcount or 0)
+        if released:
+            logger.warning(f"오래된 PROCESSING 상품 {released}건을 PENDING 으로 되돌렸습니다")
+        return released
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        PENDING 상품을 limit 개까지 PROCESSING 으로 바꾸며 가져옵니다. 다른 워커가 잠근 행은 건너뜁니다.
+        """
+        with self.session_factory() as session:
+            ids = (
+                select(Product.id)
+                .where(Product.processing_status == "PENDING")
+                .order_by(Product.created_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            rows = session.execute(
+                update(Product)
+                .where(Product.id.in_(ids))
+                .values(processing_status="PROCESSING", updated_at=func.now())
+                .returning(
+                    Product.id,
+                    Product.name,
+                    Product.brand,
+                    Product.description,
+                    Product.supplier_item_id,
+                    Product.processed_name,
+                    Product.processed_keywords,
+                )
+                .execution_options(synchronize_session=False)
+            ).mappings().all()
+
+            supplier_ids = [r["supplier_item_id"] for r in rows if r["supplier_item_id"]]
+            raw_by_id: Dict[uuid.UUID, dict] = {}
+            if supplier_ids:
+                raw_by_id = dict(
+                    session.execute(
+                        select(SupplierItemRaw.id, SupplierItemRaw.raw).where(SupplierItemRaw.id.in_(supplier_ids))
+                    ).all()
+                )
+            session.commit()
+
+        claimed = []
+        for r in rows:
+            item = dict(r)
+            item["raw"] = raw_by_id.get(r["supplier_item_id"])
+            claimed.append(item)
+        return claimed
+
+    async def _process_one(
+        self,
+        product: Dict[str, Any],
+        llm_sem: asyncio.Semaphore,
+        image_sem: asyncio.Semaphore,
+        llm_executor: ThreadPoolExecutor,
+        client,
+    ) -> Dict[str, Any]:
+        detail_text, raw_image_urls = processing_inputs(product["raw"], product["description"])
+
+        async def _seo() -> tuple[str, list]:
+            # 오프라인 배치(ai_batch_jobs)로 이미 만들어 둔 상품명이 있으면 다시 호출하지 않습니다.
+            if product["processed_name"]:
+                return product["processed_name"], product["processed_keywords"] or []
+            initial_keywords = [product["brand"]] if product["brand"] else []
+            async with llm_sem:
+                seo_result = await asyncio.get_running_loop().run_in_executor(
+                    llm_executor, optimize_seo, product["name"], initial_keywords, detail_text
+                )
+            return seo_result.get("title", product["name"]), seo_result.get("tags", [])
+
+        async def _images() -> list[str]:
+            async with image_sem:
+                result = await image_processing_service.process_and_upload_images_async(
+                    image_urls=raw_image_urls,
+                    detail_html=detail_text,
+                    product_id=str(product["id"]),
+                    client=client,
+                )
+            return result.urls
+
+        try:
+            (new_title, new_tags), processed_urls = await asyncio.gather(_seo(), _images())
+        except Exception as e:
+            logger.error(f"Error processing product {product['id']}: {e}")
+            return {"id": product["id"], "processing_status": "FAILED"}
+
+        return {
+            "id": product["id"],
+            "processed_name": new_title,
+            "processed_keywords": new_tags,
+            "processed_image_urls": processed_urls,
+            "processing_status": "COMPLETED" if processed_urls and new_title else "PARTIAL_FAILURE",
+        }
+
+    async def _process_batch(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        llm_sem = asyncio.Semaphore(self.llm_concurrency)
+        image_sem = asyncio.Semaphore(self.image_concurrency)
+        # SEO 호출은 동기 SDK 라 전용 스레드 풀에서 실행합니다(기본 풀 크기에 묶이지 않도록).
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="processing-llm") as llm_executor:
+            async with image_processing_service.new_client() as client:
+                try:
+                    return await asyncio.gather(
+                        *(self._process_one(p, llm_sem, image_sem, llm_executor, client) for p in products)
+                    )
+                finally:
+                    # 묶음마다 asyncio.run 으로 새 루프를 쓰므로 이 루프의 업로드 커넥션 풀을 닫습니다.
+                    await storage_service.aclose()
+
+    def _write_results(self, results: List[Dict[str, Any]]) -> None:
+        # 결과 키가 다른 행(FAILED 는 상태만)끼리 나눠 bulk UPDATE(primary key 기준) 합니다.
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in results:
+            groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+        with self.session_factory() as session:
+            for rows in groups.values():
+                session.execute(update(Product), rows)
+            session.commit()
+
+    def run(self, limit: int | None = None) -> ProcessingStats:
+        """
+        더 가져올 PENDING 상품이 없거나 limit 개를 처리할 때까지 묶음 단위로 반복합니다.
+        """
+        stats = ProcessingStats()
+        started = time.perf_counter()
+        self.release_stale_claims()
+
+        while limit is None or stats.claimed < limit:
+            size = self.batch_size if limit is None else min(self.batch_size, limit - stats.claimed)
+            products = self.claim(size)
+            if not products:
+                break
+            stats.claimed += len(products)
+
+            batch_started = time.perf_counter()
+            results = asyncio.run(self._process_batch(products))
+            self._write_results(results)
+
+            for row in results:
+                if row["processing_status"] == "COMPLETED":
+                    stats.completed += 1
+                elif row["processing_status"] == "PARTIAL_FAILURE":
+                    stats.partial += 1
+                else:
+                    stats.failed += 1
+            logger.info(f"상품 가공 묶음 완료: {len(products)}건 ({time.perf_counter() - batch_started:.1f}s), 누적 {stats.to_dict()}")
+
+        stats.elapsed_sec = time.perf_counter() - started
+        return stats
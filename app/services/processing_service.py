@@ -10,6 +10,30 @@ from app.services.image_processing import image_processing_service
 
 logger = logging.getLogger(__name__)
 
+
+def processing_inputs(raw: dict | None, description: str | None) -> tuple[str, list[str]]:
+    """
+    공급사 raw 에서 상세 텍스트와 원본 이미지 URL 을 꺼냅니다(ProcessingEngine 과 공용).
+    """
+    detail_text = ""
+    raw_image_urls = []
+
+    if raw:
+        # Parse OwnerClan specific raw structure
+        # detail_html usually in "content" or "description"
+        detail_text = raw.get("content") or raw.get("description") or ""
+        # images usually in "obs_images", "images", or extracted from detailed page
+        # Try to find images in raw data - strict implementation depends on source
+        # For now, let's look for known keys or fallback to empty to trigger extraction
+        if "images" in raw:
+            raw_image_urls = raw["images"]
+
+    # Fallback text if detail_text empty
+    if not detail_text and description:
+        detail_text = description
+    return detail_text, raw_image_urls
+
+
 class ProcessingService:
     def __init__(self, db: Session):
         self.db = db
@@ -37,34 +61,25 @@ class ProcessingService:
             # OR we check BenchmarkProduct if this product came from there?
             # Assuming Product created from SupplierItemRaw.
             
-            detail_text = ""
-            raw_image_urls = []
-            
+            raw = None
             if product.supplier_item_id:
                 from app.models import SupplierItemRaw
                 raw_item = self.db.scalars(select(SupplierItemRaw).where(SupplierItemRaw.id == product.supplier_item_id)).one_or_none()
-                if raw_item and raw_item.raw:
-                    # Parse OwnerClan specific raw structure
-                    # detail_html usually in "content" or "description"
-                    detail_text = raw_item.raw.get("content") or raw_item.raw.get("description") or ""
-                    # images usually in "obs_images", "images", or extracted from detailed page
-                    raw_image_urls = []
-                    # Try to find images in raw data - strict implementation depends on source
-                    # For now, let's look for known keys or fallback to empty to trigger extraction
-                    if "images" in raw_item.raw:
-                         raw_image_urls = raw_item.raw["images"]
-            
-            # Fallback text if detail_text empty
-            if not detail_text and product.description:
-                detail_text = product.description
+                raw = raw_item.raw if raw_item else None
+            detail_text, raw_image_urls = processing_inputs(raw, product.description)
 
             # 2. Optimize Name
             # Extract basic keywords from title or brand
-            initial_keywords = [product.brand] if product.brand else []
-            seo_result = optimize_seo(product.name, initial_keywords, detail_text=detail_text)
-            
-            new_title = seo_result.get("title", product.name)
-            new_tags = seo_result.get("tags", [])
+            # 오프라인 배치(ai_batch_jobs)로 이미 만들어 둔 상품명이 있으면 다시 호출하지 않습니다.
+            if product.processed_name:
+                new_title = product.processed_name
+                new_tags = product.processed_keywords or []
+            else:
+                initial_keywords = [product.brand] if product.brand else []
+                seo_result = optimize_seo(product.name, initial_keywords, detail_text=detail_text)
+
+                new_title = seo_result.get("title", product.name)
+                new_tags = seo_result.get("tags", [])
             
             # 3. Process Images
             # If no raw images found, we pass empty list. 
@@ -105,12 +120,8 @@ class ProcessingService:
     def process_pending_products(self, limit: int = 10):
         """
         Finds pending products and processes them.
+        여러 상품을 묶어서 동시에 가공합니다(ProcessingEngine).
         """
-        stmt = select(Product).where(Product.processing_status == "PENDING").limit(limit)
-        products = self.db.scalars(stmt).all()
-        
-        count = 0
-        for p in products:
-            if self.process_product(p.id):
-                count += 1
-        return count
+        from app.services.processing_engine import ProcessingEngine
+
+        return ProcessingEngine().run(limit=limit).processed
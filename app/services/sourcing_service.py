@@ -1,14 +1,16 @@
 import logging
+import math
 from typing import List, Optional
 import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_, desc
+from sqlalchemy import insert, select, or_, desc
 
-from app.models import Product, SourcingCandidate, BenchmarkProduct, SupplierItemRaw, SupplierAccount
+from app.models import Product, SourcingCandidate, BenchmarkProduct, SupplierItemEmbedding, SupplierItemRaw, SupplierAccount
 from app.ownerclan_client import OwnerClanClient
 from app.settings import settings
 from app.services.ai import AIService
 from app.embedding_service import EmbeddingService
+from app.supplier_embedding import search_similar_supplier_items
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +57,70 @@ class SourcingService:
             return [it for it in items_obj if isinstance(it, dict)]
         return []
 
+    def _item_name(self, item: dict) -> str:
+        return str(item.get("item_name") or item.get("name") or item.get("itemName") or "")
+
+    def _embed_item_names(self, items: list[dict]) -> list[list[float] | None]:
+        """
+        후보 상품명 임베딩을 배치 요청으로 한 번에 생성합니다(입력 순서 유지, 실패 항목은 None).
+        """
+        if not items:
+            return []
+        try:
+            return self.embedding_service.generate_embeddings_sync([self._item_name(it) for it in items])
+        except Exception as e:
+            logger.warning(f"소싱 후보 임베딩 생성 실패: {e}")
+            return [None] * len(items)
+
+    def _match_supplier_items_by_vector(self, benchmark: BenchmarkProduct) -> list[tuple[dict, list[float] | None, float]]:
+        """
+        벤치마크 임베딩으로 동기화된 공급사 카탈로그 전체에서 ANN top-k 를 찾습니다.
+        (item raw, 공급사 상품 임베딩, 코사인 유사도) 목록을 유사도 내림차순으로 반환합니다.
+        """
+        if not settings.sourcing_vector_match_enabled or benchmark.embedding is None:
+            return []
+
+        try:
+            hits = search_similar_supplier_items(
+                self.db,
+                benchmark.embedding,
+                k=settings.sourcing_vector_top_k,
+                supplier_code="ownerclan",
+            )
+        except Exception as e:
+            logger.warning(f"공급사 상품 벡터 검색 실패: {e}")
+            return []
+
+        similarity_by_id = {
+            item_id: sim for item_id, sim in hits if sim >= float(settings.sourcing_vector_min_similarity)
+        }
+        if not similarity_by_id:
+            return []
+
+        rows = self.db.execute(
+            select(SupplierItemRaw.id, SupplierItemRaw.item_code, SupplierItemRaw.raw, SupplierItemEmbedding.embedding)
+            .join(SupplierItemEmbedding, SupplierItemEmbedding.supplier_item_id == SupplierItemRaw.id)
+            .where(SupplierItemRaw.id.in_(list(similarity_by_id.keys())))
+        ).all()
+
+        matches = []
+        for row in rows:
+            item = dict(row.raw or {})
+            if row.item_code and not item.get("item_code"):
+                item["item_code"] = row.item_code
+            matches.append((item, row.embedding, similarity_by_id[row.id]))
+        matches.sort(key=lambda m: m[2], reverse=True)
+        return matches
+
+    def _cosine_similarity(self, a, b) -> float | None:
+        if a is None or b is None or len(a) == 0 or len(a) != len(b):
+            return None
+        dot = sum(float(x) * float(y) for x, y in zip(a, b))
+        norm = math.sqrt(sum(float(x) * float(x) for x in a)) * math.sqrt(sum(float(y) * float(y) for y in b))
+        if norm <= 0:
+            return None
+        return dot / norm
+
     def _to_int(self, value) -> int | None:
         if value is None:
             return None
@@ -82,6 +148,7 @@ class SourcingService:
             found_items.extend(self._extract_items(data))
         
         # 2. Process Items
+        selected: list[tuple[dict, float | None]] = []
         for item in found_items:
             supply_price = self._to_int(
                 item.get("supply_price")
@@ -101,7 +168,14 @@ class SourcingService:
                 margin = (selling_price - supply_price) / selling_price
 
             if margin is None or margin >= min_margin:
-                self._create_candidate(item, strategy="KEYWORD", margin_score=margin)
+                selected.append((item, margin))
+
+        embeddings = self._embed_item_names([item for item, _ in selected])
+        rows = [
+            self._build_candidate(item, strategy="KEYWORD", margin_score=margin, embedding=embedding)
+            for (item, margin), embedding in zip(selected, embeddings)
+        ]
+        self._insert_candidates(rows)
 
     def execute_benchmark_sourcing(self, benchmark_id: uuid.UUID):
         """
@@ -112,50 +186,58 @@ class SourcingService:
             logger.error(f"Benchmark product {benchmark_id} not found")
             return
 
-        client = self._get_ownerclan_primary_client(user_type="seller")
-
         # 1. Analyze Benchmark (if not already)
         if not benchmark.pain_points:
             # Use Tier 1 (Gemini) for complex reasoning like Pain Point Analysis
             benchmark.pain_points = self.ai_service.analyze_pain_points(benchmark.detail_html or benchmark.name, provider="gemini")
             self.db.commit()
             
-        search_terms = [benchmark.name] 
-        # 3. Search OwnerClan
-        found_items = []
-        status_code, data = client.get_products(keyword=benchmark.name, limit=50)
-        if status_code == 200:
-            found_items = self._extract_items(data)
-        else:
-            logger.warning(f"오너클랜 상품 검색 실패: HTTP {status_code} (keyword={benchmark.name})")
+        # 2. Vector match over synced supplier catalog (supplier_item_embeddings)
+        matches = self._match_supplier_items_by_vector(benchmark)
+
+        # 3. Fallback: Search OwnerClan by keyword
+        if not matches:
+            client = self._get_ownerclan_primary_client(user_type="seller")
+            found_items = []
+            status_code, data = client.get_products(keyword=benchmark.name, limit=50)
+            if status_code == 200:
+                found_items = self._extract_items(data)
+            else:
+                logger.warning(f"오너클랜 상품 검색 실패: HTTP {status_code} (keyword={benchmark.name})")
+
+            embeddings = self._embed_item_names(found_items)
+            matches = [
+                (item, embedding, self._cosine_similarity(benchmark.embedding, embedding))
+                for item, embedding in zip(found_items, embeddings)
+            ]
 
         # 4. Score and Filter
-        for item in found_items:
-            candidate_item = item 
-            
-            # A. Spec Matching
-            # Use 'auto' (Tier 2/Ollama typically sufficient for extraction)
-            specs = self.ai_service.extract_specs(str(candidate_item), provider="auto")
-            
-            # B. Gap Analysis skipped for brevity in this step
-            
-            # C. Seasonality & Event Scoring
-            season_data = self.ai_service.predict_seasonality(
-                (candidate_item.get("item_name") or candidate_item.get("name") or ""),
-                provider="auto"
-            )
-            current_month_score = season_data.get("current_month_score", 0.0)
-            
-            # D. Create Candidate
-            self._create_candidate(
-                candidate_item, 
-                strategy="BENCHMARK", 
-                benchmark_id=benchmark.id,
-                seasonal_score=current_month_score,
-                spec_data=specs
+        # A. Spec Matching / C. Seasonality & Event Scoring
+        # 여러 상품을 한 프롬프트로 묶고 묶음 단위로 동시에 호출합니다(실패 항목은 단건으로 재시도).
+        items = [item for item, _, _ in matches]
+        specs_list = self.ai_service.extract_specs_batch([str(item) for item in items], provider="auto")
+        season_list = self.ai_service.predict_seasonality_batch(
+            [(item.get("item_name") or item.get("name") or "") for item in items],
+            provider="auto",
+        )
+
+        # D. Create Candidates (한 번에 저장)
+        rows = []
+        for (item, embedding, similarity), specs, season_data in zip(matches, specs_list, season_list):
+            rows.append(
+                self._build_candidate(
+                    item,
+                    strategy="BENCHMARK",
+                    benchmark_id=benchmark.id,
+                    seasonal_score=(season_data or {}).get("current_month_score", 0.0),
+                    similarity_score=similarity,
+                    spec_data=specs,
+                    embedding=embedding,
+                )
             )
+        self._insert_candidates(rows)
 
-    def _create_candidate(
+    def _build_candidate(
         self,
         item: dict,
         strategy: str,
@@ -163,9 +245,9 @@ class SourcingService:
         seasonal_score: float | None = None,
         margin_score: float | None = None,
         spec_data: dict | None = None,
-    ):
-        
-        # Check if already exists
+        similarity_score: float | None = None,
+        embedding: list[float] | None = None,
+    ) -> dict | None:
         supplier_id = (
             item.get("item_code")
             or item.get("itemCode")
@@ -174,17 +256,7 @@ class SourcingService:
             or item.get("item")
         )
         if supplier_id is None:
-            return
-
-        exists = (
-            self.db.execute(
-                select(SourcingCandidate)
-                .where(SourcingCandidate.supplier_code == "ownerclan")
-                .where(SourcingCandidate.supplier_item_id == str(supplier_id))
-            ).first()
-        )
-        if exists:
-            return
+            return None
 
         name = item.get("item_name") or item.get("name") or item.get("itemName") or "Unknown"
         supply_price = self._to_int(
@@ -196,20 +268,46 @@ class SourcingService:
         if supply_price is None:
             supply_price = 0
 
-        candidate = SourcingCandidate(
-            supplier_code="ownerclan",
-            supplier_item_id=str(supplier_id),
-            name=str(name),
-            supply_price=int(supply_price),
-            source_strategy=strategy,
-            benchmark_product_id=benchmark_id,
-            seasonal_score=seasonal_score,
-            margin_score=margin_score,
-            spec_data=spec_data,
-            status="PENDING"
+        return {
+            "id": uuid.uuid4(),
+            "supplier_code": "ownerclan",
+            "supplier_item_id": str(supplier_id),
+            "name": str(name),
+            "supply_price": int(supply_price),
+            "source_strategy": strategy,
+            "benchmark_product_id": benchmark_id,
+            "seasonal_score": seasonal_score,
+            "margin_score": margin_score,
+            "similarity_score": similarity_score,
+            "spec_data": spec_data,
+            "embedding": embedding,
+            "status": "PENDING",
+        }
+
+    def _insert_candidates(self, rows: list[dict | None]) -> int:
+        """
+        이미 있는 후보(같은 공급사 상품)는 건너뛰고 나머지를 한 번의 INSERT 로 저장합니다.
+        """
+        by_item_id: dict[str, dict] = {}
+        for row in rows:
+            if row and row["supplier_item_id"] not in by_item_id:
+                by_item_id[row["supplier_item_id"]] = row
+        if not by_item_id:
+            return 0
+
+        existing = set(
+            self.db.scalars(
+                select(SourcingCandidate.supplier_item_id)
+                .where(SourcingCandidate.supplier_code == "ownerclan")
+                .where(SourcingCandidate.supplier_item_id.in_(list(by_item_id.keys())))
+            ).all()
         )
-        
+        values = [row for item_id, row in by_item_id.items() if item_id not in existing]
+        if not values:
+            return 0
+
         # Optimize SEO immediately? Or lazy load. Let's do lazy for performance.
-        self.db.add(candidate)
+        self.db.execute(insert(SourcingCandidate).values(values))
         self.db.commit()
-        logger.info(f"Created candidate: {candidate.name}")
+        logger.info(f"Created {len(values)} candidates (skipped existing: {len(existing)})")
+        return len(values)
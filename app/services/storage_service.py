@@ -1,57 +1,217 @@
+import asyncio
 import logging
+import threading
 import uuid
-from typing import Optional
-from supabase import create_client, Client
+import weakref
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import httpx
+
 from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+
+class StorageUploadError(Exception):
+    def __init__(self, message: str, status_code: int | None = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+def content_type_for(file_ext: str) -> str:
+    file_ext = file_ext.lower().lstrip(".")
+    if file_ext in ("jpg", "jpeg"):
+        return "image/jpeg"
+    return f"image/{file_ext}"
+
+
+class SupabaseStorageBackend:
+    """
+    Supabase Storage REST API 를 공유 httpx 커넥션 풀로 직접 호출합니다.
+    """
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str, bucket: str):
+        self.url = (url or "").rstrip("/")
+        self.key = key
+        self.bucket = bucket
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url and self.key)
+
+    def public_url(self, path: str) -> str:
+        return f"{self.url}/storage/v1/object/public/{self.bucket}/{quote(path)}"
+
+    async def put(self, client: httpx.AsyncClient | None, path: str, data: bytes, content_type: str, upsert: bool) -> None:
+        resp = await client.post(
+            f"{self.url}/storage/v1/object/{self.bucket}/{quote(path)}",
+            content=data,
+            headers={
+                "Authorization": f"Bearer {self.key}",
+                "apikey": self.key,
+                "Content-Type": content_type,
+                "x-upsert": "true" if upsert else "false",
+            },
+        )
+        if resp.status_code in (200, 201):
+            return
+        raise StorageUploadError(
+            f"HTTP {resp.status_code}: {resp.text[:200]}",
+            status_code=resp.status_code,
+            retryable=resp.status_code == 429 or resp.status_code >= 500,
+        )
+
+
+class LocalStorageBackend:
+    """
+    로컬 디렉터리에 저장합니다(테스트/오프라인 실행, 네트워크 없이 업로드 처리량 측정용).
+    base_url 이 없으면 file:// URL 을 반환합니다.
+    """
+
+    name = "local"
+    enabled = True
+
+    def __init__(self, root: str, base_url: str = ""):
+        self.root = Path(root).resolve()
+        self.base_url = (base_url or "").rstrip("/")
+
+    def public_url(self, path: str) -> str:
+        if self.base_url:
+            return f"{self.base_url}/{quote(path)}"
+        return (self.root / path).as_uri()
+
+    def _write(self, path: str, data: bytes, upsert: bool) -> None:
+        target = self.root / path
+        if not upsert and target.exists():
+            raise StorageUploadError(f"이미 존재하는 경로: {path}", status_code=409)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+
+    async def put(self, client: httpx.AsyncClient | None, path: str, data: bytes, content_type: str, upsert: bool) -> None:
+        await asyncio.to_thread(self._write, path, data, upsert)
+
+
+def build_backend():
+    backend = str(settings.storage_backend or "supabase").strip().lower()
+    if backend == "local":
+        return LocalStorageBackend(settings.storage_local_dir, settings.storage_local_base_url)
+    return SupabaseStorageBackend(settings.supabase_url, settings.supabase_service_role_key, settings.supabase_bucket)
+
+
 class StorageService:
-    def __init__(self):
-        self.url = settings.supabase_url
-        self.key = settings.supabase_service_role_key
+    """
+    이미지 저장소. 이벤트 루프마다 httpx 커넥션 풀 하나와 동시 업로드 제한(storage_upload_concurrency)을 공유하고,
+    일시적인 오류(네트워크/429/5xx)는 storage_upload_retries 만큼 다시 시도합니다.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or build_backend()
         self.bucket = settings.supabase_bucket
-        
-        if not self.url or not self.key:
+        self._lock = threading.Lock()
+        self._per_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        if not self.backend.enabled:
             logger.warning("Supabase credentials not set. Storage service disabled.")
-            self.client: Optional[Client] = None
-        else:
-            try:
-                self.client = create_client(self.url, self.key)
-            except Exception as e:
-                logger.error(f"Failed to initialize Supabase client: {e}")
-                self.client = None
 
-    def upload_image(self, file_content: bytes, file_ext: str = "jpg", path_prefix: str = "processed") -> Optional[str]:
+    @property
+    def enabled(self) -> bool:
+        return bool(self.backend.enabled)
+
+    def _loop_state(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        # 커넥션 풀/세마포어는 이벤트 루프에 묶이므로 루프마다 따로 둡니다.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._per_loop.get(loop)
+            if state is None:
+                concurrency = max(1, int(settings.storage_upload_concurrency))
+                client = httpx.AsyncClient(
+                    timeout=settings.storage_upload_timeout_sec,
+                    limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+                )
+                state = (client, asyncio.Semaphore(concurrency))
+                self._per_loop[loop] = state
+            return state
+
+    async def aclose(self) -> None:
         """
-        Uploads bytes to Supabase Storage and returns the public URL.
-        Path format: {path_prefix}/{uuid}.{file_ext}
+        현재 이벤트 루프의 커넥션 풀을 닫습니다.
         """
-        if not self.client:
+        with self._lock:
+            state = self._per_loop.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+    async def aupload(self, path: str, data: bytes, content_type: str) -> Optional[str]:
+        """
+        path 에 저장하고 public URL 을 반환합니다. 실패하면 None.
+        """
+        if not self.backend.enabled:
             logger.error("Supabase client is not initialized.")
             return None
 
-        file_name = f"{uuid.uuid4()}.{file_ext}"
-        file_path = f"{path_prefix}/{file_name}"
+        client, semaphore = self._loop_state()
+        retries = max(0, int(settings.storage_upload_retries))
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    # 재시도 시 첫 시도가 실제로는 저장됐을 수 있으므로 덮어쓰기를 허용합니다.
+                    await self.backend.put(client, path, data, content_type, upsert=attempt > 0)
+                    return self.backend.public_url(path)
+                except (httpx.TransportError, StorageUploadError) as e:
+                    retryable = isinstance(e, httpx.TransportError) or e.retryable
+                    if not retryable or attempt >= retries:
+                        logger.error(f"Failed to upload image to {self.backend.name}: {e}")
+                        return None
+                    logger.warning(f"이미지 업로드 재시도 {attempt + 1}/{retries} ({path}): {e}")
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+                except Exception as e:
+                    logger.error(f"Failed to upload image to {self.backend.name}: {e}")
+                    return None
+        return None
 
-        content_type = f"image/{file_ext}"
-        if file_ext == "jpg":
-            content_type = "image/jpeg"
+    async def aupload_image(self, file_content: bytes, file_ext: str = "jpg", path_prefix: str = "processed") -> Optional[str]:
+        """
+        Path format: {path_prefix}/{uuid}.{file_ext}
+        """
+        file_path = f"{path_prefix}/{uuid.uuid4()}.{file_ext}"
+        return await self.aupload(file_path, file_content, content_type_for(file_ext))
 
-        try:
-            self.client.storage.from_(self.bucket).upload(
-                path=file_path,
-                file=file_content,
-                file_options={"content-type": content_type}
+    async def upload_many(
+        self,
+        files: Sequence[Tuple[bytes, str]],
+        path_prefix: str = "processed",
+    ) -> List[Optional[str]]:
+        """
+        (bytes, file_ext) 목록을 동시에 올리고 입력 순서대로 URL(실패 시 None)을 반환합니다.
+        동시 업로드 수는 storage_upload_concurrency 로 제한됩니다.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.aupload_image(data, file_ext, path_prefix=path_prefix) for data, file_ext in files)
             )
-            
-            # Get Public URL
-            public_url = self.client.storage.from_(self.bucket).get_public_url(file_path)
-            return public_url
+        )
+
+    def upload_image(self, file_content: bytes, file_ext: str = "jpg", path_prefix: str = "processed") -> Optional[str]:
+        """
+        Uploads bytes and returns the public URL (동기 호출용, 이벤트 루프 밖에서만 사용).
+        """
+
+        async def _once() -> Optional[str]:
+            try:
+                return await self.aupload_image(file_content, file_ext, path_prefix)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_once())
 
-        except Exception as e:
-            logger.error(f"Failed to upload image to Supabase: {e}")
-            return None
 
 # Singleton instance
 storage_service = StorageService()
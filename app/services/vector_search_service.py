@@ -0,0 +1,193 @@
+import logging
+import uuid
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models import BenchmarkProduct, SourcingCandidate, SupplierItemRaw
+from app.settings import settings
+from app.supplier_embedding import search_similar_supplier_items
+
+logger = logging.getLogger(__name__)
+
+
+class VectorSearchService:
+    """
+    pgvector HNSW/IVFFlat 인덱스를 이용한 코사인 유사도 top-k 검색.
+
+    benchmark_products(market DB) 와 sourcing_candidates(dropship DB) 는 서로 다른 DB 에 있으므로
+    기준 임베딩을 먼저 읽고, 대상 DB 에서 따로 검색합니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _apply_search_params(self, model: type, ef_search: int | None, probes: int | None, exact: bool) -> None:
+        # set_config(..., true) 는 현재 트랜잭션에만 적용됩니다(SET LOCAL).
+        bind_arguments = {"mapper": model}
+        if exact:
+            self.db.execute(text("SELECT set_config('enable_indexscan', 'off', true)"), bind_arguments=bind_arguments)
+            return
+        ef = int(ef_search or settings.vector_search_ef_search)
+        pr = int(probes or settings.vector_search_ivfflat_probes)
+        self.db.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef, true), set_config('ivfflat.probes', :pr, true)"),
+            {"ef": str(ef), "pr": str(pr)},
+            bind_arguments=bind_arguments,
+        )
+
+    def _clamp_k(self, k: int) -> int:
+        return max(1, min(int(k), int(settings.vector_search_max_k)))
+
+    def search_benchmarks(
+        self,
+        embedding: list[float],
+        k: int = 10,
+        market_code: str | None = None,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        exact: bool = False,
+    ) -> list[dict[str, Any]]:
+        self._apply_search_params(BenchmarkProduct, ef_search, probes, exact)
+
+        distance = BenchmarkProduct.embedding.cosine_distance(embedding).label("distance")
+        stmt = (
+            select(
+                BenchmarkProduct.id,
+                BenchmarkProduct.market_code,
+                BenchmarkProduct.product_id,
+                BenchmarkProduct.name,
+                BenchmarkProduct.price,
+                BenchmarkProduct.product_url,
+                distance,
+            )
+            .where(BenchmarkProduct.embedding.isnot(None))
+            .order_by(distance)
+            .limit(self._clamp_k(k))
+        )
+        if market_code:
+            # 인덱스 탐색 후 필터링되므로 결과가 k 보다 적을 수 있습니다(ef_search 를 늘려 보완).
+            stmt = stmt.where(BenchmarkProduct.market_code == market_code)
+
+        return [
+            {
+                "id": str(row.id),
+                "marketCode": row.market_code,
+                "productId": row.product_id,
+                "name": row.name,
+                "price": row.price,
+                "productUrl": row.product_url,
+                "similarity": 1.0 - float(row.distance),
+            }
+            for row in self.db.execute(stmt).all()
+        ]
+
+    def search_candidates(
+        self,
+        embedding: list[float],
+        k: int = 10,
+        status: str | None = None,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        exact: bool = False,
+    ) -> list[dict[str, Any]]:
+        self._apply_search_params(SourcingCandidate, ef_search, probes, exact)
+
+        distance = SourcingCandidate.embedding.cosine_distance(embedding).label("distance")
+        stmt = (
+            select(
+                SourcingCandidate.id,
+                SourcingCandidate.supplier_code,
+                SourcingCandidate.supplier_item_id,
+                SourcingCandidate.name,
+                SourcingCandidate.supply_price,
+                SourcingCandidate.status,
+                distance,
+            )
+            .where(SourcingCandidate.embedding.isnot(None))
+            .order_by(distance)
+            .limit(self._clamp_k(k))
+        )
+        if status:
+            stmt = stmt.where(SourcingCandidate.status == status)
+
+        return [
+            {
+                "id": str(row.id),
+                "supplierCode": row.supplier_code,
+                "supplierItemId": row.supplier_item_id,
+                "name": row.name,
+                "supplyPrice": row.supply_price,
+                "status": row.status,
+                "similarity": 1.0 - float(row.distance),
+            }
+            for row in self.db.execute(stmt).all()
+        ]
+
+    def similar_benchmarks_for_candidate(self, candidate_id: uuid.UUID, k: int = 10, **kwargs: Any) -> list[dict[str, Any]] | None:
+        """
+        소싱 후보(공급사 상품)와 비슷한 벤치마크 상품 top-k. 후보가 없으면 None, 임베딩이 없으면 빈 목록.
+        """
+        candidate = self.db.get(SourcingCandidate, candidate_id)
+        if candidate is None:
+            return None
+        if candidate.embedding is None:
+            return []
+        return self.search_benchmarks(candidate.embedding, k=k, **kwargs)
+
+    def similar_candidates_for_benchmark(self, benchmark_id: uuid.UUID, k: int = 10, **kwargs: Any) -> list[dict[str, Any]] | None:
+        """
+        벤치마크 상품과 비슷한 소싱 후보(공급사 상품) top-k. 벤치마크가 없으면 None, 임베딩이 없으면 빈 목록.
+        """
+        benchmark = self.db.get(BenchmarkProduct, benchmark_id)
+        if benchmark is None:
+            return None
+        if benchmark.embedding is None:
+            return []
+        return self.search_candidates(benchmark.embedding, k=k, **kwargs)
+
+    def similar_supplier_items_for_benchmark(
+        self,
+        benchmark_id: uuid.UUID,
+        k: int = 10,
+        supplier_code: str | None = None,
+        ef_search: int | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """
+        벤치마크 상품과 비슷한 공급사 카탈로그 상품(supplier_item_embeddings) top-k.
+        """
+        benchmark = self.db.get(BenchmarkProduct, benchmark_id)
+        if benchmark is None:
+            return None
+        if benchmark.embedding is None:
+            return []
+
+        hits = search_similar_supplier_items(
+            self.db, benchmark.embedding, k=self._clamp_k(k), supplier_code=supplier_code, ef_search=ef_search
+        )
+        if not hits:
+            return []
+
+        rows = self.db.execute(
+            select(SupplierItemRaw.id, SupplierItemRaw.supplier_code, SupplierItemRaw.item_code, SupplierItemRaw.raw)
+            .where(SupplierItemRaw.id.in_([item_id for item_id, _ in hits]))
+        ).all()
+        by_id = {row.id: row for row in rows}
+
+        result: list[dict[str, Any]] = []
+        for item_id, similarity in hits:
+            row = by_id.get(item_id)
+            if row is None:
+                continue
+            raw = row.raw if isinstance(row.raw, dict) else {}
+            result.append(
+                {
+                    "supplierItemId": str(row.id),
+                    "supplierCode": row.supplier_code,
+                    "itemCode": row.item_code,
+                    "name": raw.get("item_name") or raw.get("name"),
+                    "similarity": similarity,
+                }
+            )
+        return result
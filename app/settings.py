@@ -9,6 +9,12 @@ class Settings(BaseSettings):
     supabase_url: str = "https://tuwqbahkvvidgcbyztop.supabase.co"
     supabase_service_role_key: str = ""
     supabase_bucket: str = "images"
+    storage_backend: str = "supabase" # supabase, local(테스트/오프라인)
+    storage_local_dir: str = "data/storage"
+    storage_local_base_url: str = "" # 비어 있으면 file:// URL
+    storage_upload_concurrency: int = 8 # 프로세스(이벤트 루프) 전체 동시 업로드 수
+    storage_upload_retries: int = 2 # 네트워크 오류/429/5xx 재시도 횟수
+    storage_upload_timeout_sec: float = 30.0
 
     ownerclan_api_base_url: str = "https://api.ownerclan.com"
     ownerclan_auth_url: str = "https://auth.ownerclan.com/auth"
@@ -22,21 +28,103 @@ class Settings(BaseSettings):
 
     pricing_default_margin_rate: float = 0.0
 
-    
+    # Coupang
+    coupang_api_rate_per_sec: float = 5.0 # 벤더 단위 호출 제한(초당)
+    coupang_register_concurrency: int = 4
+    coupang_register_max_attempts: int = 3
+    coupang_register_backoff_sec: float = 2.0
+    coupang_price_sync_overlap_min: int = 10 # 가격/재고 동기화 워터마크보다 이만큼 이전부터 다시 읽음(늦게 커밋된 수집분 보호)
+
+    # Benchmark
+    benchmark_market_concurrency: int = 5 # ALL 수집 시 동시에 실행할 마켓 수
+    benchmark_domain_concurrency: int = 1 # 같은 도메인에 대한 동시 수집 수
+    benchmark_detail_concurrency: int = 8 # 마켓별 상세 페이지 동시 수집 수
+    benchmark_host_concurrency: int = 4 # 호스트별 동시 요청 수
+    benchmark_host_min_interval_sec: float = 0.2 # 호스트별 요청 시작 최소 간격
+    benchmark_html_parser: str = "lxml" # lxml 또는 html.parser
+    benchmark_parse_executor: str = "process" # process, thread, inline
+    benchmark_parse_workers: int = 0 # 0 이면 CPU 수
+    benchmark_write_batch_size: int = 50 # 벤치마크 상품 일괄 upsert 단위
+
+    # Image Processing
+    image_download_concurrency: int = 8 # 상품 이미지 동시 다운로드 수
+    image_download_timeout_sec: float = 10.0
+    image_upload_concurrency: int = 4 # Supabase 동시 업로드 수
+    image_process_executor: str = "process" # process, thread, inline
+    image_process_workers: int = 0 # 0 이면 CPU 수
+    image_max_per_product: int = 10
+    image_output_profile: str = "market" # original, market(폭 1000px JPEG 85), webp(폭 1000px WebP 80), thumbnail(500x500 WebP 75)
+    image_min_dimension: int = 150 # 짧은 변이 이보다 작으면 아이콘/추적 픽셀로 보고 제외
+    image_dedup_enabled: bool = True # dHash 로 같은 그림(다른 URL/크기)을 가공/업로드 전에 제외
+    image_dedup_max_distance: int = 6 # 64비트 중 이 비트 수 이하로 다르면 같은 그림으로 봄
+    image_dedup_min_contrast: float = 4.0 # 9x8 축소 밝기 표준편차가 이보다 작은(거의 단색) 이미지는 중복 비교에서 제외
+    image_store_enabled: bool = True # 원본 해시 기준으로 이미 가공/업로드한 이미지 재사용
+    image_cache_dir: str = "data/image_cache" # 원본 이미지 디스크 LRU
+    image_cache_max_mb: int = 2048
+    image_variant_name: str = "hash_break_v1" # 가공 방식이 바뀌면 이름을 바꿔 새로 가공
+    image_variant_scope: str = "global" # global: 상품 간 가공본 공유, product: 상품마다 따로 가공(원본 캐시만 공유)
+
+    # Product Processing (ProcessingEngine)
+    processing_batch_size: int = 50 # 한 번에 가져올(claim) PENDING 상품 수
+    processing_llm_concurrency: int = 8 # SEO 호출 동시 상품 수
+    processing_image_concurrency: int = 4 # 이미지 파이프라인 동시 상품 수
+    processing_claim_timeout_min: int = 30 # 이 시간 넘게 PROCESSING 인 상품은 PENDING 으로 되돌림
+
+    # Normalization (supplier_item_raw -> products)
+    normalization_batch_size: int = 1000 # 정규화 upsert 한 문장당 상품 수
+    normalization_watermark_overlap_min: int = 10 # 워터마크보다 이만큼 이전부터 다시 읽음(늦게 커밋된 수집분 보호, 수집 트랜잭션보다 길게)
+
     # AI Settings
     default_ai_provider: str = "openai" # gemini, ollama, or openai
+    ai_batch_size: int = 10 # 한 프롬프트에 묶을 상품 수
+    ai_batch_concurrency: int = 0 # 동시에 보낼 배치 프롬프트 수(0 이면 프로바이더 동시 처리량 = 키 수 x 키당 동시 요청 수)
+    ai_key_cache_ttl_sec: float = 300.0 # api_keys 테이블 캐시 유지 시간(다른 워커의 키 변경 반영 주기)
+    ai_batch_provider: str = "openai" # 오프라인 배치: openai(Batch API) 또는 local(즉시 처리하는 대체 실행)
+    ai_batch_dir: str = "data/ai_batches" # 배치 요청/결과 JSONL 보관 경로
+    ai_batch_max_requests: int = 50000 # 배치 1건당 최대 요청 수(OpenAI Batch API 한도)
+    llm_cache_enabled: bool = True # LLM 응답 캐시(llm_response_cache)
+    llm_cache_memory_size: int = 2000
+    llm_cache_ttl_days: dict[str, int] = {"specs": 30, "pain_points": 30, "seo": 7, "default": 7} # seasonality 는 월 단위 만료
     
     # Gemini
     gemini_api_key: str = "" # Backwards compatibility
     gemini_api_keys: list[str] = [] # List of keys for rotation
+    gemini_max_concurrency: int = 4
     
     # Ollama
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "gemma2"
+    ollama_max_concurrency: int = 2
+
+    # Embedding (Ollama)
+    embedding_model: str = "nomic-embed-text"
+    embedding_batch_size: int = 32 # /api/embed 1회 요청당 텍스트 수
+    embedding_concurrency: int = 2 # 동시에 보낼 배치 요청 수
+    embedding_sync_overlap_min: int = 10 # 공급사 임베딩 동기화 워터마크보다 이만큼 이전부터 다시 읽음(늦게 커밋된 수집분 보호)
+    embedding_sync_max_retries: int = 3 # 임베딩에 계속 실패하는 상품을 포기하기 전 재시도 횟수
+    embedding_timeout_sec: float = 60.0
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 20000 # 메모리 LRU 최대 항목 수
+    embedding_cache_max_mb: float = 64.0 # 메모리 LRU 최대 크기(float32 기준, 768차원 약 2만 건)
+    embedding_cache_persist: bool = True # embedding_cache 테이블에도 저장
+
+    # Vector Search (pgvector)
+    vector_search_ef_search: int = 40 # HNSW 탐색 폭(클수록 recall↑, 지연↑)
+    vector_search_ivfflat_probes: int = 10 # IVFFlat 인덱스 사용 시 탐색 리스트 수
+    vector_search_max_k: int = 100
+
+    # Sourcing
+    sourcing_vector_match_enabled: bool = True # 벤치마크 소싱 시 공급사 카탈로그 벡터 검색 우선 사용
+    sourcing_vector_top_k: int = 50
+    sourcing_vector_min_similarity: float = 0.5
 
     # OpenAI
     openai_api_keys: list[str] = [] # List of keys for rotation
     openai_model: str = "gpt-4o-mini"
+    openai_key_max_concurrency: int = 4 # 키당 동시 요청 수
+    openai_tokens_per_minute: int = 0 # 키당 분당 토큰 예산(0 이면 제한 없음)
+    openai_rate_limit_cooldown_sec: float = 20.0 # RateLimitError 를 받은 키를 쉬게 하는 시간
+    openai_key_acquire_timeout_sec: float = 60.0 # 쓸 수 있는 키를 기다리는 최대 시간(넘으면 호출 실패)
 
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore", case_sensitive=False)
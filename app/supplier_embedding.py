@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db_iter import iter_keyset_chunks
+from app.embedding_service import EmbeddingService
+from app.models import SupplierItemEmbedding, SupplierItemRaw, SupplierSyncState
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SYNC_TYPE = "item_embeddings"
+_CHUNK_SIZE = 500
+# 다시 시도할 실패 상품 id 를 이 수 넘게 쌓지 않습니다(임베딩 서버 장애 시에는 워터마크를 멈춤).
+_MAX_TRACKED_FAILURES = 2000
+
+_SPEC_KEYS = ("brand", "brand_name", "manufacturer", "model", "model_name", "origin", "material", "color", "size")
+
+
+@dataclass
+class SupplierEmbeddingSyncResult:
+    scanned: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    failed: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scanned": self.scanned,
+            "embedded": self.embedded,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+        }
+
+
+def _category_text(data: dict[str, Any]) -> str:
+    category = data.get("category")
+    if isinstance(category, dict):
+        return str(category.get("fullName") or category.get("full_name") or category.get("name") or "")
+    if isinstance(category, str):
+        return category
+    return str(data.get("category_name") or data.get("categoryName") or "")
+
+
+def build_embedding_text(data: dict[str, Any]) -> str:
+    """
+    공급사 raw 상품에서 임베딩용 텍스트(상품명 + 카테고리 + 주요 스펙 + 옵션명)를 만듭니다.
+    """
+    if not isinstance(data, dict):
+        return ""
+
+    parts: list[str] = []
+    name = data.get("item_name") or data.get("name") or data.get("itemName")
+    if name:
+        parts.append(str(name))
+
+    category = _category_text(data)
+    if category:
+        parts.append(category)
+
+    for key in _SPEC_KEYS:
+        value = data.get(key)
+        if isinstance(value, (str, int, float)) and str(value).strip():
+            parts.append(f"{key}: {value}")
+
+    options = data.get("options")
+    if isinstance(options, list):
+        option_names = []
+        for opt in options[:10]:
+            if not isinstance(opt, dict):
+                continue
+            attrs = opt.get("optionAttributes") or opt.get("attributes")
+            if isinstance(attrs, list):
+                option_names.extend(str(a.get("value")) for a in attrs if isinstance(a, dict) and a.get("value"))
+            elif opt.get("name"):
+                option_names.append(str(opt.get("name")))
+        if option_names:
+            parts.append("옵션: " + ", ".join(dict.fromkeys(option_names)))
+
+    return " | ".join(parts).strip()
+
+
+def content_hash(model: str, text_value: str) -> str:
+    return hashlib.sha256(f"{model}\n{text_value}".encode("utf-8")).hexdigest()
+
+
+def _get_state(session: Session, supplier_code: str) -> tuple[datetime | None, dict[str, int]]:
+    """
+    (워터마크, 임베딩에 실패해 다시 시도할 상품 id -> 시도 횟수) 를 반환합니다. 실패 목록은 cursor 에 JSON 으로 둡니다.
+    """
+    state = session.scalars(
+        select(SupplierSyncState)
+        .where(SupplierSyncState.supplier_code == supplier_code)
+        .where(SupplierSyncState.sync_type == SYNC_TYPE)
+        .where(SupplierSyncState.account_id == uuid.UUID(int=0))
+    ).one_or_none()
+    if not state:
+        return None, {}
+
+    failed: dict[str, int] = {}
+    if state.cursor:
+        try:
+            loaded = json.loads(state.cursor)
+            if isinstance(loaded, dict):
+                failed = {str(k): int(v) for k, v in loaded.items()}
+        except (TypeError, ValueError):
+            logger.warning(f"임베딩 동기화 실패 목록을 읽을 수 없어 비웁니다 (supplierCode={supplier_code})")
+    watermark = None if state.watermark_ms is None else datetime.fromtimestamp(state.watermark_ms / 1000, tz=timezone.utc)
+    return watermark, failed
+
+
+def _set_state(session: Session, supplier_code: str, watermark: datetime | None, failed: dict[str, int]) -> None:
+    watermark_ms = None if watermark is None else int(watermark.timestamp() * 1000)
+    cursor = json.dumps(failed) if failed else None
+    stmt = insert(SupplierSyncState).values(
+        supplier_code=supplier_code,
+        sync_type=SYNC_TYPE,
+        account_id=uuid.UUID(int=0),
+        watermark_ms=watermark_ms,
+        cursor=cursor,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["supplier_code", "sync_type", "account_id"],
+        set_={"watermark_ms": watermark_ms, "cursor": cursor, "updated_at": datetime.now(timezone.utc)},
+    )
+    session.execute(stmt)
+
+
+def _embed_rows(
+    session: Session,
+    service: EmbeddingService,
+    supplier_code: str,
+    rows: list[Any],
+    result: SupplierEmbeddingSyncResult,
+) -> tuple[set[uuid.UUID], bool]:
+    """
+    해시가 바뀐 상품만 임베딩해 upsert 합니다.
+    (실패한 상품 id, 임베딩할 상품이 둘 이상인데 모두 실패했는지(임베딩 서버 장애 의심)) 를 반환합니다.
+    """
+    model = service.model
+    existing = dict(
+        session.execute(
+            select(SupplierItemEmbedding.supplier_item_id, SupplierItemEmbedding.content_hash)
+            .where(SupplierItemEmbedding.supplier_item_id.in_([r.id for r in rows]))
+        ).all()
+    )
+
+    pending: list[tuple[Any, str, str]] = []
+    for row in rows:
+        result.scanned += 1
+        body = build_embedding_text(row.raw or {})
+        if not body:
+            result.unchanged += 1
+            continue
+        h = content_hash(model, body)
+        if existing.get(row.id) == h:
+            result.unchanged += 1
+            continue
+        pending.append((row, body, h))
+
+    if not pending:
+        return set(), False
+
+    embeddings = service.generate_embeddings_sync([body for _, body, _ in pending])
+    failed: set[uuid.UUID] = set()
+    values = []
+    for (row, _, h), emb in zip(pending, embeddings):
+        if not emb:
+            result.failed += 1
+            failed.add(row.id)
+            continue
+        values.append(
+            {
+                "supplier_item_id": row.id,
+                "supplier_code": supplier_code,
+                "item_code": row.item_code,
+                "model": model,
+                "content_hash": h,
+                "embedding": emb,
+            }
+        )
+    if values:
+        stmt_upsert = insert(SupplierItemEmbedding).values(values)
+        stmt_upsert = stmt_upsert.on_conflict_do_update(
+            index_elements=["supplier_item_id"],
+            set_={
+                "item_code": stmt_upsert.excluded.item_code,
+                "model": stmt_upsert.excluded.model,
+                "content_hash": stmt_upsert.excluded.content_hash,
+                "embedding": stmt_upsert.excluded.embedding,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+        session.execute(stmt_upsert)
+        result.embedded += len(values)
+    return failed, len(pending) > 1 and not values
+
+
+def _record_failures(
+    failed_items: dict[str, int],
+    rows: list[Any],
+    failed: set[uuid.UUID],
+    supplier_code: str,
+    count_attempt: bool = True,
+) -> None:
+    # 성공한 상품은 실패 목록에서 빼고, 실패한 상품은 시도 횟수를 늘려 한도를 넘으면 포기합니다.
+    # 임베딩 서버 장애가 의심되면(count_attempt=False) 시도 횟수는 늘리지 않고 목록에만 남깁니다.
+    max_retries = max(0, int(settings.embedding_sync_max_retries))
+    for row in rows:
+        key = str(row.id)
+        if row.id not in failed:
+            failed_items.pop(key, None)
+            continue
+        attempts = failed_items.get(key, 0) + (1 if count_attempt else 0)
+        if attempts > max_retries:
+            failed_items.pop(key, None)
+            logger.error(f"공급사 상품 임베딩 {attempts}회 실패로 포기합니다 (supplierCode={supplier_code}, itemCode={row.item_code})")
+        else:
+            failed_items[key] = attempts
+
+
+def sync_supplier_item_embeddings(
+    session: Session,
+    supplier_code: str = "ownerclan",
+    full: bool = False,
+    limit: int | None = None,
+    embedding_service: EmbeddingService | None = None,
+) -> SupplierEmbeddingSyncResult:
+    """
+    fetched_at 워터마크 이후 변경된 supplier_item_raw 를 읽어, 임베딩 텍스트의 해시가 바뀐 상품만 다시 임베딩합니다.
+    full=True 면 전체 카탈로그를 다시 확인합니다(해시가 같으면 임베딩은 건너뜀).
+    동시에 진행 중인 수집이 늦게 커밋한 행을 놓치지 않도록 embedding_sync_overlap_min 만큼 겹쳐 읽습니다.
+
+    청크마다 커밋하고 워터마크를 전진시킵니다. 임베딩에 실패한 상품은 id 를 기록해 다음 실행 시작 시
+    embedding_sync_max_retries 번까지 다시 시도하므로, 계속 실패하는 상품이 뒤의 상품을 막지 않습니다.
+    청크 전체가 실패하는 상황(임베딩 서버 장애 의심)에서는 시도 횟수를 늘리지 않고,
+    실패 목록이 _MAX_TRACKED_FAILURES 를 넘으면 그 청크에서 멈춰 다음 실행에서 다시 읽습니다.
+    """
+    result = SupplierEmbeddingSyncResult()
+    service = embedding_service or EmbeddingService()
+
+    stored_watermark, failed_items = _get_state(session, supplier_code)
+    watermark = None if full else stored_watermark
+    base = select(SupplierItemRaw.id, SupplierItemRaw.item_code, SupplierItemRaw.fetched_at, SupplierItemRaw.raw).where(
+        SupplierItemRaw.supplier_code == supplier_code
+    )
+
+    # 1) 이전 실행에서 실패한 상품 재시도
+    retried: set[uuid.UUID] = set()
+    if failed_items:
+        ids = []
+        for key in failed_items:
+            try:
+                ids.append(uuid.UUID(key))
+            except ValueError:
+                continue
+        rows = session.execute(base.where(SupplierItemRaw.id.in_(ids))).all()
+        # 원본이 삭제된 상품은 목록에서 뺍니다.
+        found = {str(row.id) for row in rows}
+        failed_items = {k: v for k, v in failed_items.items() if k in found}
+        if rows:
+            failed, outage = _embed_rows(session, service, supplier_code, rows, result)
+            _record_failures(failed_items, rows, failed, supplier_code, count_attempt=not outage)
+            retried = {row.id for row in rows}
+        _set_state(session, supplier_code, stored_watermark, failed_items)
+        session.commit()
+
+    # 2) 워터마크 이후 변경분
+    stmt = base
+    if watermark is not None:
+        overlap = timedelta(minutes=max(0, int(settings.embedding_sync_overlap_min)))
+        stmt = stmt.where(SupplierItemRaw.fetched_at > watermark - overlap)
+
+    for rows in iter_keyset_chunks(
+        session, stmt, (SupplierItemRaw.fetched_at, SupplierItemRaw.id), chunk_size=_CHUNK_SIZE, limit=limit
+    ):
+        todo = [row for row in rows if row.id not in retried]
+        if todo:
+            failed, outage = _embed_rows(session, service, supplier_code, todo, result)
+            if outage and len(failed_items) + len(failed) > _MAX_TRACKED_FAILURES:
+                # 임베딩 서버 장애로 보고, 이 청크가 다음 실행에서 다시 잡히도록 워터마크를 전진시키지 않습니다.
+                _set_state(session, supplier_code, watermark or stored_watermark, failed_items)
+                session.commit()
+                logger.warning(f"공급사 상품 임베딩 청크 전체 실패: {result.failed}건 (다음 실행에서 재시도)")
+                return result
+            _record_failures(failed_items, todo, failed, supplier_code, count_attempt=not outage)
+
+        # 같은 트랜잭션으로 적재된 상품은 fetched_at 이 같을 수 있어, 저장하는 워터마크는 1ms 앞으로 둡니다.
+        # (다음 실행에서 마지막 묶음을 다시 읽지만 해시가 같으면 임베딩하지 않습니다)
+        # 겹쳐 읽는 구간에서 끝나도 워터마크가 뒤로 가지 않게 합니다.
+        next_watermark = rows[-1].fetched_at - timedelta(milliseconds=1)
+        if watermark is None or next_watermark > watermark:
+            watermark = next_watermark
+        _set_state(session, supplier_code, watermark, failed_items)
+        session.commit()
+
+    if result.failed:
+        logger.warning(f"공급사 상품 임베딩 일부 실패: {result.failed}건 (다음 실행에서 재시도)")
+    logger.info(f"공급사 상품 임베딩 동기화 완료: {result.to_dict()}")
+    return result
+
+
+def run_supplier_embedding_sync(session_factory: Any, supplier_code: str, full: bool = False, limit: int | None = None) -> None:
+    """
+    백그라운드 실행용. 실패해도 예외를 올리지 않고 로그만 남깁니다.
+    """
+    try:
+        with session_factory() as session:
+            sync_supplier_item_embeddings(session, supplier_code=supplier_code, full=full, limit=limit)
+    except Exception as e:
+        logger.error(f"공급사 상품 임베딩 동기화 실패 (supplierCode={supplier_code}): {e}")
+
+
+def search_similar_supplier_items(
+    session: Session,
+    embedding: Any,
+    k: int = 50,
+    supplier_code: str | None = None,
+    ef_search: int | None = None,
+) -> list[tuple[uuid.UUID, float]]:
+    """
+    HNSW 인덱스로 임베딩과 가까운 공급사 상품 (supplier_item_id, 코사인 유사도) top-k 를 반환합니다.
+    """
+    session.execute(
+        text("SELECT set_config('hnsw.ef_search', :ef, true)"),
+        {"ef": str(int(ef_search or max(settings.vector_search_ef_search, k)))},
+        bind_arguments={"mapper": SupplierItemEmbedding},
+    )
+    distance = SupplierItemEmbedding.embedding.cosine_distance(embedding).label("distance")
+    stmt = select(SupplierItemEmbedding.supplier_item_id, distance).order_by(distance).limit(max(1, int(k)))
+    if supplier_code:
+        stmt = stmt.where(SupplierItemEmbedding.supplier_code == supplier_code)
+    return [(row.supplier_item_id, 1.0 - float(row.distance)) for row in session.execute(stmt).all()]
@@ -0,0 +1,151 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.getcwd())
+
+from app.benchmark.collectors import auction, elevenst, gmarket, naver_shopping
+from app.benchmark.parsing import parse_product_detail
+from app import benchmark_collector
+
+# 마켓별 (랭킹 파서, 상세 파서) 매핑
+PARSERS = {
+    "COUPANG": (
+        benchmark_collector.parse_coupang_ranking_html,
+        lambda html, parser: benchmark_collector.parse_coupang_detail_html(html, parser=parser),
+    ),
+    "AUCTION": (
+        auction.parse_ranking_html,
+        lambda html, parser: parse_product_detail(html, auction.DETAIL_SELECTORS, parser=parser),
+    ),
+    "ELEVENST": (
+        elevenst.parse_ranking_html,
+        lambda html, parser: parse_product_detail(html, elevenst.DETAIL_SELECTORS, parser=parser),
+    ),
+    "GMARKET": (
+        gmarket.parse_ranking_html,
+        lambda html, parser: parse_product_detail(
+            html, gmarket.DETAIL_SELECTORS, gmarket.DETAIL_IFRAME_SELECTORS, parser=parser
+        ),
+    ),
+    "NAVER_SHOPPING": (
+        naver_shopping.parse_ranking_html,
+        lambda html, parser: parse_product_detail(html, naver_shopping.DETAIL_SELECTORS, parser=parser),
+    ),
+}
+
+
+def dump_from_db(fixtureDir: Path, perMarket: int) -> None:
+    """
+    benchmark_products.raw_data.raw_html 을 마켓별로 최대 perMarket 건씩 detail_*.html 로 저장합니다.
+    """
+    from sqlalchemy import select
+
+    from app.db import SessionLocal
+    from app.models import BenchmarkProduct
+
+    with SessionLocal() as session:
+        for marketCode in PARSERS:
+            rows = session.execute(
+                select(BenchmarkProduct.product_id, BenchmarkProduct.raw_data)
+                .where(BenchmarkProduct.market_code == marketCode)
+                .where(BenchmarkProduct.raw_data.has_key("raw_html"))
+                .order_by(BenchmarkProduct.updated_at.desc())
+                .limit(perMarket)
+            ).all()
+            if not rows:
+                continue
+            marketDir = fixtureDir / marketCode
+            marketDir.mkdir(parents=True, exist_ok=True)
+            for productId, rawData in rows:
+                html = (rawData or {}).get("raw_html") or ""
+                if html:
+                    (marketDir / f"detail_{productId}.html").write_text(html, encoding="utf-8")
+            print(f"[dump] {marketCode}: {len(rows)}건")
+
+
+def bench(func, htmlList: list[str], parser: str, repeat: int) -> tuple[float, list]:
+    results = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(html, parser) for html in htmlList]
+    elapsed = time.perf_counter() - started
+    return elapsed / max(1, repeat * len(htmlList)), results
+
+
+def main() -> int:
+    """
+    fixtureDir/<MARKET>/ranking*.html(랭킹), 그 외 *.html(상세)을 파서별로 파싱해 속도와 결과 일치를 비교합니다.
+    저장소에는 구조만 흉내 낸 작은 샘플(마켓별 ranking_sample/detail_sample)만 들어 있으므로,
+    실제 페이지로 측정하려면 먼저 --dump-from-db 로 수집된 raw_html 을 내려받습니다.
+
+    예)
+      python scripts/bench_benchmark_parsing.py
+      python scripts/bench_benchmark_parsing.py data/bench_html --dump-from-db 50 --repeat 5
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtureDir", nargs="?", default="scripts/fixtures/benchmark_html")
+    parser.add_argument(
+        "--dump-from-db",
+        dest="dumpFromDb",
+        type=int,
+        default=0,
+        help="측정 전에 benchmark_products 의 raw_html 을 마켓별로 N건씩 fixtureDir 에 저장",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--parsers", type=str, default="html.parser,lxml")
+    args = parser.parse_args()
+
+    fixtureDir = Path(args.fixtureDir)
+    if int(args.dumpFromDb) > 0:
+        dump_from_db(fixtureDir, int(args.dumpFromDb))
+    if not fixtureDir.is_dir():
+        print(f"fixture 디렉터리가 없습니다: {fixtureDir} (--dump-from-db N 으로 먼저 내려받으세요)")
+        return 1
+
+    parserNames = [p.strip() for p in str(args.parsers).split(",") if p.strip()]
+    mismatches = 0
+
+    for marketCode, (rankingParser, detailParser) in PARSERS.items():
+        marketDir = fixtureDir / marketCode
+        if not marketDir.is_dir():
+            continue
+
+        # 파일명이 ranking 으로 시작하면 랭킹 페이지, 그 외는 상세 페이지로 취급합니다.
+        rankingHtml = [p.read_text(encoding="utf-8") for p in sorted(marketDir.glob("ranking*.html"))]
+        detailHtml = [
+            p.read_text(encoding="utf-8")
+            for p in sorted(marketDir.glob("*.html"))
+            if not p.name.startswith("ranking")
+        ]
+
+        cases = [
+            ("ranking", rankingHtml, lambda html, name: rankingParser(html, int(args.limit), parser=name)),
+            ("detail", detailHtml, detailParser),
+        ]
+        for kind, htmlList, func in cases:
+            if not htmlList:
+                continue
+            baseline = None
+            for name in parserNames:
+                perPage, results = bench(func, htmlList, name, int(args.repeat))
+                same = ""
+                if baseline is None:
+                    baseline = results
+                else:
+                    same = "일치" if results == baseline else "불일치"
+                    if results != baseline:
+                        mismatches += 1
+                print(f"{marketCode:<15} {kind:<8} pages={len(htmlList):<4} {name:<12} {perPage * 1000:8.2f}ms/page {same}")
+
+    if mismatches:
+        print(f"파서 간 결과 불일치: {mismatches}건")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from app.services.image_processing import IMAGE_OUTPUT_PROFILES, prepare_image, probe_image_size
+from app.settings import settings
+
+
+def synthetic_fixtures() -> list[tuple[str, bytes]]:
+    """
+    공급사 이미지와 비슷한 크기 분포의 합성 이미지(대표/상세 긴 이미지/아이콘/추적 픽셀/구분선).
+    """
+    rng = np.random.default_rng(0)
+
+    def photo(width: int, height: int) -> np.ndarray:
+        # 그라데이션 + 노이즈(JPEG 압축률이 실제 사진과 비슷하도록)
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        base = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)), (x + y) / 2], axis=2)
+        noise = rng.normal(0, 12, (height, width, 3))
+        return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+    fixtures = []
+    for name, (width, height), ext in [
+        ("main_3000", (3000, 3000), ".jpg"),
+        ("main_1500", (1500, 1500), ".jpg"),
+        ("detail_860x6000", (860, 6000), ".jpg"),
+        ("detail_1000x3000", (1000, 3000), ".png"),
+        ("option_800", (800, 800), ".jpg"),
+        ("icon_64", (64, 64), ".png"),
+        ("divider_750x20", (750, 20), ".jpg"),
+        ("pixel_1x1", (1, 1), ".png"),
+    ]:
+        ok, encoded = cv2.imencode(ext, photo(width, height), [int(cv2.IMWRITE_JPEG_QUALITY), 95] if ext == ".jpg" else [])
+        if ok:
+            fixtures.append((name + ext, encoded.tobytes()))
+    return fixtures
+
+
+def load_fixtures(fixtureDir: Path) -> list[tuple[str, bytes]]:
+    return [
+        (p.name, p.read_bytes())
+        for p in sorted(fixtureDir.iterdir())
+        if p.is_file() and p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp", ".gif")
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtureDir", nargs="?", default="", help="이미지 폴더(없으면 합성 이미지 사용)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profiles", type=str, default=",".join(IMAGE_OUTPUT_PROFILES))
+    parser.add_argument("--min-dimension", dest="minDimension", type=int, default=settings.image_min_dimension)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(Path(args.fixtureDir)) if args.fixtureDir else synthetic_fixtures()
+    if not fixtures:
+        print("이미지가 없습니다.")
+        return 1
+
+    totalIn = sum(len(data) for _, data in fixtures)
+    print(f"images={len(fixtures)} bytesIn={totalIn / 1024:.0f}KB")
+    for name, data in fixtures:
+        print(f"  {name:<24} {str(probe_image_size(data)):<14} {len(data) / 1024:8.0f}KB")
+
+    # baseline: 이전 동작(원본 해상도 JPEG 90, 크기 필터 없음)
+    cases = [("baseline", "original", 0)] + [
+        (name, name, int(args.minDimension)) for name in str(args.profiles).split(",") if name.strip()
+    ]
+    baselineSec = baselineOut = None
+    for label, profileName, minDimension in cases:
+        started = time.perf_counter()
+        for _ in range(max(1, int(args.repeat))):
+            outputs = [prepare_image(data, profileName.strip(), minDimension) for _, data in fixtures]
+        elapsed = (time.perf_counter() - started) / max(1, int(args.repeat))
+        bytesOut = sum(len(out) for out, status in outputs if status == "ok")
+        rejected = sum(1 for _, status in outputs if status == "rejected")
+        failed = sum(1 for _, status in outputs if status == "failed")
+        if baselineSec is None:
+            baselineSec, baselineOut = elapsed, bytesOut
+        print(
+            f"{label:<10} {elapsed * 1000:8.1f}ms ({elapsed / baselineSec:4.2f}x) "
+            f"bytesOut={bytesOut / 1024:8.0f}KB ({bytesOut / max(1, baselineOut):4.2f}x) "
+            f"rejected={rejected} failed={failed}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
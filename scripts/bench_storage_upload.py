@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from app.services.storage_service import LocalStorageBackend, StorageService, build_backend
+from app.settings import settings
+
+
+class LatencyBackend:
+    """
+    로컬 백엔드에 왕복 지연을 더해 네트워크 업로드를 흉내 냅니다.
+    """
+
+    def __init__(self, inner, latency_sec: float):
+        self.inner = inner
+        self.latency_sec = latency_sec
+        self.name = f"{inner.name}+{int(latency_sec * 1000)}ms"
+        self.enabled = inner.enabled
+
+    def public_url(self, path: str) -> str:
+        return self.inner.public_url(path)
+
+    async def put(self, client, path, data, content_type, upsert):
+        await asyncio.sleep(self.latency_sec)
+        await self.inner.put(client, path, data, content_type, upsert)
+
+
+async def run(service: StorageService, files: list[tuple[bytes, str]], prefix: str) -> tuple[float, float, int]:
+    try:
+        # 이전 방식: 한 장씩 순서대로
+        started = time.perf_counter()
+        sequential = [await service.aupload_image(data, ext, path_prefix=f"{prefix}/sequential") for data, ext in files]
+        sequentialSec = time.perf_counter() - started
+
+        started = time.perf_counter()
+        concurrent = await service.upload_many(files, path_prefix=f"{prefix}/concurrent")
+        concurrentSec = time.perf_counter() - started
+        failed = sum(1 for url in sequential + concurrent if not url)
+        return sequentialSec, concurrentSec, failed
+    finally:
+        await service.aclose()
+
+
+def main() -> int:
+    """
+    예)
+      python scripts/bench_storage_upload.py --count 200 --latency-ms 80
+      STORAGE_BACKEND=supabase python scripts/bench_storage_upload.py --backend supabase --count 50
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["local", "supabase"], default="local")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size-kb", dest="sizeKb", type=int, default=150)
+    parser.add_argument("--latency-ms", dest="latencyMs", type=int, default=50, help="local 백엔드에 더할 왕복 지연")
+    parser.add_argument("--concurrency", type=int, default=settings.storage_upload_concurrency)
+    args = parser.parse_args()
+
+    settings.storage_upload_concurrency = max(1, int(args.concurrency))
+    tmpDir = None
+    if args.backend == "local":
+        tmpDir = tempfile.mkdtemp(prefix="bench_storage_")
+        backend = LocalStorageBackend(tmpDir)
+        if args.latencyMs > 0:
+            backend = LatencyBackend(backend, args.latencyMs / 1000)
+    else:
+        backend = build_backend()
+        if not backend.enabled:
+            print("Supabase 설정(SUPABASE_SERVICE_ROLE_KEY)이 없습니다.")
+            return 1
+
+    files = [(os.urandom(int(args.sizeKb) * 1024), "jpg") for _ in range(max(1, int(args.count)))]
+    totalMb = sum(len(data) for data, _ in files) / 1024 / 1024
+    try:
+        sequentialSec, concurrentSec, failed = asyncio.run(run(StorageService(backend), files, "bench_storage"))
+    finally:
+        if tmpDir:
+            shutil.rmtree(tmpDir, ignore_errors=True)
+
+    print(f"backend={backend.name} files={len(files)} total={totalMb:.1f}MB concurrency={settings.storage_upload_concurrency}")
+    print(f"sequential   {sequentialSec:7.2f}s  {len(files) / sequentialSec:7.1f} files/s  {totalMb / sequentialSec:6.1f} MB/s")
+    print(f"upload_many  {concurrentSec:7.2f}s  {len(files) / concurrentSec:7.1f} files/s  {totalMb / concurrentSec:6.1f} MB/s")
+    if failed:
+        print(f"실패: {failed}건")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+sys.path.append(os.getcwd())
+
+from app.settings import settings
+
+# 합성 데이터 전용 테이블(운영 테이블과 분리). --drop 으로 정리합니다.
+TABLE = "bench_vector_items"
+
+
+def vector_literal(values: list[float]) -> str:
+    return "[" + ",".join(f"{v:.6f}" for v in values) + "]"
+
+
+def ensure_dataset(engine, rows: int, dim: int, chunk: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {TABLE} (id bigserial PRIMARY KEY, embedding vector({dim}) NOT NULL)"))
+        existing = int(conn.execute(text(f"SELECT count(*) FROM {TABLE}")).scalar_one())
+
+    # 균등 분포 랜덤 벡터는 군집이 없어 ANN recall 측면에서 가장 불리한 경우입니다.
+    while existing < rows:
+        n = min(chunk, rows - existing)
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {TABLE} (embedding) "
+                    f"SELECT (SELECT array_agg(random() - 0.5) FROM generate_series(1, :dim) WHERE g.i > 0)::vector({dim}) "
+                    "FROM generate_series(1, :n) AS g(i)"
+                ),
+                {"dim": dim, "n": n},
+            )
+        existing += n
+        print(f"[data] {existing}/{rows} ({time.perf_counter() - started:.1f}s)")
+
+
+def ensure_index(engine, index: str, m: int, efConstruction: int, lists: int, maintenanceWorkMem: str) -> None:
+    indexName = f"ix_{TABLE}_embedding_{index}"
+    if index == "hnsw":
+        ddl = (
+            f"CREATE INDEX IF NOT EXISTS {indexName} ON {TABLE} USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(m)}, ef_construction = {int(efConstruction)})"
+        )
+    else:
+        ddl = (
+            f"CREATE INDEX IF NOT EXISTS {indexName} ON {TABLE} USING ivfflat (embedding vector_cosine_ops) "
+            f"WITH (lists = {int(lists)})"
+        )
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text("SELECT set_config('maintenance_work_mem', :v, true)"), {"v": maintenanceWorkMem})
+        conn.execute(text(ddl))
+        conn.execute(text(f"ANALYZE {TABLE}"))
+    print(f"[index] {indexName} ready ({time.perf_counter() - started:.1f}s)")
+
+
+def run_queries(engine, queries: list[str], k: int, settingName: str | None, settingValue: int | None, exact: bool):
+    ids: list[list[int]] = []
+    latencies: list[float] = []
+    sql = text(f"SELECT id FROM {TABLE} ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k")
+    with engine.connect() as conn:
+        for q in queries:
+            with conn.begin():
+                if exact:
+                    conn.execute(text("SELECT set_config('enable_indexscan', 'off', true)"))
+                elif settingName:
+                    conn.execute(text("SELECT set_config(:name, :v, true)"), {"name": settingName, "v": str(settingValue)})
+                started = time.perf_counter()
+                rows = conn.execute(sql, {"q": q, "k": k}).scalars().all()
+                latencies.append((time.perf_counter() - started) * 1000)
+            ids.append(list(rows))
+    return ids, latencies
+
+
+def _db_identity(url: str) -> tuple:
+    parsed = make_url(url)
+    return (parsed.host or "localhost", parsed.port or 5432, parsed.database)
+
+
+def app_database_name(url: str) -> str | None:
+    """
+    url 이 앱에서 쓰는 DB(source/dropship/market)와 같은 서버·DB 를 가리키면 그 이름을 반환합니다.
+    """
+    target = _db_identity(url)
+    for name in ("source_database_url", "dropship_database_url", "market_database_url"):
+        configured = getattr(settings, name, None)
+        if configured and _db_identity(configured) == target:
+            return name
+    return None
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(p * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    # 대용량 테이블을 채우고 지우므로 앱 DB 를 기본값으로 쓰지 않습니다(벤치 전용 DB 를 명시).
+    parser.add_argument("--database-url", dest="databaseUrl", type=str, required=True, help="벤치 전용 DB URL(앱 DB 불가)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--index", type=str, choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", dest="efConstruction", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=1000)
+    parser.add_argument("--maintenance-work-mem", dest="maintenanceWorkMem", type=str, default="2GB")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", dest="efSearch", type=str, default="20,40,80,160")
+    parser.add_argument("--probes", type=str, default="1,5,10,40")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true")
+    args = parser.parse_args()
+
+    appDb = app_database_name(args.databaseUrl)
+    if appDb:
+        print(f"--database-url 이 앱 DB({appDb})와 같습니다. 벤치 전용 DB 를 지정하세요.")
+        return 2
+
+    engine = create_engine(args.databaseUrl, pool_pre_ping=True)
+    try:
+        ensure_dataset(engine, int(args.rows), int(args.dim), int(args.chunk))
+        ensure_index(engine, args.index, args.m, args.efConstruction, args.lists, args.maintenanceWorkMem)
+
+        rnd = random.Random(int(args.seed))
+        queries = [vector_literal([rnd.random() - 0.5 for _ in range(int(args.dim))]) for _ in range(int(args.queries))]
+
+        exactIds, exactLat = run_queries(engine, queries, int(args.k), None, None, exact=True)
+        print(f"{'mode':<20} {'recall@' + str(args.k):>10} {'p50(ms)':>10} {'p95(ms)':>10}")
+        print(f"{'exact':<20} {1.0:>10.3f} {statistics.median(exactLat):>10.2f} {percentile(exactLat, 0.95):>10.2f}")
+
+        if args.index == "hnsw":
+            settingName, values = "hnsw.ef_search", args.efSearch
+        else:
+            settingName, values = "ivfflat.probes", args.probes
+
+        for value in [int(v) for v in str(values).split(",") if v.strip()]:
+            annIds, annLat = run_queries(engine, queries, int(args.k), settingName, value, exact=False)
+            recalls = [
+                len(set(a) & set(e)) / max(1, len(e))
+                for a, e in zip(annIds, exactIds)
+            ]
+            label = f"{settingName}={value}"
+            print(f"{label:<20} {statistics.mean(recalls):>10.3f} {statistics.median(annLat):>10.2f} {percentile(annLat, 0.95):>10.2f}")
+    finally:
+        if args.drop:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            print(f"[cleanup] {TABLE} dropped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db import SessionLocal
+from app.services.ai.batch import AIBatchService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """
+    야간 배치용. 예)
+      python scripts/run_ai_batch.py submit --task seo --limit 20000
+      python scripts/run_ai_batch.py poll            # cron 으로 주기 실행
+      python scripts/run_ai_batch.py submit --task specs --provider local --wait
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["submit", "poll"])
+    parser.add_argument("--task", choices=["seo", "specs"], default="seo")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--provider", choices=["openai", "local"], default=None)
+    parser.add_argument("--wait", action="store_true", help="제출 후 완료될 때까지 주기적으로 확인")
+    parser.add_argument("--interval", type=int, default=60)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = AIBatchService(db)
+        if args.command == "submit":
+            job = service.submit(args.task, limit=args.limit, provider=args.provider)
+            if job is None:
+                logger.info("제출할 대상이 없습니다.")
+                return 0
+            logger.info(f"Submitted job {job.id} ({job.request_count} requests, status={job.status})")
+            if not args.wait:
+                return 0
+
+        while True:
+            jobs = service.poll_active()
+            for job in jobs:
+                logger.info(f"job={job.id} task={job.task} status={job.status} ok={job.succeeded_count} failed={job.failed_count}")
+            if not args.wait or not any(job.status in ("SUBMITTED", "IN_PROGRESS") for job in jobs):
+                return 0
+            time.sleep(max(5, int(args.interval)))
+    except Exception as e:
+        logger.error(f"AI batch job failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
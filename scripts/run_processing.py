@@ -1,33 +1,57 @@
+import argparse
 import sys
 import os
 import logging
+import multiprocessing
 
 # Add app to path
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from app.db import SessionLocal
-from app.services.processing_service import ProcessingService
-
 # Logging Setup
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+
+def run_worker(limit: int | None, batch_size: int | None, llm_concurrency: int | None, image_concurrency: int | None) -> dict:
+    # spawn 된 프로세스마다 DB 엔진/클라이언트를 새로 만듭니다.
+    from app.services.processing_engine import ProcessingEngine
+
+    engine = ProcessingEngine(
+        batch_size=batch_size,
+        llm_concurrency=llm_concurrency,
+        image_concurrency=image_concurrency,
+    )
+    return engine.run(limit=limit).to_dict()
+
+
 def main():
-    logger.info("Starting Product Processing Job...")
-    
-    db = SessionLocal()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1, help="워커 프로세스 수")
+    parser.add_argument("--limit", type=int, default=None, help="워커당 최대 처리 상품 수(기본: PENDING 이 없을 때까지)")
+    parser.add_argument("--batch-size", dest="batchSize", type=int, default=None)
+    parser.add_argument("--llm-concurrency", dest="llmConcurrency", type=int, default=None)
+    parser.add_argument("--image-concurrency", dest="imageConcurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    logger.info(f"Starting Product Processing Job (workers={args.workers})...")
+    worker_args = (args.limit, args.batchSize, args.llmConcurrency, args.imageConcurrency)
+
     try:
-        service = ProcessingService(db)
-        
-        # Process up to 50 pending items
-        processed_count = service.process_pending_products(limit=50)
-        
-        logger.info(f"Job Complete. Processed {processed_count} products.")
-        
+        if args.workers <= 1:
+            results = [run_worker(*worker_args)]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(processes=args.workers) as pool:
+                results = pool.starmap(run_worker, [worker_args] * args.workers)
+
+        for i, result in enumerate(results):
+            logger.info(f"Worker {i}: {result}")
+        total = sum(r["completed"] + r["partialFailure"] for r in results)
+        logger.info(f"Job Complete. Processed {total} products.")
+
     except Exception as e:
         logger.error(f"Job Failed: {e}")
-    finally:
-        db.close()
+
 
 if __name__ == "__main__":
     main()
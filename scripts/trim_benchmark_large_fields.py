@@ -7,6 +7,7 @@ from sqlalchemy import func, or_, select
 sys.path.append(os.getcwd())
 
 from app.db import SessionLocal
+from app.db_iter import iter_keyset
 from app.models import BenchmarkProduct
 
 
@@ -31,11 +32,9 @@ def main() -> int:
     if args.trimDetailHtml:
         cleanupConds.append(func.length(BenchmarkProduct.detail_html) > int(args.detailHtmlMax))
 
-    stmt = select(BenchmarkProduct).where(or_(*cleanupConds)).order_by(BenchmarkProduct.updated_at.desc())
+    stmt = select(BenchmarkProduct).where(or_(*cleanupConds))
     if args.marketCode:
         stmt = stmt.where(BenchmarkProduct.market_code == str(args.marketCode).strip())
-    if int(args.limit) > 0:
-        stmt = stmt.limit(int(args.limit))
 
     totalRows = 0
     changedRows = 0
@@ -44,7 +43,17 @@ def main() -> int:
     removedDupKeysRows = 0
 
     with SessionLocal() as session:
-        rows = session.scalars(stmt).yield_per(100)
+        # 최신 생성 순으로 (created_at, id) keyset 을 100건씩 읽습니다.
+        # updated_at 은 이 스크립트가 바꿀 수 있어 정렬 키로 쓰지 않고, 묶음 사이 커밋에도 커서가 끊기지 않습니다.
+        rows = iter_keyset(
+            session,
+            stmt,
+            (BenchmarkProduct.created_at, BenchmarkProduct.id),
+            chunk_size=100,
+            descending=True,
+            limit=int(args.limit) if int(args.limit) > 0 else None,
+            scalars=True,
+        )
         for row in rows:
             totalRows += 1
 